@@ -0,0 +1,149 @@
+"""Consolidation simulator throughput on a synthetic pod snapshot.
+
+Generates a ``kubectl get pods,nodes -o json`` style snapshot: ``--pods``
+pods from ``--workloads`` Deployments (replicas share requests) spread over
+``--nodepools`` NodePools, plus one DaemonSet pod per node, and nodes at
+about 60% utilization. ``--distinct`` gives every pod its own random
+requests instead, the packer's worst case. Reports parse time and simulation
+time for each packer and worker count as JSON.
+
+    PYTHONPATH=src python benchmarks/binpack.py --pods 50000 --nodepools 1
+    PYTHONPATH=src python benchmarks/binpack.py --pods 50000 --nodepools 64 --workers 1,4
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT / "src") not in sys.path:
+    sys.path.insert(0, str(ROOT / "src"))
+
+from karpenter_ai_agent.models import CanonicalConfig, CanonicalProvisioner  # noqa: E402
+from karpenter_ai_agent.simulation import packer_available, parse_snapshot, simulate_consolidation  # noqa: E402
+
+FAMILY_SETS = [[], ["m5", "m6i"], ["c6i", "c5"], ["r5", "r6i"], ["m7i", "c7i", "r7i"]]
+INSTANCE_TYPES = ["m5.2xlarge", "m6i.4xlarge", "c6i.2xlarge", "r5.2xlarge", "m5.xlarge"]
+
+
+def _pod(name: str, pool: str, node: str, cpu: int, memory_mib: int, owner: Dict[str, str]) -> Dict[str, Any]:
+    return {
+        "kind": "Pod",
+        "metadata": {"name": name, "namespace": "bench", "ownerReferences": [owner]},
+        "spec": {
+            "nodeName": node,
+            "nodeSelector": {"karpenter.sh/nodepool": pool},
+            "containers": [{"name": "app", "resources": {"requests": {"cpu": f"{cpu}m", "memory": f"{memory_mib}Mi"}}}],
+        },
+        "status": {"phase": "Running"},
+    }
+
+
+def synthetic_snapshot(pods: int, nodepools: int, workloads: int, distinct: bool, seed: int) -> Dict[str, Any]:
+    rng = random.Random(seed)
+    shapes = [(rng.choice([50, 100, 250, 500, 1000, 2000]), rng.choice([64, 128, 256, 512, 1024, 4096])) for _ in range(workloads)]
+    items: List[Dict[str, Any]] = []
+    node_count = 0
+    for p in range(nodepools):
+        pool = f"pool-{p}"
+        share = pods // nodepools + (1 if p < pods % nodepools else 0)
+        # About 60% utilized nodes of ~8 vCPU.
+        demand = 0
+        pool_pods = []
+        for i in range(share):
+            if distinct:
+                cpu, memory = rng.randint(20, 3000), rng.randint(32, 8192)
+            else:
+                cpu, memory = shapes[(i * 7919 + p) % workloads]
+            demand += cpu
+            pool_pods.append((i, cpu, memory))
+        nodes = max(1, int(demand / (8000 * 0.6)))
+        for n in range(nodes):
+            name = f"{pool}-node-{n}"
+            items.append(
+                {
+                    "kind": "Node",
+                    "metadata": {
+                        "name": name,
+                        "labels": {
+                            "karpenter.sh/nodepool": pool,
+                            "node.kubernetes.io/instance-type": INSTANCE_TYPES[(p + n) % len(INSTANCE_TYPES)],
+                        },
+                    },
+                }
+            )
+            items.append(_pod(f"{name}-ds", pool, name, 100, 128, {"kind": "DaemonSet", "name": "node-agent"}))
+        node_count += nodes
+        for i, cpu, memory in pool_pods:
+            owner = {"kind": "ReplicaSet", "name": f"w{i % workloads}"}
+            items.append(_pod(f"{pool}-pod-{i}", pool, f"{pool}-node-{i % nodes}", cpu, memory, owner))
+    return {"apiVersion": "v1", "kind": "List", "items": items}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--pods", type=int, default=50000)
+    parser.add_argument("--nodepools", type=int, default=1)
+    parser.add_argument("--workloads", type=int, default=300)
+    parser.add_argument("--distinct", action="store_true", help="Give every pod its own random requests")
+    parser.add_argument("--workers", default="1", help="Comma-separated worker counts")
+    parser.add_argument("--packers", default="numpy,python" if packer_available() else "python")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    text = json.dumps(synthetic_snapshot(args.pods, args.nodepools, args.workloads, args.distinct, args.seed))
+    started = time.perf_counter()
+    snapshot = parse_snapshot(text)
+    parse_s = time.perf_counter() - started
+    config = CanonicalConfig(
+        provisioners=[
+            CanonicalProvisioner(
+                name=f"pool-{p}",
+                kind="NodePool",
+                spot_allowed=False,
+                graviton_used=False,
+                instance_families=FAMILY_SETS[p % len(FAMILY_SETS)],
+                raw_yaml={},
+            )
+            for p in range(args.nodepools)
+        ]
+    )
+
+    runs = []
+    for packer in args.packers.split(","):
+        for workers in (int(w) for w in args.workers.split(",")):
+            started = time.perf_counter()
+            report = simulate_consolidation(config, snapshot, workers=workers, vectorized=packer == "numpy")
+            runs.append(
+                {
+                    "packer": packer,
+                    "workers": workers,
+                    "seconds": round(time.perf_counter() - started, 3),
+                    "current_nodes": sum(e["current_nodes"] for e in report["nodepools"]),
+                    "packed_nodes": sum(e["packed_nodes"] or 0 for e in report["nodepools"]),
+                    "instance_types_packed": sum(e["instance_types_packed"] for e in report["nodepools"]),
+                    "monthly_savings_usd": report["monthly_savings_usd"],
+                }
+            )
+    print(
+        json.dumps(
+            {
+                "pods": len(snapshot.pods),
+                "nodes": len(snapshot.nodes),
+                "nodepools": args.nodepools,
+                "snapshot_mib": round(len(text) / 2**20, 1),
+                "parse_seconds": round(parse_s, 3),
+                "runs": runs,
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
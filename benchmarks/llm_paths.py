@@ -0,0 +1,129 @@
+"""Offline benchmark / load test for the AI summary and explanation paths.
+
+Starts the local stub LLM server (or replays a cassette) and drives
+``generate_report``, ``stream_report`` and ``attach_issue_explanations`` with a
+configurable request count and concurrency. Prints a JSON latency report.
+
+    PYTHONPATH=.:src python benchmarks/llm_paths.py --requests 50 --concurrency 8 --latency-ms 150
+"""
+from __future__ import annotations
+
+import argparse
+import copy
+import json
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List
+
+ROOT = Path(__file__).resolve().parents[1]
+for path in (ROOT, ROOT / "src"):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+from karpenter_ai_agent.agents import CoordinatorAgent  # noqa: E402
+from karpenter_ai_agent.llm.cassette import Cassette  # noqa: E402
+from karpenter_ai_agent.llm.stub_server import StubConfig, StubLLMServer  # noqa: E402
+from karpenter_ai_agent.models import AnalysisInput  # noqa: E402
+from karpenter_ai_agent.rag.explain import attach_issue_explanations  # noqa: E402
+from models import Issue  # noqa: E402
+
+FIXTURE = ROOT / "tests" / "fixtures" / "basic-karpenter.yaml"
+
+
+def _legacy_issues() -> List[Issue]:
+    report = CoordinatorAgent().run(AnalysisInput(yaml_text=FIXTURE.read_text(), region="us-east-1"))
+    return [
+        Issue(
+            severity=i.severity,
+            category=i.category,
+            message=i.message,
+            recommendation=i.recommendation,
+            provisioner_name=i.resource_name,
+            resource_kind=i.resource_kind,
+            resource_name=i.resource_name,
+            patch_snippet=i.patch_snippet,
+        )
+        for i in report.issues
+    ]
+
+
+def _percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(int(round(pct / 100.0 * (len(ordered) - 1))), len(ordered) - 1)
+    return ordered[index]
+
+
+def _run(fn: Callable[[], object], requests: int, concurrency: int) -> Dict[str, float]:
+    def timed(_: int) -> float:
+        started = time.perf_counter()
+        fn()
+        return (time.perf_counter() - started) * 1000.0
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        samples = list(pool.map(timed, range(requests)))
+    wall = time.perf_counter() - started
+    return {
+        "requests": requests,
+        "p50_ms": round(statistics.median(samples), 2),
+        "p95_ms": round(_percentile(samples, 95), 2),
+        "p99_ms": round(_percentile(samples, 99), 2),
+        "max_ms": round(max(samples), 2),
+        "throughput_rps": round(requests / wall, 2) if wall else 0.0,
+    }
+
+
+def main(argv: List[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--token-delay-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--replay", type=Path, default=None, help="Serve responses from a cassette")
+    args = parser.parse_args(argv)
+
+    from llm_client import generate_report, stream_report  # noqa: E402
+
+    config = StubConfig(
+        latency_ms=args.latency_ms,
+        token_delay_ms=args.token_delay_ms,
+        error_rate=args.error_rate,
+        seed=7,
+    )
+    if args.replay:
+        config.mode = "replay"
+        config.cassette = Cassette.load(args.replay)
+
+    issues = _legacy_issues()
+    summary = {"issues_by_severity": {"high": 1, "medium": 1, "low": 0}, "health_score": 80}
+
+    with StubLLMServer(config=config) as server:
+        os.environ["LLM_BASE_URL"] = server.base_url
+        os.environ.setdefault("GROQ_API_KEY", "stub-key")
+        results = {
+            "summary": _run(
+                lambda: generate_report("us-east-1", summary, issues), args.requests, args.concurrency
+            ),
+            "summary_stream": _run(
+                lambda: "".join(stream_report("us-east-1", summary, issues)),
+                args.requests,
+                args.concurrency,
+            ),
+            "explanations": _run(
+                lambda: attach_issue_explanations(copy.deepcopy(issues), llm_available=True),
+                max(args.requests // 4, 1),
+                args.concurrency,
+            ),
+            "stub_requests": server.request_count,
+        }
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
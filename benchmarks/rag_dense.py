@@ -0,0 +1,132 @@
+"""Latency and recall of the LSH dense index against brute-force cosine.
+
+Embeds a synthetic, topic-structured corpus with the hashed n-gram embedder
+(each chunk draws most of its words from one of ``--topics`` topic
+vocabularies, so near neighbours exist), then runs the same queries through
+exact search and the LSH index for each ``--lsh TABLESxBITS`` configuration.
+Queries are ``--query-words`` words sampled from a chunk, about the length of
+an issue query. Recall@k is the fraction of the exact top-k that LSH also
+returns. Prints a JSON report. Requires numpy.
+
+    PYTHONPATH=src python benchmarks/rag_dense.py --chunks 100000 --lsh 8x10,12x10,24x10
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+ROOT = Path(__file__).resolve().parents[1]
+for path in (ROOT / "src", Path(__file__).resolve().parent):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+from karpenter_ai_agent.rag.dense import DenseIndex, LSHIndex  # noqa: E402
+from rag_engines import _vocabulary  # noqa: E402
+
+
+def topical_corpus(chunks: int, vocabulary: int, topics: int, seed: int) -> List[str]:
+    rng = random.Random(seed)
+    words = _vocabulary(vocabulary, rng)
+    weights = [1.0 / rank for rank in range(1, len(words) + 1)]
+    topic_words = [rng.sample(words, 400) for _ in range(topics)]
+    texts = []
+    for _ in range(chunks):
+        topic = topic_words[rng.randrange(topics)]
+        length = rng.randint(60, 120)
+        on_topic = int(length * 0.8)
+        body = rng.choices(topic, k=on_topic) + rng.choices(words, weights=weights, k=length - on_topic)
+        rng.shuffle(body)
+        texts.append(" ".join(rng.sample(topic[:20], 3)).title() + " " + " ".join(body))
+    return texts
+
+
+def _latency(samples: List[float]) -> Dict[str, float]:
+    ordered = sorted(samples)
+    return {
+        "mean_ms": round(statistics.fmean(samples), 3),
+        "p95_ms": round(ordered[int(0.95 * (len(ordered) - 1))], 3),
+    }
+
+
+def _config(raw: str) -> Tuple[int, int]:
+    tables, bits = raw.lower().split("x")
+    return int(tables), int(bits)
+
+
+def main(argv: List[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--chunks", type=int, default=20_000)
+    parser.add_argument("--vocabulary", type=int, default=50_000)
+    parser.add_argument("--topics", type=int, default=200)
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("--query-words", type=int, default=20)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--lsh", default="8x10,12x10,24x10", help="Comma-separated TABLESxBITS configurations")
+    parser.add_argument("--no-probe", action="store_true", help="Only probe each query's own bucket")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args(argv)
+
+    texts = topical_corpus(args.chunks, args.vocabulary, args.topics, args.seed)
+    rng = random.Random(args.seed + 1)
+    queries = [" ".join(rng.sample(rng.choice(texts).split(), args.query_words)) for _ in range(args.queries)]
+
+    started = time.perf_counter()
+    index = DenseIndex.build(texts, exact_below=len(texts) + 1)
+    embed_seconds = time.perf_counter() - started
+    vectors = [index.embedder.embed(query) for query in queries]
+
+    exact_ms: List[float] = []
+    expected: List[set] = []
+    for query in queries:
+        started = time.perf_counter()
+        hits = index.search_exact(query, args.top_k)
+        exact_ms.append((time.perf_counter() - started) * 1000.0)
+        expected.append({doc for doc, _ in hits})
+
+    configs = []
+    for raw in args.lsh.split(","):
+        tables, bits = _config(raw)
+        started = time.perf_counter()
+        index.lsh = LSHIndex.build(index.vectors, tables=tables, bits=bits, seed=index.embedder.seed)
+        index.lsh.probe = not args.no_probe
+        build_seconds = time.perf_counter() - started
+        lsh_ms: List[float] = []
+        recalls: List[float] = []
+        for query, wanted in zip(queries, expected):
+            started = time.perf_counter()
+            found = {doc for doc, _ in index.search(query, args.top_k)}
+            lsh_ms.append((time.perf_counter() - started) * 1000.0)
+            if wanted:
+                recalls.append(len(wanted & found) / len(wanted))
+        candidates = [len(index.lsh.candidates(vector)) for vector in vectors]
+        configs.append(
+            {
+                "tables": tables,
+                "bits": bits,
+                "probe": not args.no_probe,
+                "build_seconds": round(build_seconds, 2),
+                **_latency(lsh_ms),
+                "recall_at_k": round(statistics.fmean(recalls), 4) if recalls else None,
+                "candidate_fraction": round(statistics.fmean(candidates) / args.chunks, 4),
+            }
+        )
+
+    report = {
+        "chunks": args.chunks,
+        "queries": args.queries,
+        "top_k": args.top_k,
+        "embed_seconds": round(embed_seconds, 2),
+        "exact": _latency(exact_ms),
+        "lsh": configs,
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""Compare the TF-IDF inverted index with the BM25 engine on a synthetic corpus.
+
+Generates ``--chunks`` chunks from a Zipf-distributed vocabulary, builds both
+engines, and prints a JSON report with build time, retained index memory
+(tracemalloc) and single-query throughput. The query cache is disabled so every
+query is scored.
+
+    PYTHONPATH=src python benchmarks/rag_engines.py --chunks 100000 --queries 2000
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List, Sequence, Tuple
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT / "src") not in sys.path:
+    sys.path.insert(0, str(ROOT / "src"))
+
+from karpenter_ai_agent.rag.bm25 import BM25Index  # noqa: E402
+from karpenter_ai_agent.rag.embedder import tokenize  # noqa: E402
+from karpenter_ai_agent.rag.engine import InvertedIndex  # noqa: E402
+
+
+def _vocabulary(size: int, rng: random.Random) -> List[str]:
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    words = set()
+    while len(words) < size:
+        words.add("".join(rng.choice(letters) for _ in range(rng.randint(4, 10))))
+    return sorted(words)
+
+
+def synthetic_corpus(chunks: int, vocabulary: int, seed: int) -> List[Tuple[str, str]]:
+    """``(title, body)`` pairs; bodies are 60-120 Zipf-sampled words, like a 700-char chunk."""
+    rng = random.Random(seed)
+    words = _vocabulary(vocabulary, rng)
+    weights = [1.0 / rank for rank in range(1, len(words) + 1)]
+    titles = [" ".join(rng.choices(words[:2000], k=3)).title() for _ in range(max(chunks // 20, 1))]
+    return [
+        (rng.choice(titles), " ".join(rng.choices(words, weights=weights, k=rng.randint(60, 120))))
+        for _ in range(chunks)
+    ]
+
+
+def synthetic_queries(corpus: Sequence[Tuple[str, str]], count: int, seed: int) -> List[str]:
+    rng = random.Random(seed + 1)
+    queries = []
+    for _ in range(count):
+        title, body = rng.choice(corpus)
+        words = body.split()
+        queries.append(" ".join(rng.sample(words, k=min(len(words), rng.randint(2, 5)))))
+    return queries
+
+
+def _measure(build: Callable[[], object]) -> Tuple[object, Dict[str, float]]:
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    started = time.perf_counter()
+    engine = build()
+    elapsed = time.perf_counter() - started
+    gc.collect()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return engine, {
+        "build_seconds": round(elapsed, 2),
+        "index_mib": round((retained - before) / 2**20, 1),
+        "build_peak_mib": round((peak - before) / 2**20, 1),
+    }
+
+
+def _throughput(search: Callable[[str, int], object], queries: Sequence[str], top_k: int) -> Dict[str, float]:
+    started = time.perf_counter()
+    for query in queries:
+        search(query, top_k)
+    elapsed = time.perf_counter() - started
+    return {"qps": round(len(queries) / elapsed, 1), "mean_ms": round(elapsed / len(queries) * 1000, 3)}
+
+
+def main(argv: List[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--chunks", type=int, default=100_000)
+    parser.add_argument("--vocabulary", type=int, default=50_000)
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--top-k", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args(argv)
+
+    corpus = synthetic_corpus(args.chunks, args.vocabulary, args.seed)
+    queries = synthetic_queries(corpus, args.queries, args.seed)
+    texts = [f"{title} {body}" for title, body in corpus]
+
+    results: Dict[str, Dict[str, float]] = {}
+    tfidf, results["tfidf"] = _measure(lambda: InvertedIndex.build(texts, tokenize))
+    tfidf.cache = None
+    results["tfidf"].update(_throughput(tfidf.search, queries, args.top_k))
+    del tfidf
+
+    bm25, results["bm25"] = _measure(lambda: BM25Index.build(corpus, tokenize))
+    bm25.cache = None
+    results["bm25"].update(_throughput(bm25.search, queries, args.top_k))
+    results["bm25"]["postings"] = len(bm25.docs)
+
+    print(json.dumps({"chunks": args.chunks, "queries": args.queries, "engines": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,333 @@
+"""Retrieval quality, latency and memory of every backend on the golden queries.
+
+``golden_queries.json`` holds one issue per ``rule_id`` with the source URLs a
+correct answer should cite from each corpus (``docs/karpenter`` for the explain
+stage, ``docs/knowledge`` for the knowledge store). Each issue is turned into a
+query with that corpus's own ``build_issue_query``, and each backend is scored
+on:
+
+- ``recall@k``: share of the expected URLs cited by the top-k chunks;
+- ``mrr``: reciprocal rank of the first chunk with an expected URL (within
+  ``--depth``, 0 if none);
+- ``p50_ms`` / ``p99_ms``: single-query latency with the query cache disabled;
+- ``index_mib``: retained index memory (tracemalloc for the lexical engines,
+  array sizes for dense; hybrid is tfidf plus dense).
+
+Backends: ``tfidf`` and ``bm25`` (posting-list scoring), ``precomputed`` (the
+queries scored at build time and served by ``InvertedIndex.lookup``, as the
+explain stage does for each rule), ``sparse`` (the SciPy CSR scorer used for
+batched searches), ``artifact`` (the tfidf index written to and searched from
+a memory-mapped artifact; ``index_mib`` is its file size), ``dense`` and
+``hybrid``. ``build_seconds`` and ``index_mib`` of the derived backends include
+the tfidf index they start from.
+
+Every corpus is measured as shipped and scaled ``--scale`` times with
+synthetic distractor chunks. A distractor mixes words from a real chunk with
+Zipf-sampled filler, under a synthetic URL, so it competes on the same terms
+but never counts as relevant. ``ranks`` records each rule's first relevant
+rank, so a diff of two ``--output`` files shows which rules moved. Dense and
+hybrid need numpy, and sparse needs SciPy; they are skipped without them.
+
+    PYTHONPATH=src python benchmarks/rag_quality.py --scale 1000 --output rag-quality.json
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import itertools
+import json
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+ROOT = Path(__file__).resolve().parents[1]
+for path in (ROOT / "src", Path(__file__).resolve().parent):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+from karpenter_ai_agent.rag.artifact import open_artifact, write_artifact  # noqa: E402
+from karpenter_ai_agent.rag.bm25 import BM25Index  # noqa: E402
+from karpenter_ai_agent.rag.dense import DenseIndex, dense_available  # noqa: E402
+from karpenter_ai_agent.rag.embedder import tokenize  # noqa: E402
+from karpenter_ai_agent.rag.engine import InvertedIndex, Tokenizer  # noqa: E402
+from karpenter_ai_agent.rag.index import DEFAULT_HYBRID_ALPHA, InMemoryVectorIndex  # noqa: E402
+from karpenter_ai_agent.rag.loader import DEFAULT_DOCS_PATH, chunk_documents, load_markdown_documents  # noqa: E402
+from karpenter_ai_agent.rag.models import Chunk  # noqa: E402
+from karpenter_ai_agent.rag.retrieve import build_issue_query as knowledge_issue_query  # noqa: E402
+from karpenter_ai_agent.rag.sparse import SparseScorer, sparse_available  # noqa: E402
+from karpenter_ai_agent.rag.store import DEFAULT_KNOWLEDGE_PATH, _load_chunks, _tokenize  # noqa: E402
+from karpenter_ai_agent.rag.tool import build_issue_query as karpenter_issue_query  # noqa: E402
+from rag_engines import _measure, _vocabulary  # noqa: E402
+
+GOLDEN_PATH = Path(__file__).resolve().parent / "golden_queries.json"
+BACKENDS = ("tfidf", "bm25", "precomputed", "sparse", "artifact", "dense", "hybrid")
+# Backends derived from the tfidf index.
+_TFIDF_BASED = {"tfidf", "precomputed", "sparse", "artifact", "hybrid"}
+
+Search = Callable[[str, int], List[Tuple[int, float]]]
+
+
+def _karpenter_chunks() -> List[Chunk]:
+    return chunk_documents(load_markdown_documents(DEFAULT_DOCS_PATH))
+
+
+def _knowledge_chunks() -> List[Chunk]:
+    return _load_chunks(DEFAULT_KNOWLEDGE_PATH, 800)
+
+
+# name -> (chunks, tokenizer, issue query builder), matching how the app queries each corpus.
+CORPORA: Dict[str, Tuple[Callable[[], List[Chunk]], Tokenizer, Callable[[Any], str]]] = {
+    "karpenter": (_karpenter_chunks, tokenize, karpenter_issue_query),
+    "knowledge": (_knowledge_chunks, _tokenize, knowledge_issue_query),
+}
+
+
+def load_golden(path: Path = GOLDEN_PATH) -> List[Dict[str, Any]]:
+    return json.loads(path.read_text(encoding="utf-8"))["queries"]
+
+
+def golden_issue(entry: Dict[str, Any]) -> SimpleNamespace:
+    fields = ("rule_id", "category", "message", "recommendation", "resource_kind", "resource_name")
+    return SimpleNamespace(**{name: entry[name] for name in fields}, metadata={"field": entry["field"]})
+
+
+def scaled_corpus(chunks: Sequence[Chunk], scale: int, seed: int) -> List[Chunk]:
+    """The real chunks followed by ``(scale - 1) * len(chunks)`` distractors."""
+    if scale <= 1 or not chunks:
+        return list(chunks)
+    rng = random.Random(seed)
+    filler = _vocabulary(20_000, rng)
+    cumulative = list(itertools.accumulate(1.0 / rank for rank in range(1, len(filler) + 1)))
+    real_words = [chunk.text.split() for chunk in chunks]
+    scaled = list(chunks)
+    for number in range((scale - 1) * len(chunks)):
+        words = real_words[rng.randrange(len(real_words))]
+        length = rng.randint(60, 120)
+        shared = int(length * rng.uniform(0.1, 0.4))
+        body = rng.choices(words, k=shared) + rng.choices(filler, cum_weights=cumulative, k=length - shared)
+        rng.shuffle(body)
+        scaled.append(
+            Chunk(
+                chunk_id=f"synthetic-{number}",
+                doc_id=f"synthetic-{number // 8}",
+                title=" ".join(rng.choices(filler[:2000], k=3)).title(),
+                source_url=f"https://example.invalid/synthetic/{number // 8}",
+                text=" ".join(body),
+            )
+        )
+    return scaled
+
+
+def _traced(build: Callable[[], Any]) -> Tuple[Any, Dict[str, float]]:
+    index, measured = _measure(build)
+    return index, {"build_seconds": measured["build_seconds"], "index_mib": measured["index_mib"]}
+
+
+def _dense(texts: Sequence[str]) -> Tuple[DenseIndex, Dict[str, float]]:
+    # Embedding is pure Python per text, and tracemalloc would slow it several-fold.
+    started = time.perf_counter()
+    dense = DenseIndex.build(texts)
+    elapsed = time.perf_counter() - started
+    return dense, {"build_seconds": round(elapsed, 2), "index_mib": round(dense.memory_bytes() / 2**20, 1)}
+
+
+def backend_available(name: str) -> bool:
+    if name in ("dense", "hybrid"):
+        return dense_available()
+    if name == "sparse":
+        return sparse_available()
+    return True
+
+
+def _plus(base: Dict[str, float], extra: Dict[str, float]) -> Dict[str, float]:
+    return {key: round(base[key] + extra[key], 2) for key in base}
+
+
+def _precomputed(engine: InvertedIndex, queries: Sequence[str], top_k: int) -> Search:
+    engine.precompute({query: query for query in queries}, top_k)
+
+    def search(query: str, k: int) -> List[Tuple[int, float]]:
+        hits = engine.lookup(query, query, k)
+        return engine.search(query, k) if hits is None else hits
+
+    return search
+
+
+def _sparse(engine: InvertedIndex) -> Search:
+    scorer = SparseScorer.from_postings(engine.postings, engine.size)
+    return lambda query, k: scorer.search_many([engine.query_vector(query)], k)[0]
+
+
+def _artifact(
+    engine: InvertedIndex, chunks: Sequence[Chunk], tokenizer: Tokenizer
+) -> Tuple[Search, Dict[str, float]]:
+    started = time.perf_counter()
+    with tempfile.TemporaryDirectory() as directory:
+        target = Path(directory) / "benchmark.idx"
+        write_artifact(target, chunks, engine, manifest={})
+        size = target.stat().st_size
+        # The mapping outlives the file, as it does when an artifact is rebuilt under a worker.
+        _, mapped, _ = open_artifact(target, tokenizer)
+    elapsed = time.perf_counter() - started
+    mapped.cache = None
+    return mapped.search, {"build_seconds": round(elapsed, 2), "index_mib": round(size / 2**20, 1)}
+
+
+def build_backends(
+    names: Sequence[str],
+    chunks: Sequence[Chunk],
+    tokenizer: Tokenizer,
+    queries: Sequence[str] = (),
+    top_k: int = 10,
+) -> Dict[str, Tuple[Search, Dict[str, float]]]:
+    """``name -> (search, build stats)``; derived backends reuse the tfidf and dense indexes.
+
+    ``precomputed`` scores ``queries`` to depth ``top_k`` at build time; any
+    other query is searched live.
+    """
+    texts = [f"{chunk.title} {chunk.text}" for chunk in chunks]
+    built: Dict[str, Tuple[Search, Dict[str, float]]] = {}
+    engine = dense = None
+    if _TFIDF_BASED & set(names):
+        engine, stats = _traced(lambda: InvertedIndex.build(texts, tokenizer))
+        engine.cache = None
+        built["tfidf"] = (engine.search, stats)
+    if "sparse" in names:
+        search, stats = _traced(lambda: _sparse(engine))
+        built["sparse"] = (search, _plus(built["tfidf"][1], stats))
+    if "artifact" in names:
+        search, stats = _artifact(engine, chunks, tokenizer)
+        built["artifact"] = (search, {**stats, "build_seconds": _plus(built["tfidf"][1], stats)["build_seconds"]})
+    # After the artifact, so it is written without the benchmark queries.
+    if "precomputed" in names:
+        search, stats = _traced(lambda: _precomputed(engine, queries, top_k))
+        built["precomputed"] = (search, _plus(built["tfidf"][1], stats))
+    if "bm25" in names:
+        bm25, stats = _traced(lambda: BM25Index.build([(chunk.title, chunk.text) for chunk in chunks], tokenizer))
+        bm25.cache = None
+        built["bm25"] = (bm25.search, stats)
+    if {"dense", "hybrid"} & set(names):
+        dense, stats = _dense(texts)
+        built["dense"] = (dense.search, stats)
+    if "hybrid" in names:
+        index = InMemoryVectorIndex(chunks=chunks, engine=engine, dense=dense, mode="hybrid", alpha=DEFAULT_HYBRID_ALPHA)
+        built["hybrid"] = (index._hits, _plus(built["tfidf"][1], built["dense"][1]))
+    return {name: built[name] for name in names}
+
+
+def _percentile(ordered: Sequence[float], fraction: float) -> float:
+    return ordered[min(int(round(fraction * (len(ordered) - 1))), len(ordered) - 1)]
+
+
+def evaluate(
+    search: Search,
+    chunks: Sequence[Chunk],
+    queries: Sequence[Tuple[str, str, Sequence[str]]],
+    ks: Sequence[int] = (1, 3, 5),
+    depth: int = 10,
+    repeat: int = 1,
+) -> Dict[str, Any]:
+    """Quality and latency of ``search`` over ``(rule_id, query, expected URLs)`` triples."""
+    recalls: Dict[int, List[float]] = {k: [] for k in ks}
+    reciprocal: List[float] = []
+    ranks: Dict[str, Optional[int]] = {}
+    latencies: List[float] = []
+    for rule_id, query, expected in queries:
+        hits: List[Tuple[int, float]] = []
+        for _ in range(max(repeat, 1)):
+            started = time.perf_counter()
+            hits = search(query, max(depth, *ks))
+            latencies.append((time.perf_counter() - started) * 1000.0)
+        urls = [chunks[doc].source_url for doc, _ in hits]
+        wanted = set(expected)
+        for k in ks:
+            recalls[k].append(len(wanted & set(urls[:k])) / len(wanted))
+        rank = next((position for position, url in enumerate(urls[:depth], 1) if url in wanted), None)
+        ranks[rule_id] = rank
+        reciprocal.append(1.0 / rank if rank else 0.0)
+    ordered = sorted(latencies)
+    return {
+        **{f"recall@{k}": round(statistics.fmean(values), 4) for k, values in recalls.items()},
+        "mrr": round(statistics.fmean(reciprocal), 4),
+        "p50_ms": round(_percentile(ordered, 0.50), 3),
+        "p99_ms": round(_percentile(ordered, 0.99), 3),
+        "ranks": ranks,
+    }
+
+
+def run(
+    corpora: Sequence[str],
+    backends: Sequence[str],
+    scale: int,
+    ks: Sequence[int] = (1, 3, 5),
+    depth: int = 10,
+    repeat: int = 20,
+    seed: int = 7,
+    golden_path: Path = GOLDEN_PATH,
+) -> Dict[str, Any]:
+    golden = load_golden(golden_path)
+    available = [name for name in backends if backend_available(name)]
+    report: Dict[str, Any] = {
+        "golden": {
+            "queries": len(golden),
+            "sha256": hashlib.sha256(golden_path.read_bytes()).hexdigest()[:16],
+        },
+        "params": {"ks": list(ks), "depth": depth, "repeat": repeat, "scale": scale, "seed": seed},
+        "skipped": sorted(set(backends) - set(available)),
+        "corpora": {},
+    }
+    for corpus in corpora:
+        load, tokenizer, build_query = CORPORA[corpus]
+        queries = [
+            (entry["rule_id"], build_query(golden_issue(entry)), entry["expected"][corpus])
+            for entry in golden
+        ]
+        shipped = load()
+        variants = {"shipped": shipped}
+        if scale > 1:
+            variants[f"x{scale}"] = scaled_corpus(shipped, scale, seed)
+        report["corpora"][corpus] = {}
+        for variant, chunks in variants.items():
+            results: Dict[str, Any] = {}
+            top_k = max(depth, *ks)
+            built = build_backends(available, chunks, tokenizer, [query for _, query, _ in queries], top_k)
+            for name, (search, stats) in built.items():
+                results[name] = {**stats, **evaluate(search, chunks, queries, ks, depth, repeat)}
+            report["corpora"][corpus][variant] = {"chunks": len(chunks), "backends": results}
+    return report
+
+
+def main(argv: List[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--corpora", default=",".join(CORPORA), help="Comma-separated: karpenter,knowledge")
+    parser.add_argument("--backends", default=",".join(BACKENDS), help=f"Comma-separated: {','.join(BACKENDS)}")
+    parser.add_argument("--scale", type=int, default=1000, help="Synthetic corpus size as a multiple of the shipped one")
+    parser.add_argument("--ks", default="1,3,5", help="Comma-separated k values for recall@k")
+    parser.add_argument("--depth", type=int, default=10, help="Ranks searched for MRR")
+    parser.add_argument("--repeat", type=int, default=20, help="Timed runs per query")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", type=Path, help="Also write the JSON report here")
+    args = parser.parse_args(argv)
+
+    report = run(
+        corpora=[name for name in args.corpora.split(",") if name],
+        backends=[name for name in args.backends.split(",") if name],
+        scale=args.scale,
+        ks=[int(k) for k in args.ks.split(",")],
+        depth=args.depth,
+        repeat=args.repeat,
+        seed=args.seed,
+    )
+    encoded = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        args.output.write_text(encoded + "\n", encoding="utf-8")
+    print(encoded)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,26 @@
 import os
 import re
 import json
+import hashlib
 import requests
-from dataclasses import asdict
-from typing import Optional, List
+from typing import Callable, Generator, Iterator, Optional, List
 from models import Issue, IssueExplanation
+from karpenter_ai_agent.llm.prompt import build_summary_prompt
+from karpenter_ai_agent.llm.summary_cache import SummaryCache, summary_fingerprint
+from karpenter_ai_agent.llm.resilience import (
+    CircuitBreaker,
+    Deadline,
+    LLMUnavailable,
+    post_with_retries,
+)
+from karpenter_ai_agent.metrics import METRICS
+from karpenter_ai_agent.models import AnalysisReport
 from karpenter_ai_agent.rag.models import RetrievedChunk
 from karpenter_ai_agent.rag.prompts import EXPLANATION_SYSTEM_PROMPT, build_issue_prompt
 
 SYSTEM_PROMPT = """You are an expert AWS cost optimization consultant specializing in Kubernetes and Karpenter.
 
-You receive a JSON payload describing Karpenter Provisioner / NodePool / EC2NodeClass analysis (region, a summary object, and a list of issues). Your job is to write a short, human-readable report.
+You receive a JSON payload describing Karpenter Provisioner / NodePool / EC2NodeClass analysis (region, a summary object, and a list of grouped issues). Your job is to write a short, human-readable report.
 
 The JSON you receive has this shape:
 {
@@ -27,7 +37,8 @@ The JSON you receive has this shape:
     "health_score_max": int,
     "ec2_nodeclass_count": int
   },
-  "issues": [ ... ]   // list of issue objects with provisioner_name, severity, category, message, recommendation, etc.
+  "issues": [ ... ],  // grouped findings: severity, category, message, recommendation, resource_kind, field, and "resources" (the affected provisioner / nodepool / EC2NodeClass names)
+  "omitted_issues": {"high": int, "medium": int, "low": int}   // optional; only present when some findings were left out for length
 }
 
 HARD FORMATTING RULES (FOLLOW STRICTLY):
@@ -44,6 +55,8 @@ STRICT CORRECTNESS RULES (VERY IMPORTANT):
 - Do NOT generalize ttlSecondsAfterEmpty or other settings across provisioners unless an issue explicitly mentions that setting for those provisioners.
 - If only some provisioners are affected by an issue, name exactly those provisioners (do not add more).
 - You may aggregate multiple issue entries into a single bullet, but you MUST NOT change which provisioners or resources are affected.
+- Each issue entry applies to every name in its 'resources' list. If 'more_resources' is present, say that additional resources are affected without inventing their names.
+- If 'omitted_issues' is present, some lower-priority findings were left out of the input. Do not guess at them; note that the full list is in the report.
 - Avoid duplicate bullets that say the same thing. Each distinct problem should appear once, possibly mentioning multiple provisioners in one bullet.
 - You MUST keep your counts consistent with the 'summary.issues_by_severity' object. If it says 6 high / 5 medium / 1 low, your prose must reflect that (and not 11 vs 12, etc.).
 - Do NOT mention any monthly spend values or dollar amounts. The input does not contain a reliable cost estimate; focus only on configuration and relative cost impact.
@@ -72,6 +85,30 @@ Do not include any YAML or configuration examples in your response.
 """
 
 
+SUMMARY_MODEL = "llama-3.3-70b-versatile"
+# Changes to the system prompt invalidate cached summaries automatically.
+SUMMARY_PROMPT_VERSION = hashlib.sha256(SYSTEM_PROMPT.encode("utf-8")).hexdigest()[:12]
+
+# Summaries for identical findings are reused instead of spending provider quota.
+SUMMARY_CACHE = SummaryCache.from_env()
+
+BASE_URL_ENV = "LLM_BASE_URL"
+DEFAULT_BASE_URL = "https://api.groq.com/openai/v1"
+
+# Shared by every LLM call in the process: while Groq is unhealthy, calls are
+# skipped instead of each waiting out its own timeout.
+LLM_BREAKER = CircuitBreaker(failure_threshold=3, reset_timeout=30.0)
+
+# "llm" (default) calls the provider and falls back to the template summary when
+# it cannot; "template" never calls the provider (offline / air-gapped installs).
+SUMMARY_MODE_ENV = "AI_SUMMARY_MODE"
+SUMMARY_MODES = ("llm", "template")
+
+LLM_UNAVAILABLE_MESSAGE = (
+    "AI analysis skipped: the AI provider is unavailable or the request budget was used up."
+)
+
+
 def _sanitize_ai_text(text: str) -> str:
     """
     Post-process the model output to strip any code/YAML blocks or
@@ -131,74 +168,263 @@ def _parse_issue_explanation(text: str) -> IssueExplanation:
     return IssueExplanation(why_matters=why_matters, what_to_change=change_lines)
 
 
+def _chat_completions_url() -> str:
+    """OpenAI-compatible endpoint; LLM_BASE_URL points at a local stub or proxy."""
+    base_url = os.environ.get(BASE_URL_ENV, "").strip() or DEFAULT_BASE_URL
+    return f"{base_url.rstrip('/')}/chat/completions"
+
+
 def is_llm_enabled() -> bool:
     return bool(os.environ.get("GROQ_API_KEY"))
 
 
-def call_free_model(region: str, summary: dict, issues: list) -> str:
+def summary_mode() -> str:
+    mode = os.environ.get(SUMMARY_MODE_ENV, "").strip().lower()
+    return mode if mode in SUMMARY_MODES else "llm"
+
+
+def llm_circuit_open() -> bool:
+    return LLM_BREAKER.is_open
+
+
+def is_llm_available() -> bool:
+    """LLM is configured and the provider circuit is not currently open."""
+    return is_llm_enabled() and not llm_circuit_open()
+
+
+def summary_cache_key(report: AnalysisReport) -> str:
+    # The endpoint is part of the key so stub or replayed summaries are never
+    # served once the real provider is configured.
+    return summary_fingerprint(
+        report,
+        model=SUMMARY_MODEL,
+        prompt_version=SUMMARY_PROMPT_VERSION,
+        endpoint=_chat_completions_url(),
+    )
+
+
+def _summary_payload(
+    region: str,
+    summary: dict,
+    issues: list,
+    *,
+    max_input_tokens: Optional[int] = None,
+    stream: bool = False,
+) -> dict:
+    prompt = build_summary_prompt(
+        region,
+        summary,
+        issues,
+        system_prompt=SYSTEM_PROMPT,
+        max_input_tokens=max_input_tokens,
+    )
+    METRICS.observe("llm.summary.input_tokens", prompt.input_tokens)
+    if prompt.compacted:
+        METRICS.increment("llm.summary.compacted")
+
+    payload = {
+        "model": SUMMARY_MODEL,
+        "messages": prompt.messages(),
+        "max_tokens": 900,
+        "temperature": 0.2,
+    }
+    if stream:
+        payload["stream"] = True
+    return payload
+
+
+def _iter_stream_deltas(
+    response, seen: List[str], deadline: Optional[Deadline] = None
+) -> Generator[str, None, bool]:
+    """Yield content deltas from an OpenAI-compatible SSE completion stream.
+
+    Each delta is also appended to ``seen`` before it is yielded. Returns True only if the stream ended with ``data: [DONE]`` after a
+    ``finish_reason`` of ``stop``: not when the server closed early or the
+    answer was cut off at ``max_tokens``. Raises ``requests.exceptions.ReadTimeout``
+    once ``deadline`` has expired, however fast the lines still arrive.
+    """
+    finish_reason = None
+    for line in response.iter_lines(decode_unicode=True):
+        if deadline is not None and deadline.expired:
+            raise requests.exceptions.ReadTimeout("LLM request budget used up while streaming")
+        if not line or not line.startswith("data:"):
+            continue
+        data = line[len("data:"):].strip()
+        if data == "[DONE]":
+            return finish_reason == "stop"
+        try:
+            choice = json.loads(data)["choices"][0]
+            finish_reason = choice.get("finish_reason") or finish_reason
+            delta = choice.get("delta", {}).get("content")
+        except (KeyError, json.JSONDecodeError, IndexError, AttributeError):
+            continue
+        if delta:
+            seen.append(delta)
+            yield delta
+    return False
+
+
+def call_free_model(
+    region: str,
+    summary: dict,
+    issues: list,
+    *,
+    max_input_tokens: Optional[int] = None,
+    deadline: Optional[Deadline] = None,
+    fallback: Optional[Callable[[], str]] = None,
+    cache_key: Optional[str] = None,
+) -> str:
     """
     Call the Groq API with Llama 3.3 model for AI analysis.
 
     Args:
         region: AWS region
         summary: Analysis summary dictionary (plain dict, not dataclass)
-        issues: List of detected issues (list of plain dicts, not dataclass objects)
+        issues: List of detected issues (plain dicts or Issue objects)
+        max_input_tokens: Prompt token ceiling; defaults to LLM_SUMMARY_MAX_INPUT_TOKENS
+        deadline: Shared latency budget; bounds every attempt and retry
+        fallback: Returns a summary to use instead whenever the provider does
+            not produce one (key unset, open circuit, spent budget, error status)
+        cache_key: summary_cache_key(report); successful summaries are cached under it
 
     Returns:
         The AI-generated analysis report as a string
     """
+    if cache_key:
+        cached = SUMMARY_CACHE.get(cache_key)
+        if cached is not None:
+            return cached
+
     api_key = os.environ.get("GROQ_API_KEY")
 
     if not api_key:
-        return "GROQ_API_KEY not set"
-
-    url = "https://api.groq.com/openai/v1/chat/completions"
-
-    payload = {
-        "model": "llama-3.3-70b-versatile",
-        "messages": [
-            {"role": "system", "content": SYSTEM_PROMPT},
-            {
-                "role": "user",
-                "content": json.dumps(
-                    {
-                        "region": region,
-                        "summary": summary,
-                        "issues": issues,
-                    },
-                    indent=2,
-                ),
-            },
-        ],
-        "max_tokens": 900,
-        "temperature": 0.2,
-    }
+        return fallback() if fallback else "GROQ_API_KEY not set"
 
+    url = _chat_completions_url()
+    payload = _summary_payload(region, summary, issues, max_input_tokens=max_input_tokens)
     headers = {
         "Authorization": f"Bearer {api_key}",
         "Content-Type": "application/json",
     }
 
     try:
-        response = requests.post(url, json=payload, headers=headers, timeout=60)
+        response = post_with_retries(
+            url,
+            json=payload,
+            headers=headers,
+            timeout_cap=60,
+            deadline=deadline,
+            breaker=LLM_BREAKER,
+        )
 
         if response.status_code != 200:
+            if fallback:
+                return fallback()
             return f"HTTP {response.status_code}: {response.text[:200]}"
 
         raw = response.json()["choices"][0]["message"]["content"]
-        return _sanitize_ai_text(raw)
+        text = _sanitize_ai_text(raw)
+        if cache_key:
+            SUMMARY_CACHE.put(cache_key, text)
+        return text
 
+    except LLMUnavailable:
+        return fallback() if fallback else LLM_UNAVAILABLE_MESSAGE
     except requests.exceptions.Timeout:
-        return "AI analysis timed out. Please try again."
+        return fallback() if fallback else "AI analysis timed out. Please try again."
     except requests.exceptions.RequestException as e:
-        return f"Request failed: {str(e)}"
+        return fallback() if fallback else f"Request failed: {str(e)}"
     except (KeyError, json.JSONDecodeError, IndexError) as e:
-        return f"Response parsing failed: {str(e)}"
+        return fallback() if fallback else f"Response parsing failed: {str(e)}"
+
+
+def stream_free_model(
+    region: str,
+    summary: dict,
+    issues: list,
+    *,
+    max_input_tokens: Optional[int] = None,
+    deadline: Optional[Deadline] = None,
+    fallback: Optional[Callable[[], str]] = None,
+    cache_key: Optional[str] = None,
+) -> Iterator[str]:
+    """
+    Streaming variant of call_free_model.
+
+    Yields raw content deltas as the model produces them. Failures before the
+    first delta are yielded as a single message, matching call_free_model's
+    error strings (or the fallback summary when one is given); a stream that
+    breaks or outlives ``deadline`` after deltas were yielded just ends there,
+    and the partial summary is not cached. Callers should run the
+    joined text through _sanitize_ai_text once the stream ends. A cached
+    summary is yielded as a single chunk.
+    """
+    if cache_key:
+        cached = SUMMARY_CACHE.get(cache_key)
+        if cached is not None:
+            yield cached
+            return
+
+    api_key = os.environ.get("GROQ_API_KEY")
+
+    if not api_key:
+        yield fallback() if fallback else "GROQ_API_KEY not set"
+        return
+
+    url = _chat_completions_url()
+    payload = _summary_payload(
+        region, summary, issues, max_input_tokens=max_input_tokens, stream=True
+    )
+    headers = {
+        "Authorization": f"Bearer {api_key}",
+        "Content-Type": "application/json",
+        "Accept": "text/event-stream",
+    }
+
+    parts: List[str] = []
+    try:
+        # Retries only cover connecting; once tokens flow the stream is not restarted.
+        response = post_with_retries(
+            url,
+            json=payload,
+            headers=headers,
+            timeout_cap=60,
+            deadline=deadline,
+            breaker=LLM_BREAKER,
+            stream=True,
+        )
+        try:
+            if response.status_code != 200:
+                yield fallback() if fallback else f"HTTP {response.status_code}: {response.text[:200]}"
+                return
+            completed = yield from _iter_stream_deltas(response, parts, deadline)
+            # Only a summary the model finished is cached: never a cancelled,
+            # truncated or length-capped one.
+            if cache_key and parts and completed:
+                SUMMARY_CACHE.put(cache_key, _sanitize_ai_text("".join(parts)))
+        finally:
+            response.close()
+    except LLMUnavailable:
+        yield fallback() if fallback else LLM_UNAVAILABLE_MESSAGE
+    except requests.exceptions.RequestException as e:
+        if parts:
+            # Part of the summary is already shown; appending an error or a
+            # second summary to it would read worse than stopping here.
+            METRICS.increment("llm.summary.stream_interrupted")
+            return
+        if fallback:
+            yield fallback()
+        elif isinstance(e, requests.exceptions.Timeout):
+            yield "AI analysis timed out. Please try again."
+        else:
+            yield f"Request failed: {str(e)}"
 
 
 def generate_issue_explanation(
     issue: Issue,
     chunks: List[RetrievedChunk],
+    *,
+    deadline: Optional[Deadline] = None,
 ) -> Optional[IssueExplanation]:
     api_key = os.environ.get("GROQ_API_KEY")
     if not api_key:
@@ -214,7 +440,7 @@ def generate_issue_explanation(
         "field": issue.field,
     }
 
-    url = "https://api.groq.com/openai/v1/chat/completions"
+    url = _chat_completions_url()
     payload = {
         "model": "llama-3.3-70b-versatile",
         "messages": [
@@ -230,7 +456,14 @@ def generate_issue_explanation(
     }
 
     try:
-        response = requests.post(url, json=payload, headers=headers, timeout=45)
+        response = post_with_retries(
+            url,
+            json=payload,
+            headers=headers,
+            timeout_cap=45,
+            deadline=deadline,
+            breaker=LLM_BREAKER,
+        )
         if response.status_code != 200:
             return None
         raw = response.json()["choices"][0]["message"]["content"]
@@ -238,25 +471,67 @@ def generate_issue_explanation(
         if not cleaned:
             return None
         return _parse_issue_explanation(cleaned)
-    except requests.exceptions.RequestException:
+    except (LLMUnavailable, requests.exceptions.RequestException):
         return None
     except (KeyError, json.JSONDecodeError, IndexError):
         return None
 
 
-def generate_report(region: str, summary: dict, issues: List[Issue]) -> str:
+def generate_report(
+    region: str,
+    summary: dict,
+    issues: List[Issue],
+    *,
+    max_input_tokens: Optional[int] = None,
+    deadline: Optional[Deadline] = None,
+    fallback: Optional[Callable[[], str]] = None,
+    cache_key: Optional[str] = None,
+) -> str:
     """
     Generates AI analysis report using call_free_model.
-    Converts Issue dataclass objects to plain dicts before passing to call_free_model.
+    Issues are grouped and compacted by the prompt builder, so patch snippets
+    and explanations are never serialized into the prompt.
 
     Args:
         region: AWS region
         summary: Analysis summary dictionary
         issues: List of Issue dataclass objects
+        max_input_tokens: Optional prompt token ceiling
+        deadline: Optional shared latency budget for the request
+        fallback: Optional offline summary used when the LLM cannot be reached
+        cache_key: Optional summary cache key (see summary_cache_key)
 
     Returns:
         The AI-generated analysis report as a string
     """
-    summary_dict = summary
-    issues_list = [asdict(i) for i in issues]
-    return call_free_model(region, summary_dict, issues_list)
+    return call_free_model(
+        region,
+        summary,
+        issues,
+        max_input_tokens=max_input_tokens,
+        deadline=deadline,
+        fallback=fallback,
+        cache_key=cache_key,
+    )
+
+
+def stream_report(
+    region: str,
+    summary: dict,
+    issues: List[Issue],
+    *,
+    max_input_tokens: Optional[int] = None,
+    deadline: Optional[Deadline] = None,
+    fallback: Optional[Callable[[], str]] = None,
+    cache_key: Optional[str] = None,
+) -> Iterator[str]:
+    """Streaming counterpart of generate_report; yields content deltas."""
+    return stream_free_model(
+        region,
+        summary,
+        issues,
+        max_input_tokens=max_input_tokens,
+        deadline=deadline,
+        fallback=fallback,
+        cache_key=cache_key,
+    )
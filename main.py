@@ -1,11 +1,17 @@
 from fastapi import FastAPI, Request, UploadFile, File, Form
-from fastapi.responses import HTMLResponse, StreamingResponse
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import HTMLResponse, JSONResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
-from typing import List, Optional, Set
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple
+from contextlib import asynccontextmanager
 from io import StringIO
+import asyncio
+import json
+import logging
 import os
 import sys
+import threading
 
 SRC_PATH = os.path.join(os.path.dirname(__file__), "src")
 if SRC_PATH not in sys.path:
@@ -15,11 +21,25 @@ if SRC_PATH not in sys.path:
 from models import Issue, ProvisionerConfig, EC2NodeClassConfig
 from parser import parse_provisioner_yaml
 from rules import generate_summary
-from llm_client import generate_report
-from karpenter_ai_agent.agents import CoordinatorAgent, ParserAgent
+from llm_client import (
+    _sanitize_ai_text,
+    is_llm_available,
+    stream_report,
+    summary_cache_key,
+    summary_mode,
+)
+from karpenter_ai_agent.agents import CoordinatorAgent
 from karpenter_ai_agent.agents._adapters import to_legacy_provisioner, to_legacy_nodeclass
+from karpenter_ai_agent.jobs import Job, JobManager, JobQueueFull
+from karpenter_ai_agent.llm.resilience import Deadline
+from karpenter_ai_agent.llm.template_summary import build_template_summary
+from karpenter_ai_agent.metrics import process_memory
 from karpenter_ai_agent.models import AnalysisInput, AnalysisReport
+from karpenter_ai_agent.orchestration.graph import parser_agent
 from karpenter_ai_agent.rag.explain import attach_issue_explanations
+from karpenter_ai_agent.rag.incremental import start_knowledge_watcher, watch_interval
+from karpenter_ai_agent.rag.index import get_default_index
+from karpenter_ai_agent.rag.store import get_default_store
 from karpenter_ai_agent.remediation.bundler import (
     build_bundle_yaml,
     build_bundle_yaml_for_nodepool,
@@ -27,11 +47,59 @@ from karpenter_ai_agent.remediation.bundler import (
 )
 from karpenter_ai_agent.models.patches import PatchCategory
 
-app = FastAPI(title="Karpenter Optimization Agent")
+# uvicorn configures this logger, so startup lines show up next to its own.
+logger = logging.getLogger("uvicorn.error")
+
+
+def _load_rag_indexes() -> None:
+    """Map the prebuilt RAG indexes at startup and log this worker's memory around it.
+
+    The index pages are file-backed and shared by every worker mapping them, so
+    most of the growth should show up as ``file`` rather than ``private``.
+    """
+    before = process_memory()
+    get_default_store()
+    get_default_index()
+    after = process_memory()
+    logger.info(
+        "RAG indexes loaded (pid %d): rss %.1f -> %.1f MiB, private %.1f -> %.1f MiB, file-backed %.1f -> %.1f MiB",
+        os.getpid(),
+        before.get("rss", 0.0),
+        after.get("rss", 0.0),
+        before.get("private", 0.0),
+        after.get("private", 0.0),
+        before.get("file", 0.0),
+        after.get("file", 0.0),
+    )
+
+
+@asynccontextmanager
+async def _lifespan(_: FastAPI) -> AsyncIterator[None]:
+    _load_rag_indexes()
+    # Opt-in (RAG_KNOWLEDGE_WATCH_SECONDS): pick up docs/knowledge edits without a restart.
+    watcher = start_knowledge_watcher() if watch_interval() else None
+    try:
+        yield
+    finally:
+        if watcher is not None:
+            watcher.stop()
+        # Stop in-flight LLM jobs rather than leaving them mid-request on reload.
+        JOBS.shutdown(wait=False)
+
+
+app = FastAPI(title="Karpenter Optimization Agent", lifespan=_lifespan)
 
 # Holds the issues from the last successful analysis so we can export patches
 LAST_ISSUES: List[Issue] = []
 LAST_REPORT: Optional[AnalysisReport] = None
+# Background jobs fill in report fields after the page renders; exports read
+# the report under the same lock.
+REPORT_LOCK = threading.Lock()
+
+# LLM-backed work (AI summary, issue explanations) runs on a bounded worker pool
+# so slow provider calls never hold HTTP workers.
+JOBS = JobManager(max_workers=2, max_pending=16)
+JOB_BUSY_MESSAGE = "AI summary skipped: too many analyses in progress. Please retry shortly."
 
 os.makedirs("templates", exist_ok=True)
 os.makedirs("static", exist_ok=True)
@@ -54,6 +122,151 @@ def _parse_category_selection(request: Request) -> Set[PatchCategory]:
     return selected
 
 
+def _submit_job(kind: str, fn, *args: Any) -> Optional[Job]:
+    try:
+        return JOBS.submit(kind, fn, *args)
+    except JobQueueFull:
+        return None
+
+
+def _run_summary_job(
+    job: Job,
+    region: str,
+    summary: Dict[str, Any],
+    issues: List[Issue],
+    report: AnalysisReport,
+    deadline: Deadline,
+) -> str:
+    source = "llm"
+
+    def template_fallback() -> str:
+        nonlocal source
+        source = "template"
+        return build_template_summary(report)
+
+    if summary_mode() == "template":
+        tokens = iter([template_fallback()])
+    else:
+        tokens = stream_report(
+            region,
+            summary,
+            issues,
+            deadline=deadline,
+            fallback=template_fallback,
+            cache_key=summary_cache_key(report),
+        )
+
+    parts: List[str] = []
+    for token in tokens:
+        job.raise_if_cancelled()
+        parts.append(token)
+        job.publish(token)
+    text = _sanitize_ai_text("".join(parts))
+    with REPORT_LOCK:
+        report.ai_summary = text
+        report.raw["ai_summary_source"] = source
+    return text
+
+
+def _run_explanation_job(
+    job: Job,
+    issues: List[Issue],
+    deadline: Deadline,
+) -> List[Dict[str, Any]]:
+    attach_issue_explanations(
+        issues,
+        llm_available=True,
+        should_stop=lambda: job.cancel_requested,
+        deadline=deadline,
+    )
+    job.raise_if_cancelled()
+    return [
+        {
+            "index": index,
+            "why_matters": issue.explanation.why_matters,
+            "what_to_change": list(issue.explanation.what_to_change),
+        }
+        for index, issue in enumerate(issues)
+        if issue.explanation is not None
+    ]
+
+
+def _sse_event(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def _job_final_text(job: Job) -> str:
+    if job.status == "succeeded":
+        return job.result or ""
+    if job.status == "cancelled":
+        return "AI summary was cancelled."
+    return f"AI summary failed: {job.error}"
+
+
+async def _summary_events(job: Job) -> AsyncIterator[str]:
+    if job.finished:
+        yield _sse_event("done", _job_final_text(job))
+        return
+
+    offset = 0
+    completed = False
+    try:
+        while True:
+            finished = job.finished
+            progress = job.progress
+            while offset < len(progress):
+                yield _sse_event("token", progress[offset])
+                offset += 1
+            if finished:
+                break
+            await asyncio.sleep(0.05)
+        completed = True
+        yield _sse_event("done", _job_final_text(job))
+    finally:
+        # The browser went away mid-stream: stop spending provider quota on it.
+        if not completed:
+            JOBS.cancel(job.job_id)
+
+
+def _run_analysis(
+    combined_yaml: str,
+    region: str,
+    snapshot_yaml: Optional[str],
+    provisioners: List[ProvisionerConfig],
+    nodeclasses: List[EC2NodeClassConfig],
+) -> Tuple[AnalysisReport, List[ProvisionerConfig], List[EC2NodeClassConfig], List[Issue]]:
+    """Analysis for one upload; CPU-bound, so ``analyze`` runs it on the threadpool."""
+    report = CoordinatorAgent().run(
+        AnalysisInput(yaml_text=combined_yaml, region=region, snapshot_yaml=snapshot_yaml)
+    )
+
+    # Convert canonical config for UI details
+    parser_output = parser_agent.run(AnalysisInput(yaml_text=combined_yaml))
+    if parser_output.config:
+        provisioners = [to_legacy_provisioner(p) for p in parser_output.config.provisioners]
+        nodeclasses = [to_legacy_nodeclass(nc) for nc in parser_output.config.ec2_nodeclasses]
+
+    # Convert new issues to legacy Issue objects for templates
+    issues = [
+        Issue(
+            severity=i.severity,
+            category=i.category,
+            message=i.message,
+            recommendation=i.recommendation,
+            provisioner_name=i.resource_name,
+            resource_kind=i.resource_kind,
+            resource_name=i.resource_name,
+            patch_snippet=i.patch_snippet,
+            field=(i.metadata.get("field") if isinstance(i.metadata, dict) else None),
+        )
+        for i in report.issues
+    ]
+
+    # Docs citations are local and fast; LLM narratives run as a background job.
+    attach_issue_explanations(issues, llm_available=False)
+    return report, provisioners, nodeclasses, issues
+
+
 def _sort_issues(issues: List[Issue]) -> List[Issue]:
     severity_rank = {"high": 0, "medium": 1, "low": 2}
     return sorted(
@@ -69,7 +282,7 @@ def _sort_issues(issues: List[Issue]) -> List[Issue]:
 
 @app.get("/", response_class=HTMLResponse)
 async def home(request: Request):
-    return templates.TemplateResponse("form.html", {"request": request})
+    return templates.TemplateResponse(request, "form.html", {})
 
 
 @app.post("/analyze", response_class=HTMLResponse)
@@ -77,7 +290,10 @@ async def analyze(
     request: Request,
     region: str = Form(...),
     files: List[UploadFile] = File(...),
+    snapshot: Optional[UploadFile] = File(None),
 ):
+    # Latency budget shared by every LLM call made on behalf of this request
+    deadline = Deadline.from_env()
     all_provisioners: List[ProvisionerConfig] = []
     all_nodeclasses: List[EC2NodeClassConfig] = []
     parse_errors: List[str] = []
@@ -94,7 +310,7 @@ async def analyze(
             yaml_chunks.append(yaml_content)
 
             # New parser return type: (provisioners, ec2_nodeclasses)
-            provisioners, nodeclasses = parse_provisioner_yaml(yaml_content)
+            provisioners, nodeclasses = await run_in_threadpool(parse_provisioner_yaml, yaml_content)
             all_provisioners.extend(provisioners)
             all_nodeclasses.extend(nodeclasses)
         except Exception as e:
@@ -111,49 +327,31 @@ async def analyze(
                 "Failed to parse any valid Karpenter resources from the uploaded files."
             )
         return templates.TemplateResponse(
+            request,
             "results.html",
             {
-                "request": request,
                 "error": error_message,
                 "parse_errors": parse_errors,
                 "region": region,
             },
         )
 
-    # Run CoordinatorAgent on combined YAML (deterministic graph)
+    # Optional pod/node snapshot for the consolidation simulator
+    snapshot_yaml = None
+    if snapshot is not None and snapshot.filename:
+        try:
+            snapshot_yaml = (await snapshot.read()).decode("utf-8")
+        except UnicodeDecodeError as e:
+            parse_errors.append(f"Error reading {snapshot.filename}: {str(e)}")
+
+    # Run CoordinatorAgent on combined YAML (deterministic graph) off the event loop
     combined_yaml = "\n---\n".join(yaml_chunks)
-    coordinator = CoordinatorAgent()
-    report = coordinator.run(
-        AnalysisInput(
-            yaml_text=combined_yaml,
-            region=region,
-        )
+    report, all_provisioners, all_nodeclasses, issues = await run_in_threadpool(
+        _run_analysis, combined_yaml, region, snapshot_yaml, all_provisioners, all_nodeclasses
     )
-
-    # Convert canonical config for UI details
-    parser_agent = ParserAgent()
-    parser_output = parser_agent.run(AnalysisInput(yaml_text=combined_yaml))
-    if parser_output.config:
-        all_provisioners = [to_legacy_provisioner(p) for p in parser_output.config.provisioners]
-        all_nodeclasses = [to_legacy_nodeclass(nc) for nc in parser_output.config.ec2_nodeclasses]
-
-    # Convert new issues to legacy Issue objects for templates
-    issues = [
-        Issue(
-            severity=i.severity,
-            category=i.category,
-            message=i.message,
-            recommendation=i.recommendation,
-            provisioner_name=i.resource_name,
-            resource_kind=i.resource_kind,
-            resource_name=i.resource_name,
-            patch_snippet=i.patch_snippet,
-            field=(i.metadata.get("field") if isinstance(i.metadata, dict) else None),
-        )
-        for i in report.issues
-    ]
-
-    attach_issue_explanations(issues)
+    snapshot_error = (report.raw.get("consolidation") or {}).get("error")
+    if snapshot_error:
+        parse_errors.append(snapshot_error)
 
     # Store for download endpoint
     global LAST_ISSUES
@@ -169,25 +367,88 @@ async def analyze(
         "ec2_nodeclass_count": len(all_nodeclasses),
     }
 
-    # AI analysis via Groq
-    ai_analysis = generate_report(region, summary, issues)
-    report.ai_summary = ai_analysis
+    # AI analysis via Groq runs in the background and is streamed to the page
+    summary_job = _submit_job(
+        "summary", _run_summary_job, region, summary, issues, report, deadline
+    )
+    explanation_job = None
+    if is_llm_available():
+        explanation_job = _submit_job("explanations", _run_explanation_job, issues, deadline)
 
     return templates.TemplateResponse(
+        request,
         "results.html",
         {
-            "request": request,
             "region": region,
             "provisioners": all_provisioners,
             "ec2_nodeclasses": all_nodeclasses,
             "issues": issues,
             "summary": summary,
-            "ai_analysis": ai_analysis,
+            "ai_analysis": None if summary_job else JOB_BUSY_MESSAGE,
+            "ai_stream_url": (
+                f"/analyze/{summary_job.job_id}/summary/stream" if summary_job else None
+            ),
+            "summary_job_id": summary_job.job_id if summary_job else None,
+            "explanation_job_id": explanation_job.job_id if explanation_job else None,
             "parse_errors": parse_errors,
+            "consolidation": {
+                entry["nodepool"]: entry
+                for entry in (report.raw.get("consolidation") or {}).get("nodepools", [])
+            },
         },
     )
 
 
+@app.get("/analyze/{summary_id}/summary/stream")
+async def stream_summary(summary_id: str):
+    """
+    Stream the AI summary job for a previous /analyze call as server-sent events.
+    Emits "token" events as content arrives and a final "done" event carrying
+    the sanitized summary. Disconnecting mid-stream cancels the job.
+    """
+    job = JOBS.get(summary_id)
+    if job is None or job.kind != "summary":
+        return HTMLResponse("Unknown or expired summary.", status_code=404)
+
+    return StreamingResponse(
+        _summary_events(job),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.get("/jobs/{job_id}")
+async def job_status(job_id: str):
+    job = JOBS.get(job_id)
+    if job is None:
+        return JSONResponse({"error": "Unknown or expired job."}, status_code=404)
+    return JSONResponse(job.to_dict())
+
+
+@app.get("/jobs/{job_id}/result")
+async def job_result(job_id: str):
+    """
+    202 while the job is queued or running, 200 with the result once it
+    succeeds, and 409 if it failed or was cancelled.
+    """
+    job = JOBS.get(job_id)
+    if job is None:
+        return JSONResponse({"error": "Unknown or expired job."}, status_code=404)
+    if not job.finished:
+        return JSONResponse(job.to_dict(), status_code=202)
+    if job.status != "succeeded":
+        return JSONResponse(job.to_dict(), status_code=409)
+    return JSONResponse({**job.to_dict(), "result": job.result})
+
+
+@app.post("/jobs/{job_id}/cancel")
+async def cancel_job(job_id: str):
+    job = JOBS.get(job_id)
+    if job is None:
+        return JSONResponse({"error": "Unknown or expired job."}, status_code=404)
+    return JSONResponse({"cancelled": JOBS.cancel(job_id), "status": job.status})
+
+
 @app.get("/download-patches")
 async def download_patches():
     """
@@ -232,7 +493,8 @@ async def download_patch_bundle(request: Request):
         )
 
     include_categories = _parse_category_selection(request)
-    yaml_output = build_bundle_yaml(LAST_REPORT, include_categories)
+    with REPORT_LOCK:
+        yaml_output = build_bundle_yaml(LAST_REPORT, include_categories)
     if not yaml_output:
         return HTMLResponse(
             "No patch snippets match the selected categories.",
@@ -261,7 +523,8 @@ async def download_patch_bundle_nodepool(nodepool: str, request: Request):
         )
 
     include_categories = _parse_category_selection(request)
-    yaml_output = build_bundle_yaml_for_nodepool(LAST_REPORT, nodepool, include_categories)
+    with REPORT_LOCK:
+        yaml_output = build_bundle_yaml_for_nodepool(LAST_REPORT, nodepool, include_categories)
     if not yaml_output:
         return HTMLResponse(
             "No patch snippets match the selected categories or nodepool.",
@@ -292,20 +555,21 @@ async def download_report_html(request: Request):
     include_patches = request.query_params.get("include_patches", "1") in ("1", "true", "yes")
     issues_sorted = _sort_issues(LAST_ISSUES)
 
-    html = templates.get_template("report_export.html").render(
-        {
-            "region": LAST_REPORT.region,
-            "issues": issues_sorted,
-            "summary": {
-                "issues_by_severity": LAST_REPORT.issues_by_severity,
-                "optimization_status": LAST_REPORT.optimizer_flags,
-                "health_score": LAST_REPORT.health_score,
-                "health_score_max": 100,
-            },
-            "ai_analysis": LAST_REPORT.ai_summary or "",
-            "include_patches": include_patches,
-        }
-    )
+    with REPORT_LOCK:
+        html = templates.get_template("report_export.html").render(
+            {
+                "region": LAST_REPORT.region,
+                "issues": issues_sorted,
+                "summary": {
+                    "issues_by_severity": LAST_REPORT.issues_by_severity,
+                    "optimization_status": LAST_REPORT.optimizer_flags,
+                    "health_score": LAST_REPORT.health_score,
+                    "health_score_max": 100,
+                },
+                "ai_analysis": LAST_REPORT.ai_summary or "",
+                "include_patches": include_patches,
+            }
+        )
 
     return HTMLResponse(
         html,
@@ -1,10 +1,10 @@
 from __future__ import annotations
 
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 
-from karpenter_ai_agent.mcp.runtime import LocalMCPClient, ToolRegistry, ToolSpec
-from karpenter_ai_agent.mcp.schemas import EstimateCostSignalsInput, EstimateCostSignalsOutput
-from karpenter_ai_agent.mcp.tools import estimate_cost_signals
+from karpenter_ai_agent.mcp.runtime import LocalMCPClient
+from karpenter_ai_agent.mcp.schemas import EstimateCostSignalsInput
+from karpenter_ai_agent.mcp.tools import create_registry
 from karpenter_ai_agent.models import AgentResult, CanonicalConfig, Issue
 from karpenter_ai_agent.agents._adapters import to_legacy_provisioner, issue_from_legacy
 from rules import _check_spot, _check_graviton
@@ -15,16 +15,7 @@ class CostAgent:
 
     def __init__(self, mcp_client: LocalMCPClient | None = None) -> None:
         if mcp_client is None:
-            registry = ToolRegistry()
-            registry.register(
-                ToolSpec(
-                    name="estimate_cost_signals",
-                    input_model=EstimateCostSignalsInput,
-                    output_model=EstimateCostSignalsOutput,
-                    handler=estimate_cost_signals,
-                )
-            )
-            mcp_client = LocalMCPClient(registry)
+            mcp_client = LocalMCPClient(create_registry(["estimate_cost_signals"]), trusted=True)
         self._mcp = mcp_client
 
     def run(
@@ -36,19 +27,22 @@ class CostAgent:
         legacy_provisioners = [to_legacy_provisioner(p) for p in config.provisioners]
 
         issues: List[Issue] = []
+        findings: Dict[Tuple[str, str], Issue] = {}
         for prov in legacy_provisioners:
-            issues.extend(
-                issue_from_legacy(issue, "cost")
-                for issue in _check_spot(prov) + _check_graviton(prov)
-            )
+            for finding, check in (("spot", _check_spot), ("graviton", _check_graviton)):
+                for legacy_issue in check(prov):
+                    issue = issue_from_legacy(legacy_issue, "cost")
+                    findings[(prov.name, finding)] = issue
+                    issues.append(issue)
 
         signals = self._mcp.call(
             "estimate_cost_signals",
-            {
-                "config": config.model_dump(),
-                "region": region,
-                "monthly_spend": monthly_spend,
-            },
+            EstimateCostSignalsInput(config=config, region=region, monthly_spend=monthly_spend),
         )
+        for estimate in signals.signals.get("estimated_savings", []):
+            issue = findings.get((estimate["nodepool"], estimate["finding"]))
+            if issue is not None:
+                issue.metadata["estimated_monthly_savings_usd"] = estimate["monthly_savings_usd"]
+                issue.metadata["savings_percent"] = estimate["savings_percent"]
 
         return AgentResult(issues=issues, signals=signals.signals)
@@ -30,7 +30,13 @@ class EvaluatorAgent:
         *,
         rag_context: Dict[str, List[RetrievedContext]] | None = None,
         generated_explanation: str | None = None,
+        rule_ids: Set[str] | None = None,
     ) -> EvaluationResult:
+        """Check explanations against findings and retrieved context.
+
+        ``rule_ids`` limits the per-issue checks to those findings, for
+        re-evaluating only the explanations that were regenerated.
+        """
         started = time.perf_counter()
         reasons: List[EvaluationReason] = []
 
@@ -50,6 +56,8 @@ class EvaluatorAgent:
         for issue in report.issues:
             if issue.explanation is None:
                 continue
+            if rule_ids is not None and issue.rule_id not in rule_ids:
+                continue
 
             why_matters = (issue.explanation.why_matters or "").strip()
             if not why_matters:
@@ -2,9 +2,9 @@ from __future__ import annotations
 
 from typing import List
 
-from karpenter_ai_agent.mcp.runtime import LocalMCPClient, ToolRegistry, ToolSpec
-from karpenter_ai_agent.mcp.schemas import ValidateYamlSchemaInput, ValidateYamlSchemaOutput
-from karpenter_ai_agent.mcp.tools import validate_yaml_schema
+from karpenter_ai_agent.mcp.runtime import LocalMCPClient
+from karpenter_ai_agent.mcp.schemas import ValidateYamlSchemaInput
+from karpenter_ai_agent.mcp.tools import create_registry
 from karpenter_ai_agent.models import (
     AnalysisInput,
     ParserOutput,
@@ -20,21 +20,12 @@ class ParserAgent:
 
     def __init__(self, mcp_client: LocalMCPClient | None = None) -> None:
         if mcp_client is None:
-            registry = ToolRegistry()
-            registry.register(
-                ToolSpec(
-                    name="validate_yaml_schema",
-                    input_model=ValidateYamlSchemaInput,
-                    output_model=ValidateYamlSchemaOutput,
-                    handler=validate_yaml_schema,
-                )
-            )
-            mcp_client = LocalMCPClient(registry)
+            mcp_client = LocalMCPClient(create_registry(["validate_yaml_schema"]), trusted=True)
         self._mcp = mcp_client
 
     def run(self, analysis_input: AnalysisInput) -> ParserOutput:
         validation = self._mcp.call(
-            "validate_yaml_schema", {"yaml_text": analysis_input.yaml_text}
+            "validate_yaml_schema", ValidateYamlSchemaInput(yaml_text=analysis_input.yaml_text)
         )
         if not validation.valid:
             return ParserOutput(config=None, parse_errors=validation.errors)
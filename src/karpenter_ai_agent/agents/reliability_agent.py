@@ -1,23 +1,56 @@
 from __future__ import annotations
 
-from typing import List
+from typing import Any, Dict, List, Optional
+
+import yaml
 
 from karpenter_ai_agent.models import AgentResult, CanonicalConfig, Issue
 from karpenter_ai_agent.agents._adapters import to_legacy_provisioner, issue_from_legacy
+from karpenter_ai_agent.simulation import parse_snapshot, simulate_consolidation
 from rules import _check_consolidation, _check_ttl
 
 
 class ReliabilityAgent:
     name = "reliability"
 
-    def run(self, config: CanonicalConfig) -> AgentResult:
+    def run(
+        self,
+        config: CanonicalConfig,
+        snapshot_yaml: Optional[str] = None,
+        region: Optional[str] = None,
+        workers: Optional[int] = None,
+    ) -> AgentResult:
         legacy_provisioners = [to_legacy_provisioner(p) for p in config.provisioners]
 
         issues: List[Issue] = []
+        consolidation: Dict[str, Issue] = {}
         for prov in legacy_provisioners:
-            issues.extend(
-                issue_from_legacy(issue, "reliability")
-                for issue in _check_consolidation(prov) + _check_ttl(prov)
+            for legacy_issue in _check_consolidation(prov):
+                consolidation[prov.name] = issue_from_legacy(legacy_issue, "reliability")
+                issues.append(consolidation[prov.name])
+            issues.extend(issue_from_legacy(issue, "reliability") for issue in _check_ttl(prov))
+
+        if not snapshot_yaml:
+            return AgentResult(issues=issues)
+
+        try:
+            snapshot = parse_snapshot(snapshot_yaml)
+        except (ValueError, yaml.YAMLError) as exc:
+            return AgentResult(
+                issues=issues, signals={"consolidation": {"error": f"Pod snapshot could not be parsed: {exc}"}}
             )
+        simulation = simulate_consolidation(config, snapshot, region=region, workers=workers)
+        for entry in simulation["nodepools"]:
+            issue = consolidation.get(entry["nodepool"])
+            if issue is not None:
+                issue.metadata.update(_packing_metadata(entry))
+        return AgentResult(issues=issues, signals={"consolidation": simulation})
+
 
-        return AgentResult(issues=issues)
+def _packing_metadata(entry: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "current_nodes": entry["current_nodes"],
+        "packed_nodes": entry["packed_nodes"],
+        "packed_instance_type": entry["packed_instance_type"],
+        "estimated_monthly_savings_usd": entry["monthly_savings_usd"],
+    }
@@ -0,0 +1,170 @@
+"""In-process background jobs for slow, optional work such as LLM calls."""
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Literal, Optional
+from uuid import uuid4
+
+from karpenter_ai_agent.metrics import METRICS
+
+JobStatus = Literal["queued", "running", "succeeded", "failed", "cancelled"]
+
+_FINISHED: frozenset = frozenset({"succeeded", "failed", "cancelled"})
+
+
+class JobQueueFull(RuntimeError):
+    """Raised when the job queue is at capacity."""
+
+
+class JobCancelled(Exception):
+    """Raised inside a job body to stop work after cancellation was requested."""
+
+
+@dataclass
+class Job:
+    job_id: str
+    kind: str
+    status: JobStatus = "queued"
+    result: Any = None
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    progress: List[str] = field(default_factory=list)
+    _cancel_event: threading.Event = field(default_factory=threading.Event, repr=False)
+    _done_event: threading.Event = field(default_factory=threading.Event, repr=False)
+
+    @property
+    def finished(self) -> bool:
+        return self.status in _FINISHED
+
+    @property
+    def cancel_requested(self) -> bool:
+        return self._cancel_event.is_set()
+
+    def raise_if_cancelled(self) -> None:
+        if self._cancel_event.is_set():
+            raise JobCancelled(self.job_id)
+
+    def publish(self, chunk: str) -> None:
+        """Append incremental output that streaming readers can tail."""
+        self.progress.append(chunk)
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        return self._done_event.wait(timeout)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.job_id,
+            "kind": self.kind,
+            "status": self.status,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class JobManager:
+    """Bounded worker pool with job ids, status lookups, and cancellation.
+
+    ``max_pending`` caps queued plus running jobs; ``submit`` raises
+    ``JobQueueFull`` beyond it. Finished jobs are retained (oldest evicted
+    first) so results can still be fetched after completion.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_workers: int = 2,
+        max_pending: int = 16,
+        max_retained: int = 64,
+    ) -> None:
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="karpenter-job"
+        )
+        self._max_pending = max_pending
+        self._max_retained = max_retained
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._futures: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, kind: str, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Job:
+        """Run ``fn(job, *args, **kwargs)`` on the worker pool."""
+        with self._lock:
+            active = sum(1 for job in self._jobs.values() if not job.finished)
+            if active >= self._max_pending:
+                METRICS.increment("jobs.rejected")
+                raise JobQueueFull(f"Job queue is full ({active} active jobs)")
+            job = Job(job_id=uuid4().hex, kind=kind)
+            self._jobs[job.job_id] = job
+            self._evict_finished()
+            self._futures[job.job_id] = self._executor.submit(self._run, job, fn, args, kwargs)
+        METRICS.increment("jobs.submitted")
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> bool:
+        """Request cancellation; queued jobs never start, running jobs stop cooperatively."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            future = self._futures.get(job_id)
+        if job is None or job.finished:
+            return False
+        job._cancel_event.set()
+        if future is not None and future.cancel():
+            self._finish(job, "cancelled")
+        return True
+
+    def active_count(self) -> int:
+        with self._lock:
+            return sum(1 for job in self._jobs.values() if not job.finished)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Cancel every unfinished job (queued ones are marked cancelled) and stop the pool."""
+        with self._lock:
+            job_ids = [job_id for job_id, job in self._jobs.items() if not job.finished]
+        for job_id in job_ids:
+            self.cancel(job_id)
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+    def _run(self, job: Job, fn: Callable[..., Any], args: tuple, kwargs: dict) -> None:
+        if job.cancel_requested:
+            self._finish(job, "cancelled")
+            return
+        job.status = "running"
+        job.started_at = time.time()
+        try:
+            job.result = fn(job, *args, **kwargs)
+        except JobCancelled:
+            self._finish(job, "cancelled")
+        except Exception as exc:  # noqa: BLE001
+            job.error = str(exc)
+            self._finish(job, "failed")
+        else:
+            self._finish(job, "succeeded")
+
+    def _finish(self, job: Job, status: JobStatus) -> None:
+        with self._lock:
+            if job.finished:
+                return
+            job.status = status
+            job.finished_at = time.time()
+            self._futures.pop(job.job_id, None)
+        if job.started_at is not None:
+            METRICS.observe(f"jobs.{job.kind}.duration_ms", (job.finished_at - job.started_at) * 1000.0)
+        METRICS.increment(f"jobs.{status}")
+        job._done_event.set()
+
+    def _evict_finished(self) -> None:
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished]
+        overflow = len(self._jobs) - self._max_retained
+        for job_id in finished[: max(overflow, 0)]:
+            del self._jobs[job_id]
@@ -0,0 +1,34 @@
+"""Helpers for the optional LLM summary and explanation calls."""
+
+from .prompt import (
+    SummaryPrompt,
+    build_summary_prompt,
+    estimate_tokens,
+    group_issues,
+    resolve_max_input_tokens,
+)
+from .resilience import (
+    BackoffPolicy,
+    CircuitBreaker,
+    Deadline,
+    LLMUnavailable,
+    post_with_retries,
+)
+from .summary_cache import SummaryCache, summary_fingerprint
+from .template_summary import build_template_summary
+
+__all__ = [
+    "BackoffPolicy",
+    "CircuitBreaker",
+    "Deadline",
+    "LLMUnavailable",
+    "post_with_retries",
+    "SummaryCache",
+    "SummaryPrompt",
+    "build_summary_prompt",
+    "build_template_summary",
+    "estimate_tokens",
+    "group_issues",
+    "resolve_max_input_tokens",
+    "summary_fingerprint",
+]
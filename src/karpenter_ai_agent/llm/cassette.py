@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+# Request fields that determine the completion; transport-only fields such as
+# ``stream`` are ignored so a recorded completion can be replayed either way.
+_KEY_FIELDS = ("model", "messages", "max_tokens", "temperature")
+
+
+def cassette_key(payload: Dict[str, Any]) -> str:
+    canonical = {name: payload.get(name) for name in _KEY_FIELDS}
+    encoded = json.dumps(canonical, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class Cassette:
+    """JSON file of recorded chat completions keyed by a canonical request hash."""
+
+    def __init__(self, path: Path, entries: Optional[Dict[str, Dict[str, Any]]] = None) -> None:
+        self.path = Path(path)
+        self._entries: Dict[str, Dict[str, Any]] = dict(entries or {})
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path: Path) -> "Cassette":
+        path = Path(path)
+        if not path.exists():
+            return cls(path)
+        data = json.loads(path.read_text(encoding="utf-8"))
+        return cls(path, data.get("interactions", {}))
+
+    def get(self, payload: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._entries.get(cassette_key(payload))
+
+    def put(self, payload: Dict[str, Any], status: int, body: Dict[str, Any]) -> None:
+        with self._lock:
+            self._entries[cassette_key(payload)] = {"status": status, "body": body}
+
+    def save(self) -> None:
+        with self._lock:
+            data = {"version": 1, "interactions": dict(sorted(self._entries.items()))}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.write_text(json.dumps(data, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+import json
+import os
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+MAX_INPUT_TOKENS_ENV = "LLM_SUMMARY_MAX_INPUT_TOKENS"
+DEFAULT_MAX_INPUT_TOKENS = 6000
+
+# Fields the summary prompt actually reads. patch_snippet, explanation and the
+# duplicated provisioner_name/resource_name pair are never needed by the model.
+_PROMPT_FIELDS: Tuple[str, ...] = (
+    "severity",
+    "category",
+    "message",
+    "recommendation",
+    "resource_kind",
+    "field",
+)
+_SEVERITY_ORDER: Tuple[str, ...] = ("high", "medium", "low")
+_MAX_LISTED_RESOURCES = 10
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token for English and JSON)."""
+    if not text:
+        return 0
+    return (len(text) + 3) // 4
+
+
+def resolve_max_input_tokens(value: Optional[int] = None) -> int:
+    if value is not None:
+        return max(int(value), 0)
+    raw = os.environ.get(MAX_INPUT_TOKENS_ENV, "").strip()
+    if raw.isdigit():
+        return int(raw)
+    return DEFAULT_MAX_INPUT_TOKENS
+
+
+@dataclass(frozen=True)
+class SummaryPrompt:
+    system: str
+    user: str
+    input_tokens: int
+    max_input_tokens: int
+    omitted_issues: Dict[str, int] = field(default_factory=dict)
+    compacted: bool = False
+
+    def messages(self) -> List[Dict[str, str]]:
+        return [
+            {"role": "system", "content": self.system},
+            {"role": "user", "content": self.user},
+        ]
+
+
+def _issue_value(issue: Any, name: str) -> Any:
+    if isinstance(issue, dict):
+        return issue.get(name)
+    return getattr(issue, name, None)
+
+
+def _resource_name(issue: Any) -> Optional[str]:
+    return _issue_value(issue, "resource_name") or _issue_value(issue, "provisioner_name")
+
+
+def group_issues(issues: Iterable[Any]) -> List[Dict[str, Any]]:
+    """Collapse identical findings across resources into one entry per finding.
+
+    Accepts legacy dataclass issues, contract issues, or plain dicts. Groups are
+    ordered by severity and then by first appearance.
+    """
+    groups: Dict[Tuple[Any, ...], Dict[str, Any]] = {}
+    for issue in issues:
+        key = tuple(_issue_value(issue, name) for name in _PROMPT_FIELDS)
+        group = groups.get(key)
+        if group is None:
+            group = {
+                name: value
+                for name, value in zip(_PROMPT_FIELDS, key)
+                if value not in (None, "")
+            }
+            group["resources"] = []
+            groups[key] = group
+        resource = _resource_name(issue)
+        if resource and resource not in group["resources"]:
+            group["resources"].append(resource)
+
+    rank = {severity: index for index, severity in enumerate(_SEVERITY_ORDER)}
+    ordered = sorted(
+        enumerate(groups.values()),
+        key=lambda item: (rank.get(item[1].get("severity"), len(rank)), item[0]),
+    )
+    result = []
+    for _, group in ordered:
+        if not group["resources"]:
+            del group["resources"]
+        result.append(group)
+    return result
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False)
+
+
+def _without_recommendation(group: Dict[str, Any], severities: Iterable[str]) -> Dict[str, Any]:
+    if group.get("severity") not in set(severities):
+        return group
+    return {key: value for key, value in group.items() if key != "recommendation"}
+
+
+def _cap_resources(group: Dict[str, Any]) -> Dict[str, Any]:
+    resources = group.get("resources") or []
+    if len(resources) <= _MAX_LISTED_RESOURCES:
+        return group
+    capped = dict(group)
+    capped["resources"] = resources[:_MAX_LISTED_RESOURCES]
+    capped["more_resources"] = len(resources) - _MAX_LISTED_RESOURCES
+    return capped
+
+
+def _issue_count(group: Dict[str, Any]) -> int:
+    return max(len(group.get("resources") or []) + int(group.get("more_resources", 0)), 1)
+
+
+def build_summary_prompt(
+    region: Optional[str],
+    summary: Dict[str, Any],
+    issues: Iterable[Any],
+    *,
+    system_prompt: str,
+    max_input_tokens: Optional[int] = None,
+) -> SummaryPrompt:
+    """Build a compact summary prompt that fits within ``max_input_tokens``.
+
+    When the grouped payload is too large the builder degrades in stages:
+    recommendations are dropped (low severity first), long resource lists are
+    capped, and finally the lowest-priority groups are omitted. Omitted counts
+    are reported in the payload so the model can say the list is partial; the
+    ``summary`` object always stays complete.
+    """
+    budget = resolve_max_input_tokens(max_input_tokens)
+    groups = group_issues(issues)
+    base = {"region": region, "summary": summary}
+    # Budget overhead: system prompt, envelope, and the ``"issues":[]`` key.
+    overhead = estimate_tokens(system_prompt) + estimate_tokens(_dumps(base)) + 4
+
+    stages = [
+        lambda items: items,
+        lambda items: [_without_recommendation(g, ("low",)) for g in items],
+        lambda items: [_without_recommendation(g, _SEVERITY_ORDER) for g in items],
+        lambda items: [_cap_resources(g) for g in items],
+    ]
+
+    selected = groups
+    costs: List[int] = []
+    compacted = False
+    for index, stage in enumerate(stages):
+        selected = stage(selected)
+        costs = [estimate_tokens(_dumps(group)) + 1 for group in selected]
+        compacted = index > 0
+        if overhead + sum(costs) <= budget:
+            break
+
+    omitted: Dict[str, int] = {}
+    if overhead + sum(costs) > budget:
+        compacted = True
+        kept: List[Dict[str, Any]] = []
+        used = overhead + estimate_tokens(_dumps({"omitted_issues": dict.fromkeys(_SEVERITY_ORDER, 0)}))
+        for group, cost in zip(selected, costs):
+            if used + cost <= budget:
+                kept.append(group)
+                used += cost
+                continue
+            severity = str(group.get("severity") or "low")
+            omitted[severity] = omitted.get(severity, 0) + _issue_count(group)
+        selected = kept
+
+    payload: Dict[str, Any] = dict(base)
+    payload["issues"] = selected
+    if omitted:
+        payload["omitted_issues"] = omitted
+    user = _dumps(payload)
+    return SummaryPrompt(
+        system=system_prompt,
+        user=user,
+        input_tokens=estimate_tokens(system_prompt) + estimate_tokens(user),
+        max_input_tokens=budget,
+        omitted_issues=omitted,
+        compacted=compacted,
+    )
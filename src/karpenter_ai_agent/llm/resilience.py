@@ -0,0 +1,211 @@
+from __future__ import annotations
+
+import os
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional
+
+import requests
+
+from karpenter_ai_agent.metrics import METRICS
+
+REQUEST_BUDGET_ENV = "LLM_REQUEST_BUDGET_SECONDS"
+DEFAULT_REQUEST_BUDGET_SECONDS = 30.0
+
+RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+
+class LLMUnavailable(RuntimeError):
+    """Raised when an LLM call is skipped or gives up (open circuit, spent budget)."""
+
+
+class Deadline:
+    """Absolute latency budget shared by every LLM call made for one request."""
+
+    def __init__(self, expires_at: Optional[float]) -> None:
+        self.expires_at = expires_at
+
+    @classmethod
+    def after(cls, seconds: Optional[float]) -> "Deadline":
+        if seconds is None:
+            return cls(None)
+        return cls(time.monotonic() + max(float(seconds), 0.0))
+
+    @classmethod
+    def from_env(cls) -> "Deadline":
+        raw = os.environ.get(REQUEST_BUDGET_ENV, "").strip()
+        try:
+            seconds = float(raw) if raw else DEFAULT_REQUEST_BUDGET_SECONDS
+        except ValueError:
+            seconds = DEFAULT_REQUEST_BUDGET_SECONDS
+        return cls.after(seconds)
+
+    def remaining(self) -> float:
+        if self.expires_at is None:
+            return float("inf")
+        return max(self.expires_at - time.monotonic(), 0.0)
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0.0
+
+    def timeout(self, cap: float) -> float:
+        """Per-attempt timeout: the smaller of ``cap`` and the remaining budget."""
+        return min(cap, self.remaining())
+
+
+class CircuitBreaker:
+    """Closed -> open after consecutive failures; half-open probe after a cool-down."""
+
+    def __init__(self, *, failure_threshold: int = 3, reset_timeout: float = 30.0) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state()
+
+    @property
+    def is_open(self) -> bool:
+        return self.state == "open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            state = self._state()
+            if state == "closed":
+                return True
+            if state == "half_open" and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._probing or self._failures >= self.failure_threshold:
+                if self._opened_at is None or self._probing:
+                    METRICS.increment("llm.circuit.opened")
+                self._opened_at = time.monotonic()
+            self._probing = False
+
+    def reset(self) -> None:
+        self.record_success()
+
+    def _state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+
+@dataclass(frozen=True)
+class BackoffPolicy:
+    max_attempts: int = 3
+    base_delay: float = 0.5
+    max_delay: float = 8.0
+
+    def delay(self, attempt: int) -> float:
+        """Full-jitter exponential backoff for the given (0-based) retry attempt."""
+        ceiling = min(self.max_delay, self.base_delay * (2 ** attempt))
+        return random.uniform(0.0, ceiling)
+
+
+def _retry_after(response: Optional[requests.Response]) -> Optional[float]:
+    headers = getattr(response, "headers", None) or {}
+    value = headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        return None
+
+
+def post_with_retries(
+    url: str,
+    *,
+    json: Dict[str, Any],
+    headers: Dict[str, str],
+    timeout_cap: float,
+    deadline: Optional[Deadline] = None,
+    breaker: Optional[CircuitBreaker] = None,
+    policy: Optional[BackoffPolicy] = None,
+    stream: bool = False,
+    post: Optional[Callable[..., requests.Response]] = None,
+    sleep: Optional[Callable[[float], None]] = None,
+) -> requests.Response:
+    """POST with jittered backoff on 429/5xx and transport errors.
+
+    Each attempt's timeout is bounded by the shared ``deadline``; retries stop
+    once the budget cannot cover another wait. Raises ``LLMUnavailable`` when
+    the circuit is open or the budget is spent before any response. The last
+    non-retryable or final response is returned for the caller to interpret.
+    """
+    deadline = deadline or Deadline(None)
+    policy = policy or BackoffPolicy()
+    post = post or requests.post
+    sleep = sleep or time.sleep
+
+    extra: Dict[str, Any] = {"stream": True} if stream else {}
+    last_error: Optional[Exception] = None
+    response: Optional[requests.Response] = None
+    for attempt in range(policy.max_attempts):
+        if breaker is not None and not breaker.allow():
+            METRICS.increment("llm.circuit.short_circuited")
+            raise LLMUnavailable("LLM provider circuit is open")
+        timeout = deadline.timeout(timeout_cap)
+        if timeout <= 0:
+            raise LLMUnavailable("LLM request budget exhausted")
+
+        METRICS.increment("llm.attempts")
+        response = None
+        try:
+            response = post(url, json=json, headers=headers, timeout=timeout, **extra)
+        except (requests.exceptions.Timeout, requests.exceptions.ConnectionError) as exc:
+            last_error = exc
+        except requests.exceptions.RequestException:
+            # Not worth retrying, but still a failed call: recording it also
+            # releases a half-open probe, which would otherwise stay taken.
+            if breaker is not None:
+                breaker.record_failure()
+            raise
+        else:
+            if response.status_code not in RETRYABLE_STATUS_CODES:
+                if breaker is not None:
+                    breaker.record_success()
+                return response
+        if breaker is not None:
+            breaker.record_failure()
+
+        if attempt + 1 >= policy.max_attempts:
+            break
+        wait = _retry_after(response)
+        if wait is None:
+            wait = policy.delay(attempt)
+        if wait >= deadline.remaining():
+            break
+        METRICS.increment("llm.retries")
+        close = getattr(response, "close", None)
+        if close is not None:
+            close()
+        sleep(wait)
+
+    if response is not None:
+        return response
+    if isinstance(last_error, requests.exceptions.Timeout):
+        raise last_error
+    raise LLMUnavailable(f"LLM request failed: {last_error}") from last_error
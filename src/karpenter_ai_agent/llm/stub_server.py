@@ -0,0 +1,320 @@
+"""Local OpenAI/Groq-compatible chat completions server for offline tests.
+
+Run ``python -m karpenter_ai_agent.llm.stub_server --port 8089`` and point the
+app at it with ``LLM_BASE_URL=http://127.0.0.1:8089/openai/v1``. Latency, error
+rate and streaming speed are configurable; ``--record``/``--replay`` proxy to a
+real provider and store or serve completions from a cassette file.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List, Literal, Optional, Tuple
+
+import requests
+
+from karpenter_ai_agent.llm.cassette import Cassette
+
+StubMode = Literal["stub", "record", "replay"]
+
+_SEVERITY_SECTIONS = (
+    ("high", "High severity issues:"),
+    ("medium", "Medium severity issues:"),
+    ("low", "Low severity issues or observations:"),
+)
+
+
+@dataclass
+class StubConfig:
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    error_rate: float = 0.0
+    error_status: int = 503
+    token_delay_ms: float = 0.0
+    seed: Optional[int] = None
+    mode: StubMode = "stub"
+    cassette: Optional[Cassette] = None
+    upstream_url: Optional[str] = None
+    upstream_api_key: Optional[str] = None
+
+
+def _canned_explanation(payload: Dict[str, Any]) -> str:
+    issue = payload.get("issue") or {}
+    docs = payload.get("retrieved_docs") or []
+    lines = [
+        f"WHY: {issue.get('message') or 'This finding'} affects how Karpenter provisions nodes. "
+        f"{issue.get('recommendation') or ''}".strip(),
+        "CHANGE:",
+        f"- {issue.get('recommendation') or 'Apply the recommended change.'}",
+        "DOCS:",
+    ]
+    lines.extend(f"- {doc.get('source_url')}" for doc in docs if doc.get("source_url"))
+    return "\n".join(lines)
+
+
+def _canned_summary(payload: Dict[str, Any]) -> str:
+    summary = payload.get("summary") or {}
+    counts = summary.get("issues_by_severity") or {}
+    issues = payload.get("issues") or []
+    lines = [
+        f"The configuration has {counts.get('high', 0)} high, {counts.get('medium', 0)} medium "
+        f"and {counts.get('low', 0)} low severity findings "
+        f"(health score {summary.get('health_score', 'n/a')}).",
+        "",
+    ]
+    actions: List[str] = []
+    for severity, title in _SEVERITY_SECTIONS:
+        lines.append(title)
+        matching = [issue for issue in issues if issue.get("severity") == severity]
+        if not matching:
+            lines.append("- None.")
+        for issue in matching:
+            resources = ", ".join(issue.get("resources") or [])
+            suffix = f" ({resources})" if resources else ""
+            lines.append(f"- {issue.get('message')}{suffix}")
+            if issue.get("recommendation"):
+                actions.append(f"- {issue['recommendation']}{suffix}")
+        lines.append("")
+    lines.append("Recommended actions:")
+    lines.extend(actions or ["- None."])
+    return "\n".join(lines)
+
+
+def canned_completion(request_payload: Dict[str, Any]) -> str:
+    """Deterministic completion text shaped like the real prompts' expected output."""
+    messages = request_payload.get("messages") or []
+    user = next((m.get("content", "") for m in messages if m.get("role") == "user"), "")
+    try:
+        payload = json.loads(user)
+    except (TypeError, json.JSONDecodeError):
+        return "Stub completion."
+    if isinstance(payload, dict) and "issue" in payload:
+        return _canned_explanation(payload)
+    if isinstance(payload, dict):
+        return _canned_summary(payload)
+    return "Stub completion."
+
+
+def completion_body(model: str, content: str) -> Dict[str, Any]:
+    return {
+        "id": "chatcmpl-stub",
+        "object": "chat.completion",
+        "model": model,
+        "choices": [
+            {"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}
+        ],
+    }
+
+
+def _stream_pieces(content: str) -> List[str]:
+    return re.findall(r"\S+\s*|\s+", content)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: "StubLLMServer"
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+        return
+
+    def do_POST(self) -> None:  # noqa: N802
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send_json(404, {"error": {"message": f"Unknown path {self.path}"}})
+            return
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            payload = json.loads(self.rfile.read(length) or b"{}")
+        except json.JSONDecodeError:
+            self._send_json(400, {"error": {"message": "Invalid JSON body"}})
+            return
+
+        self.server.record_request()
+        config = self.server.config
+        delay = self.server.sample_latency()
+        if delay:
+            time.sleep(delay)
+        if self.server.should_fail():
+            self._send_json(config.error_status, {"error": {"message": "Injected stub failure"}})
+            return
+
+        status, body = self.server.resolve(payload)
+        if status != 200:
+            self._send_json(status, body)
+            return
+        if payload.get("stream"):
+            content = body["choices"][0]["message"]["content"]
+            self._send_stream(body.get("model", ""), content)
+            return
+        self._send_json(200, body)
+
+    def _send_json(self, status: int, body: Dict[str, Any]) -> None:
+        encoded = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(encoded)))
+        self.end_headers()
+        self.wfile.write(encoded)
+
+    def _send_stream(self, model: str, content: str) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        token_delay = self.server.config.token_delay_ms / 1000.0
+        for piece in _stream_pieces(content):
+            chunk = {"model": model, "choices": [{"index": 0, "delta": {"content": piece}}]}
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+            if token_delay:
+                time.sleep(token_delay)
+        final = {"model": model, "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]}
+        self.wfile.write(f"data: {json.dumps(final)}\n\n".encode("utf-8"))
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+        self.close_connection = True
+
+
+class StubLLMServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, config: Optional[StubConfig] = None) -> None:
+        super().__init__((host, port), _Handler)
+        self.config = config or StubConfig()
+        self._rng = random.Random(self.config.seed)
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self.request_count = 0
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/openai/v1"
+
+    def record_request(self) -> None:
+        with self._lock:
+            self.request_count += 1
+
+    def sample_latency(self) -> float:
+        config = self.config
+        with self._lock:
+            jitter = self._rng.uniform(0, config.jitter_ms) if config.jitter_ms else 0.0
+        return max(config.latency_ms + jitter, 0.0) / 1000.0
+
+    def should_fail(self) -> bool:
+        if self.config.error_rate <= 0:
+            return False
+        with self._lock:
+            return self._rng.random() < self.config.error_rate
+
+    def resolve(self, payload: Dict[str, Any]) -> Tuple[int, Dict[str, Any]]:
+        config = self.config
+        model = str(payload.get("model") or "stub-model")
+        if config.mode == "replay":
+            entry = config.cassette.get(payload) if config.cassette else None
+            if entry is None:
+                return 404, {"error": {"message": "No cassette entry for request"}}
+            return int(entry["status"]), entry["body"]
+        if config.mode == "record":
+            return self._record(payload)
+        return 200, completion_body(model, canned_completion(payload))
+
+    def _record(self, payload: Dict[str, Any]) -> Tuple[int, Dict[str, Any]]:
+        config = self.config
+        if not config.upstream_url or config.cassette is None:
+            return 500, {"error": {"message": "Record mode needs an upstream URL and a cassette"}}
+        upstream_payload = {key: value for key, value in payload.items() if key != "stream"}
+        headers = {"Content-Type": "application/json"}
+        if config.upstream_api_key:
+            headers["Authorization"] = f"Bearer {config.upstream_api_key}"
+        response = requests.post(
+            f"{config.upstream_url.rstrip('/')}/chat/completions",
+            json=upstream_payload,
+            headers=headers,
+            timeout=60,
+        )
+        try:
+            body = response.json()
+        except ValueError:
+            body = {"error": {"message": response.text[:200]}}
+        if response.status_code == 200:
+            config.cassette.put(payload, response.status_code, body)
+            config.cassette.save()
+        return response.status_code, body
+
+    def start(self) -> "StubLLMServer":
+        self._thread = threading.Thread(
+            target=self.serve_forever, kwargs={"poll_interval": 0.05}, name="stub-llm", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def __enter__(self) -> "StubLLMServer":
+        return self.start()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.stop()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--token-delay-ms", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=None)
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--record", type=Path, help="Proxy to --upstream and save completions here")
+    group.add_argument("--replay", type=Path, help="Serve completions from this cassette")
+    parser.add_argument("--upstream", default="https://api.groq.com/openai/v1")
+    parser.add_argument("--upstream-api-key", default=os.environ.get("GROQ_API_KEY"))
+    args = parser.parse_args(argv)
+
+    mode: StubMode = "stub"
+    cassette = None
+    if args.record:
+        mode, cassette = "record", Cassette.load(args.record)
+    elif args.replay:
+        mode, cassette = "replay", Cassette.load(args.replay)
+
+    config = StubConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        token_delay_ms=args.token_delay_ms,
+        seed=args.seed,
+        mode=mode,
+        cassette=cassette,
+        upstream_url=args.upstream,
+        upstream_api_key=args.upstream_api_key,
+    )
+    server = StubLLMServer(args.host, args.port, config)
+    print(f"Stub LLM server ({mode}) listening on {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Optional, Tuple
+
+from karpenter_ai_agent.metrics import METRICS
+from karpenter_ai_agent.models import AnalysisReport
+
+CACHE_SIZE_ENV = "AI_SUMMARY_CACHE_SIZE"
+CACHE_TTL_ENV = "AI_SUMMARY_CACHE_TTL_SECONDS"
+CACHE_DIR_ENV = "AI_SUMMARY_CACHE_DIR"
+DEFAULT_CACHE_SIZE = 256
+DEFAULT_CACHE_TTL_SECONDS = 24 * 60 * 60
+
+
+def summary_fingerprint(
+    report: AnalysisReport, *, model: str, prompt_version: str, endpoint: str = ""
+) -> str:
+    """Stable hash of everything the summary depends on.
+
+    Issue order and message wording are ignored: two uploads with the same
+    rules firing on the same resources share a summary. ``endpoint`` keeps
+    summaries from a local stub or replayed cassette apart from the provider's.
+    """
+    canonical = {
+        "region": report.region,
+        "issues_by_severity": report.issues_by_severity,
+        "optimizer_flags": report.optimizer_flags,
+        "issues": sorted(
+            [issue.rule_id, issue.resource_kind or "", issue.resource_name or ""]
+            for issue in report.issues
+        ),
+        "model": model,
+        "prompt_version": prompt_version,
+        "endpoint": endpoint,
+    }
+    encoded = json.dumps(canonical, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def _env_number(name: str, default: float) -> float:
+    raw = os.environ.get(name, "").strip()
+    try:
+        return float(raw) if raw else default
+    except ValueError:
+        return default
+
+
+class SummaryCache:
+    """LRU + TTL cache of generated summaries, optionally persisted to a directory.
+
+    The in-memory LRU is always used; with ``path`` set, entries are also
+    written as one JSON file per key so they survive restarts and are shared
+    by workers on the same host. Expiry uses wall-clock time for that reason.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_CACHE_SIZE,
+        ttl_seconds: float = DEFAULT_CACHE_TTL_SECONDS,
+        path: Optional[Path] = None,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.max_entries = max(int(max_entries), 0)
+        self.ttl_seconds = ttl_seconds
+        self.path = Path(path) if path else None
+        self._clock = clock
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "SummaryCache":
+        directory = os.environ.get(CACHE_DIR_ENV, "").strip()
+        return cls(
+            max_entries=int(_env_number(CACHE_SIZE_ENV, DEFAULT_CACHE_SIZE)),
+            ttl_seconds=_env_number(CACHE_TTL_ENV, DEFAULT_CACHE_TTL_SECONDS),
+            path=Path(directory) if directory else None,
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and self.ttl_seconds > 0
+
+    def _expired(self, created: float) -> bool:
+        return self._clock() - created >= self.ttl_seconds
+
+    def _file(self, key: str) -> Path:
+        assert self.path is not None
+        return self.path / f"{key}.json"
+
+    def _remember(self, key: str, created: float, text: str) -> None:
+        self._entries[key] = (created, text)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            METRICS.increment("llm.summary.cache.evictions")
+
+    def _read_disk(self, key: str) -> Optional[Tuple[float, str]]:
+        if self.path is None:
+            return None
+        file = self._file(key)
+        try:
+            data = json.loads(file.read_text(encoding="utf-8"))
+            return float(data["created"]), str(data["text"])
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError, TypeError):
+            file.unlink(missing_ok=True)
+            return None
+
+    def get(self, key: str) -> Optional[str]:
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._read_disk(key)
+            if entry is not None and self._expired(entry[0]):
+                self._entries.pop(key, None)
+                if self.path is not None:
+                    self._file(key).unlink(missing_ok=True)
+                entry = None
+            if entry is None:
+                METRICS.increment("llm.summary.cache.miss")
+                return None
+            self._remember(key, *entry)
+        METRICS.increment("llm.summary.cache.hit")
+        return entry[1]
+
+    def put(self, key: str, text: str) -> None:
+        if not self.enabled or not text:
+            return
+        created = self._clock()
+        with self._lock:
+            self._remember(key, created, text)
+            if self.path is not None:
+                self.path.mkdir(parents=True, exist_ok=True)
+                tmp = self.path / f"{key}.{os.getpid()}.tmp"
+                tmp.write_text(json.dumps({"created": created, "text": text}), encoding="utf-8")
+                tmp.replace(self._file(key))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            if self.path is not None and self.path.exists():
+                for file in self.path.glob("*.json"):
+                    file.unlink(missing_ok=True)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
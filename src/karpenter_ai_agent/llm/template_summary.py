@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+from typing import Dict, List, Sequence, Tuple
+
+from karpenter_ai_agent.models import AnalysisReport, Issue
+
+_SECTIONS: Tuple[Tuple[str, str], ...] = (
+    ("high", "High severity issues:"),
+    ("medium", "Medium severity issues:"),
+    ("low", "Low severity issues or observations:"),
+)
+
+
+def _names(issues: Sequence[Issue]) -> List[str]:
+    names: List[str] = []
+    for issue in issues:
+        name = issue.resource_name
+        if name and name not in names:
+            names.append(name)
+    return names
+
+
+def _affected(names: Sequence[str]) -> str:
+    return f" Affected: {', '.join(names)}." if names else ""
+
+
+def _group_by(issues: Sequence[Issue], attr: str) -> Dict[str, List[Issue]]:
+    groups: Dict[str, List[Issue]] = {}
+    for issue in issues:
+        groups.setdefault(getattr(issue, attr) or "", []).append(issue)
+    return groups
+
+
+def _overview(report: AnalysisReport) -> str:
+    counts = report.issues_by_severity or {}
+    high, medium, low = (int(counts.get(key, 0)) for key in ("high", "medium", "low"))
+    flags = report.optimizer_flags or {}
+    total = flags.get("total_provisioners")
+    scope = f"{total} provisioner(s) / nodepool(s)" if total is not None else "the uploaded configuration"
+    region = f" in {report.region}" if report.region else ""
+    first = (
+        f"The analysis of {scope}{region} found {high} high, {medium} medium and {low} low "
+        f"severity issues, for a health score of {report.health_score}/100."
+    )
+    if high:
+        second = "Overall risk is elevated; address the high severity items first."
+    elif medium:
+        second = "Overall risk is moderate; the medium severity items are the main cost and efficiency gaps."
+    elif low:
+        second = "Overall risk is low; only minor observations were found."
+    else:
+        second = "No issues were detected, so no changes are required."
+    return f"{first} {second}"
+
+
+def build_template_summary(report: AnalysisReport) -> str:
+    """Deterministic summary with the same sections the LLM prompt asks for.
+
+    Issues are grouped by rule and then by message: one bullet per distinct
+    message, listing the resources it applies to. Recommended actions are
+    grouped by recommendation text.
+    Pure string assembly, so it is cheap enough to run on every request.
+    """
+    lines = [_overview(report), ""]
+    by_severity = _group_by(report.issues, "severity")
+
+    for severity, title in _SECTIONS:
+        lines.append(title)
+        issues = by_severity.get(severity, [])
+        if not issues:
+            lines.append("- None.")
+        for rule_issues in _group_by(issues, "rule_id").values():
+            for message, message_issues in _group_by(rule_issues, "message").items():
+                lines.append(f"- {message}{_affected(_names(message_issues))}")
+        lines.append("")
+
+    lines.append("Recommended actions:")
+    actions = _group_by(report.issues, "recommendation")
+    if not actions:
+        lines.append("- None.")
+    for recommendation, action_issues in actions.items():
+        if recommendation:
+            lines.append(f"- {recommendation}{_affected(_names(action_issues))}")
+    return "\n".join(lines)
@@ -1,6 +1,17 @@
 """Local MCP-like tooling runtime."""
 
+from .cache import ToolResultCache
 from .runtime import ToolRegistry, ToolSpec, LocalMCPClient
 from . import schemas, tools
+from .tools import create_registry, tool_specs
 
-__all__ = ["ToolRegistry", "ToolSpec", "LocalMCPClient", "schemas", "tools"]
+__all__ = [
+    "ToolRegistry",
+    "ToolSpec",
+    "LocalMCPClient",
+    "ToolResultCache",
+    "create_registry",
+    "tool_specs",
+    "schemas",
+    "tools",
+]
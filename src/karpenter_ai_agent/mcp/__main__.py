@@ -0,0 +1,3 @@
+from karpenter_ai_agent.mcp.server import main
+
+main()
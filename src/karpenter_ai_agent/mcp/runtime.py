@@ -1,45 +1,287 @@
 from __future__ import annotations
 
+import asyncio
+import inspect
+import json
+import threading
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import Any, Callable, Dict, Type
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple, Type, TypeVar, Union
 from pydantic import BaseModel, ValidationError
 
+from karpenter_ai_agent.mcp.cache import ToolResultCache, input_fingerprint
+from karpenter_ai_agent.metrics import METRICS, MetricsRegistry
+
 
 @dataclass(frozen=True)
 class ToolSpec:
     name: str
     input_model: Type[BaseModel]
     output_model: Type[BaseModel]
-    handler: Callable[[BaseModel], BaseModel]
+    # A plain function or a coroutine function.
+    handler: Callable[[BaseModel], Union[BaseModel, Awaitable[BaseModel]]]
+    # Opt-in memoization for deterministic, read-only tools.
+    cacheable: bool = False
+    cache_size: int = 256
+    cache_ttl_seconds: float = 300.0
+    # Cache key from the fields the handler reads; defaults to a hash of the whole input.
+    cache_key: Optional[Callable[[BaseModel], str]] = None
+    # Cheap size of a trusted (never serialized) input, in tool-specific units;
+    # defaults to the characters in its top-level string fields.
+    payload_size: Optional[Callable[[BaseModel], int]] = None
+
+
+T = TypeVar("T")
+
+
+def _payload_bytes(payload: Any) -> int:
+    if isinstance(payload, (str, bytes)):
+        return len(payload)
+    return len(json.dumps(payload, default=str, separators=(",", ":")))
+
+
+def _text_size(payload: BaseModel) -> int:
+    return sum(len(value) for value in vars(payload).values() if isinstance(value, str))
 
 
 class ToolRegistry:
-    def __init__(self) -> None:
+    def __init__(self, metrics: MetricsRegistry = METRICS) -> None:
         self._tools: Dict[str, ToolSpec] = {}
+        self._caches: Dict[str, ToolResultCache] = {}
+        self._metrics = metrics
 
     def register(self, spec: ToolSpec) -> None:
         if spec.name in self._tools:
             raise ValueError(f"Tool already registered: {spec.name}")
         self._tools[spec.name] = spec
+        if spec.cacheable:
+            self._caches[spec.name] = ToolResultCache(spec.cache_size, spec.cache_ttl_seconds)
 
     def get(self, name: str) -> ToolSpec:
         if name not in self._tools:
             raise KeyError(f"Tool not found: {name}")
         return self._tools[name]
 
+    def names(self) -> List[str]:
+        return list(self._tools)
+
+    def cache(self, name: str) -> Optional[ToolResultCache]:
+        return self._caches.get(name)
+
+    def clear_caches(self) -> None:
+        for cache in self._caches.values():
+            cache.clear()
+
+    def record_call(
+        self,
+        name: str,
+        latency_ms: float,
+        payload_bytes: Optional[int] = None,
+        trusted: bool = False,
+        cached: Optional[bool] = None,
+    ) -> None:
+        """Record one call as ``mcp.<tool>.*`` metrics.
+
+        Trusted calls have no serialized payload, so for them ``payload_bytes``
+        is the spec's cheap ``payload_size`` estimate and is observed as
+        ``payload_size`` instead. ``cached`` is True/False for cache hits/misses
+        of cacheable tools, None otherwise.
+        """
+        self._metrics.increment(f"mcp.{name}.calls")
+        if trusted:
+            self._metrics.increment(f"mcp.{name}.trusted_calls")
+        if cached is not None:
+            self._metrics.increment(f"mcp.{name}.cache.{'hit' if cached else 'miss'}")
+        self._metrics.observe(f"mcp.{name}.latency_ms", latency_ms)
+        if payload_bytes is not None:
+            self._metrics.observe(f"mcp.{name}.{'payload_size' if trusted else 'payload_bytes'}", payload_bytes)
+
+    def record_timeout(self, name: str) -> None:
+        self._metrics.increment(f"mcp.{name}.timeouts")
+
+    def record_error(self, name: str) -> None:
+        """A call that raised: invalid input, a handler exception or a bad output type."""
+        self._metrics.increment(f"mcp.{name}.errors")
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-tool call and error counts, cache hits, latency and payload size observations."""
+        return {
+            name: {
+                "calls": self._metrics.counter(f"mcp.{name}.calls"),
+                "trusted_calls": self._metrics.counter(f"mcp.{name}.trusted_calls"),
+                "latency_ms": self._metrics.observation(f"mcp.{name}.latency_ms"),
+                "payload_bytes": self._metrics.observation(f"mcp.{name}.payload_bytes"),
+                "payload_size": self._metrics.observation(f"mcp.{name}.payload_size"),
+                "cache_hits": self._metrics.counter(f"mcp.{name}.cache.hit"),
+                "cache_misses": self._metrics.counter(f"mcp.{name}.cache.miss"),
+                "timeouts": self._metrics.counter(f"mcp.{name}.timeouts"),
+                "errors": self._metrics.counter(f"mcp.{name}.errors"),
+            }
+            for name in self._tools
+        }
+
+
+Payload = Union[Dict[str, Any], BaseModel]
+ToolCall = Tuple[str, Payload]
+
+_SHARED_EXECUTOR: Optional[ThreadPoolExecutor] = None
+_SHARED_EXECUTOR_LOCK = threading.Lock()
+
+
+def _shared_executor() -> ThreadPoolExecutor:
+    # Long-lived, so a timed-out sync handler never blocks a later event loop's shutdown.
+    global _SHARED_EXECUTOR
+    with _SHARED_EXECUTOR_LOCK:
+        if _SHARED_EXECUTOR is None:
+            _SHARED_EXECUTOR = ThreadPoolExecutor(thread_name_prefix="mcp-call")
+        return _SHARED_EXECUTOR
+
+
+def _run_sync(coro: Awaitable[T]) -> T:
+    """Run a coroutine to completion from sync code that has no running event loop.
+
+    Blocking a running loop until the coroutine finishes would stall every
+    other task on it, so that is refused: async callers use ``acall`` /
+    ``acall_many`` instead.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    if inspect.iscoroutine(coro):
+        coro.close()
+    raise RuntimeError(
+        "LocalMCPClient.call / call_many cannot block a running event loop; await acall / acall_many instead"
+    )
+
 
 class LocalMCPClient:
-    def __init__(self, registry: ToolRegistry) -> None:
+    """Calls registered tools in-process.
+
+    By default every payload is validated against the tool's input model, as
+    for an external caller. A ``trusted`` client (used by the agents) passes
+    an already-typed input model straight to the handler, with no dump and
+    re-validation; dict payloads are still validated.
+
+    Handlers may be sync functions or coroutine functions. ``acall`` awaits
+    coroutine handlers on the caller's loop and runs sync ones on
+    ``executor`` (a shared pool by default); ``call_many`` / ``acall_many``
+    run independent calls concurrently. A timed-out sync handler keeps
+    running in its thread, but its result is discarded. The sync methods
+    must not be used from a coroutine: they raise ``RuntimeError`` there.
+    """
+
+    def __init__(
+        self, registry: ToolRegistry, *, trusted: bool = False, executor: Optional[Executor] = None
+    ) -> None:
         self._registry = registry
+        self._trusted = trusted
+        self._executor = executor
 
-    def call(self, name: str, payload: Dict[str, Any]) -> BaseModel:
-        spec = self._registry.get(name)
+    def _parse(self, spec: ToolSpec, payload: Payload) -> Tuple[BaseModel, bool, int]:
+        """The handler input, whether it was passed through as trusted, and the payload size.
+
+        Trusted inputs are never serialized, so their size is the spec's cheap estimate.
+        """
+        if self._trusted and isinstance(payload, spec.input_model):
+            return payload, True, (spec.payload_size or _text_size)(payload)
+        if isinstance(payload, BaseModel):
+            payload = payload.model_dump(mode="json")
+        payload_bytes = _payload_bytes(payload)
         try:
-            parsed = spec.input_model.model_validate(payload)
+            return spec.input_model.model_validate(payload), False, payload_bytes
         except ValidationError as exc:  # noqa: BLE001
-            raise ValueError(f"Invalid input for tool '{name}': {exc}") from exc
+            raise ValueError(f"Invalid input for tool '{spec.name}': {exc}") from exc
+
+    def _cached(self, name: str, parsed: BaseModel) -> Tuple[Optional[str], Optional[BaseModel]]:
+        cache = self._registry.cache(name)
+        if cache is None or not cache.enabled:
+            return None, None
+        spec = self._registry.get(name)
+        key = spec.cache_key(parsed) if spec.cache_key is not None else input_fingerprint(parsed)
+        return key, cache.get(key)
 
-        result = spec.handler(parsed)
+    def _accept(self, spec: ToolSpec, key: Optional[str], result: Any) -> BaseModel:
         if not isinstance(result, spec.output_model):
-            raise TypeError(f"Tool '{name}' returned invalid output type")
+            raise TypeError(f"Tool '{spec.name}' returned invalid output type")
+        if key is not None:
+            self._registry.cache(spec.name).put(key, result)
         return result
+
+    def call(self, name: str, payload: Payload) -> BaseModel:
+        spec = self._registry.get(name)
+        started = time.perf_counter()
+        try:
+            parsed, trusted, payload_bytes = self._parse(spec, payload)
+            key, result = self._cached(name, parsed)
+            cache_hit = result is not None
+            if result is None:
+                output = spec.handler(parsed)
+                if inspect.isawaitable(output):
+                    output = _run_sync(output)
+                result = self._accept(spec, key, output)
+        except Exception:
+            self._registry.record_error(name)
+            raise
+        self._registry.record_call(
+            name,
+            (time.perf_counter() - started) * 1000.0,
+            payload_bytes,
+            trusted=trusted,
+            cached=None if key is None else cache_hit,
+        )
+        return result
+
+    async def acall(self, name: str, payload: Payload, *, timeout: Optional[float] = None) -> BaseModel:
+        """Async ``call``; raises ``TimeoutError`` if the tool takes longer than ``timeout`` seconds.
+
+        A ``TimeoutError`` raised by the handler itself propagates unchanged
+        and is not counted as a tool timeout.
+        """
+        spec = self._registry.get(name)
+        deadline = asyncio.timeout(timeout)
+        try:
+            async with deadline:
+                if not inspect.iscoroutinefunction(spec.handler):
+                    loop = asyncio.get_running_loop()
+                    return await loop.run_in_executor(self._executor or _shared_executor(), self.call, name, payload)
+
+                started = time.perf_counter()
+                try:
+                    parsed, trusted, payload_bytes = self._parse(spec, payload)
+                    key, result = self._cached(name, parsed)
+                    cache_hit = result is not None
+                    if result is None:
+                        result = self._accept(spec, key, await spec.handler(parsed))
+                except Exception:
+                    # Expiry cancels the handler, which is not an Exception: it counts as a timeout.
+                    self._registry.record_error(name)
+                    raise
+        except TimeoutError:
+            if not deadline.expired():
+                raise
+            self._registry.record_timeout(name)
+            raise TimeoutError(f"Tool '{name}' timed out after {timeout}s") from None
+        self._registry.record_call(
+            name,
+            (time.perf_counter() - started) * 1000.0,
+            payload_bytes,
+            trusted=trusted,
+            cached=None if key is None else cache_hit,
+        )
+        return result
+
+    async def acall_many(
+        self, calls: Sequence[ToolCall], *, timeout: Optional[float] = None
+    ) -> List[Union[BaseModel, Exception]]:
+        """Run independent calls concurrently; each slot holds the output or the exception raised."""
+        return await asyncio.gather(
+            *(self.acall(name, payload, timeout=timeout) for name, payload in calls), return_exceptions=True
+        )
+
+    def call_many(
+        self, calls: Sequence[ToolCall], *, timeout: Optional[float] = None
+    ) -> List[Union[BaseModel, Exception]]:
+        """Sync ``acall_many``, usable from agents and other sync code."""
+        return _run_sync(self.acall_many(calls, timeout=timeout))
@@ -0,0 +1,303 @@
+"""MCP server exposing the local tools over JSON-RPC 2.0.
+
+Messages are newline-delimited JSON, over stdio (``python -m
+karpenter_ai_agent.mcp``) or a Unix socket (``--socket PATH``). Supported
+methods: ``initialize``, ``ping``, ``tools/list`` and ``tools/call``, plus
+JSON-RPC batches (a JSON array of requests, answered with one array).
+
+Each message is dispatched as its own asyncio task, so a slow call does not
+hold up the next line. Async tool handlers are awaited on the loop; sync ones
+run on a bounded thread pool (``MCP_SERVER_WORKERS``, default 4). At most
+``MCP_SERVER_MAX_PENDING`` messages (default 64) are pending per connection:
+once that many are being handled, no more lines are read from it until one
+finishes. The same limit bounds tool calls in flight across all connections,
+batch items included. Responses are written as they complete and may arrive
+out of order; match them by ``id``. The socket is removed on shutdown.
+
+The process is long-lived: the docs index and the analysis graph are loaded
+once at startup (``warm``), and tool result caches persist between calls.
+Payloads are validated like any external caller's.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from karpenter_ai_agent.mcp.runtime import LocalMCPClient, ToolRegistry, ToolSpec
+from karpenter_ai_agent.mcp.tools import create_registry
+from karpenter_ai_agent.models import AnalysisInput, AnalysisReport
+
+SERVER_WORKERS_ENV = "MCP_SERVER_WORKERS"
+SERVER_MAX_PENDING_ENV = "MCP_SERVER_MAX_PENDING"
+DEFAULT_SERVER_WORKERS = 4
+DEFAULT_SERVER_MAX_PENDING = 64
+PROTOCOL_VERSION = "2025-06-18"
+SERVER_NAME = "karpenter-ai-agent"
+# Manifests and batched calls can be large; asyncio's default line limit is 64 KiB.
+MAX_MESSAGE_BYTES = 16 * 2**20
+
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+
+logger = logging.getLogger(__name__)
+
+Send = Callable[[bytes], Awaitable[None]]
+
+
+def _env_int(name: str, default: int) -> int:
+    raw = os.environ.get(name, "").strip()
+    try:
+        return max(int(raw), 1) if raw else default
+    except ValueError:
+        return default
+
+
+def analyze_karpenter_yaml(payload: AnalysisInput) -> AnalysisReport:
+    """Run the full analysis pipeline on Karpenter YAML and return the report."""
+    from karpenter_ai_agent.orchestration.graph import run_analysis_graph
+
+    return run_analysis_graph(payload)
+
+
+def create_server_registry() -> ToolRegistry:
+    """All local tools plus ``analyze_karpenter_yaml``."""
+    registry = create_registry()
+    registry.register(
+        ToolSpec(
+            name="analyze_karpenter_yaml",
+            input_model=AnalysisInput,
+            output_model=AnalysisReport,
+            handler=analyze_karpenter_yaml,
+        )
+    )
+    return registry
+
+
+class _InvalidParams(Exception):
+    pass
+
+
+def _error(request_id: Any, code: int, message: str) -> Dict[str, Any]:
+    return {"jsonrpc": "2.0", "id": request_id, "error": {"code": code, "message": message}}
+
+
+def _result(request_id: Any, result: Dict[str, Any]) -> Dict[str, Any]:
+    return {"jsonrpc": "2.0", "id": request_id, "result": result}
+
+
+class MCPServer:
+    def __init__(
+        self,
+        registry: ToolRegistry,
+        *,
+        max_workers: Optional[int] = None,
+        max_pending: Optional[int] = None,
+    ) -> None:
+        self.registry = registry
+        self.max_pending = max_pending or _env_int(SERVER_MAX_PENDING_ENV, DEFAULT_SERVER_MAX_PENDING)
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or _env_int(SERVER_WORKERS_ENV, DEFAULT_SERVER_WORKERS),
+            thread_name_prefix="mcp-tool",
+        )
+        self.client = LocalMCPClient(registry, executor=self._executor)
+        self._slots: Optional[asyncio.Semaphore] = None
+
+    @staticmethod
+    def warm() -> None:
+        """Load the docs index and knowledge store and compile the analysis graph before the first call."""
+        from karpenter_ai_agent.orchestration.graph import compiled_graph
+        from karpenter_ai_agent.rag.index import get_default_index
+        from karpenter_ai_agent.rag.store import get_default_store
+
+        get_default_index()
+        get_default_store()
+        compiled_graph()
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+
+    def tools(self) -> List[Dict[str, Any]]:
+        listed = []
+        for name in self.registry.names():
+            spec = self.registry.get(name)
+            listed.append(
+                {
+                    "name": name,
+                    "description": (spec.handler.__doc__ or "").strip().split("\n")[0],
+                    "inputSchema": spec.input_model.model_json_schema(),
+                }
+            )
+        return listed
+
+    async def handle_message(self, message: Any) -> Optional[Any]:
+        """Response for one decoded message or batch; None when nothing is owed."""
+        if isinstance(message, list):
+            if not message:
+                return _error(None, INVALID_REQUEST, "Empty batch")
+            responses = await asyncio.gather(*(self._handle_request(item) for item in message))
+            answered = [response for response in responses if response is not None]
+            return answered or None
+        return await self._handle_request(message)
+
+    async def handle_line(self, line: bytes) -> Optional[bytes]:
+        try:
+            message = json.loads(line)
+        except ValueError as exc:
+            response: Any = _error(None, PARSE_ERROR, f"Parse error: {exc}")
+        else:
+            response = await self.handle_message(message)
+        if response is None:
+            return None
+        return json.dumps(response, separators=(",", ":")).encode("utf-8") + b"\n"
+
+    async def _handle_request(self, request: Any) -> Optional[Dict[str, Any]]:
+        if not isinstance(request, dict) or request.get("jsonrpc") != "2.0" or "method" not in request:
+            return _error(request.get("id") if isinstance(request, dict) else None, INVALID_REQUEST, "Invalid request")
+        request_id = request.get("id")
+        # Requests without an id are notifications and get no response.
+        is_notification = "id" not in request
+        method = request["method"]
+        params = request.get("params") or {}
+        try:
+            if method == "initialize":
+                result = {
+                    "protocolVersion": PROTOCOL_VERSION,
+                    "capabilities": {"tools": {"listChanged": False}},
+                    "serverInfo": {"name": SERVER_NAME, "version": "0.1.0"},
+                }
+            elif method == "ping":
+                result = {}
+            elif method == "tools/list":
+                result = {"tools": self.tools()}
+            elif method == "tools/call":
+                result = await self._call_tool(params)
+            elif method.startswith("notifications/"):
+                return None
+            else:
+                return None if is_notification else _error(request_id, METHOD_NOT_FOUND, f"Method not found: {method}")
+        except _InvalidParams as exc:
+            return None if is_notification else _error(request_id, INVALID_PARAMS, str(exc))
+        except Exception as exc:  # noqa: BLE001
+            logger.exception("MCP request %r failed", method)
+            return None if is_notification else _error(request_id, INTERNAL_ERROR, str(exc))
+        return None if is_notification else _result(request_id, result)
+
+    async def _call_tool(self, params: Any) -> Dict[str, Any]:
+        if not isinstance(params, dict):
+            raise _InvalidParams("params must be an object")
+        name = params.get("name")
+        if name not in self.registry.names():
+            raise _InvalidParams(f"Unknown tool: {name}")
+        arguments = params.get("arguments") or {}
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_pending)
+        async with self._slots:
+            try:
+                output = await self.client.acall(name, arguments)
+            except (ValueError, TypeError) as exc:
+                # Tool errors are reported in the result, so the model can see them.
+                return {"content": [{"type": "text", "text": str(exc)}], "isError": True}
+        structured = output.model_dump(mode="json")
+        return {
+            "content": [{"type": "text", "text": json.dumps(structured)}],
+            "structuredContent": structured,
+            "isError": False,
+        }
+
+    async def serve(self, reader: asyncio.StreamReader, send: Send) -> None:
+        """Answer newline-delimited messages from ``reader`` until EOF."""
+        lock = asyncio.Lock()
+        pending = set()
+        slots = asyncio.Semaphore(self.max_pending)
+
+        async def respond(line: bytes) -> None:
+            try:
+                data = await self.handle_line(line)
+                if data is not None:
+                    async with lock:
+                        await send(data)
+            finally:
+                slots.release()
+
+        while True:
+            # Backpressure: a client cannot queue more than max_pending messages.
+            await slots.acquire()
+            line = await reader.readline()
+            if not line or not line.strip():
+                slots.release()
+                if not line:
+                    break
+                continue
+            task = asyncio.create_task(respond(line))
+            pending.add(task)
+            task.add_done_callback(pending.discard)
+        if pending:
+            await asyncio.gather(*pending)
+
+    async def serve_stdio(self) -> None:
+        loop = asyncio.get_running_loop()
+        reader = asyncio.StreamReader(limit=MAX_MESSAGE_BYTES)
+        await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), sys.stdin)
+        out = sys.stdout.buffer
+
+        async def send(data: bytes) -> None:
+            out.write(data)
+            out.flush()
+
+        await self.serve(reader, send)
+
+    async def serve_unix(self, path: Path) -> None:
+        async def connection(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+            async def send(data: bytes) -> None:
+                writer.write(data)
+                await writer.drain()
+
+            try:
+                await self.serve(reader, send)
+            finally:
+                writer.close()
+
+        if path.is_socket():
+            path.unlink()  # left behind by an earlier run
+        elif os.path.lexists(path):
+            raise FileExistsError(f"{path} exists and is not a socket")
+        server = await asyncio.start_unix_server(connection, path=str(path), limit=MAX_MESSAGE_BYTES)
+        bound = path.stat().st_ino
+        logger.info("MCP server listening on %s", path)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            # Leave the path alone if another server has bound it since.
+            if path.is_socket() and path.stat().st_ino == bound:
+                path.unlink()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Serve the local Karpenter tools over MCP (JSON-RPC 2.0).")
+    parser.add_argument("--socket", type=Path, default=None, help="Listen on this Unix socket instead of stdio")
+    parser.add_argument("--workers", type=int, default=None, help=f"Tool worker threads (default ${SERVER_WORKERS_ENV})")
+    args = parser.parse_args(argv)
+    if args.socket is not None and os.path.lexists(args.socket) and not args.socket.is_socket():
+        parser.error(f"--socket {args.socket} exists and is not a socket")
+
+    # stdout carries the protocol; logs go to stderr.
+    logging.basicConfig(level=logging.INFO, stream=sys.stderr, format="%(levelname)s %(name)s: %(message)s")
+    server = MCPServer(create_server_registry(), max_workers=args.workers)
+    server.warm()
+    try:
+        asyncio.run(server.serve_unix(args.socket) if args.socket else server.serve_stdio())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
@@ -1,7 +1,11 @@
 from __future__ import annotations
 
-from typing import Dict, Any
+import hashlib
+import json
+from typing import Any, Dict, Iterable, Optional
 
+from karpenter_ai_agent.mcp.runtime import ToolRegistry, ToolSpec
+from karpenter_ai_agent.metrics import METRICS, MetricsRegistry
 from karpenter_ai_agent.models import ParseError, CanonicalConfig
 from karpenter_ai_agent.mcp.schemas import (
     ValidateYamlSchemaInput,
@@ -15,6 +19,8 @@ from karpenter_ai_agent.mcp.schemas import (
     RetrievedDocChunk,
 )
 from karpenter_ai_agent.parser_compat import parse_provisioner_yaml
+from karpenter_ai_agent.pricing import estimate_savings, get_price_table
+from karpenter_ai_agent.rag.index import get_default_index
 from karpenter_ai_agent.rag.models import RAGQuery
 from karpenter_ai_agent.rag.tool import retrieve_context
 
@@ -36,16 +42,35 @@ def validate_yaml_schema(
 def estimate_cost_signals(
     payload: EstimateCostSignalsInput,
 ) -> EstimateCostSignalsOutput:
-    """Return deterministic cost-related signals from the canonical config."""
+    """Return deterministic cost signals and estimated savings from the canonical config."""
     provisioners = payload.config.provisioners
     signals: Dict[str, Any] = {
         "total_provisioners": len(provisioners),
         "spot_enabled": sum(1 for p in provisioners if p.spot_allowed),
         "graviton_used": sum(1 for p in provisioners if p.graviton_used),
     }
+    signals.update(
+        estimate_savings(provisioners, region=payload.region, monthly_spend=payload.monthly_spend)
+    )
     return EstimateCostSignalsOutput(signals=signals)
 
 
+def cost_signals_key(payload: EstimateCostSignalsInput) -> str:
+    """Hash of what ``estimate_cost_signals`` reads; far cheaper than dumping the whole config."""
+    fields = [
+        [p.name, p.instance_families, p.spot_allowed, p.graviton_used] for p in payload.config.provisioners
+    ]
+    encoded = json.dumps(
+        [fields, payload.region, payload.monthly_spend, get_price_table().version], separators=(",", ":")
+    )
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def config_size(payload: EstimateCostSignalsInput) -> int:
+    """Resources in the config: the size of a trusted call, which is never serialized."""
+    return len(payload.config.provisioners) + len(payload.config.ec2_nodeclasses)
+
+
 def explain_recommendation(
     payload: ExplainRecommendationInput,
 ) -> ExplainRecommendationOutput:
@@ -72,3 +97,70 @@ def retrieve_karpenter_docs(
         for context in result.contexts
     ]
     return RetrieveKarpenterDocsOutput(chunks=chunks)
+
+
+def karpenter_docs_key(payload: RetrieveKarpenterDocsInput) -> str:
+    """The query plus the version of the index that answers it, so a rebuilt index misses."""
+    encoded = json.dumps([payload.query, payload.top_k, get_default_index().version], separators=(",", ":"))
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def tool_specs() -> Dict[str, ToolSpec]:
+    """Specs for every local tool. All are deterministic and read-only; the ones
+    whose work outweighs hashing their input are cached."""
+    specs = (
+        ToolSpec(
+            name="validate_yaml_schema",
+            input_model=ValidateYamlSchemaInput,
+            output_model=ValidateYamlSchemaOutput,
+            handler=validate_yaml_schema,
+            cacheable=True,
+            cache_size=256,
+            cache_ttl_seconds=3600.0,
+        ),
+        # Keyed on the provisioner fields it reads, not the whole config (see cost_signals_key).
+        ToolSpec(
+            name="estimate_cost_signals",
+            input_model=EstimateCostSignalsInput,
+            output_model=EstimateCostSignalsOutput,
+            handler=estimate_cost_signals,
+            cacheable=True,
+            cache_size=256,
+            cache_ttl_seconds=3600.0,
+            cache_key=cost_signals_key,
+            payload_size=config_size,
+        ),
+        ToolSpec(
+            name="explain_recommendation",
+            input_model=ExplainRecommendationInput,
+            output_model=ExplainRecommendationOutput,
+            handler=explain_recommendation,
+            cacheable=True,
+            cache_size=512,
+            cache_ttl_seconds=3600.0,
+        ),
+        # Keyed on the index version too (see karpenter_docs_key); the short TTL
+        # just bounds how long entries for a replaced index linger.
+        ToolSpec(
+            name="retrieve_karpenter_docs",
+            input_model=RetrieveKarpenterDocsInput,
+            output_model=RetrieveKarpenterDocsOutput,
+            handler=retrieve_karpenter_docs,
+            cacheable=True,
+            cache_size=1024,
+            cache_ttl_seconds=300.0,
+            cache_key=karpenter_docs_key,
+        ),
+    )
+    return {spec.name: spec for spec in specs}
+
+
+def create_registry(
+    names: Optional[Iterable[str]] = None, metrics: MetricsRegistry = METRICS
+) -> ToolRegistry:
+    """A registry with the named local tools (all of them by default)."""
+    specs = tool_specs()
+    registry = ToolRegistry(metrics=metrics)
+    for name in specs if names is None else names:
+        registry.register(specs[name])
+    return registry
@@ -0,0 +1,85 @@
+"""Process-local counters and observations for runtime instrumentation."""
+from __future__ import annotations
+
+import threading
+from pathlib import Path
+from typing import Any, Dict
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._counters: Dict[str, float] = {}
+        self._observations: Dict[str, Dict[str, float]] = {}
+
+    def increment(self, name: str, value: float = 1) -> None:
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def observe(self, name: str, value: float) -> None:
+        with self._lock:
+            stats = self._observations.get(name)
+            if stats is None:
+                self._observations[name] = {
+                    "count": 1,
+                    "total": value,
+                    "min": value,
+                    "max": value,
+                    "last": value,
+                }
+                return
+            stats["count"] += 1
+            stats["total"] += value
+            stats["min"] = min(stats["min"], value)
+            stats["max"] = max(stats["max"], value)
+            stats["last"] = value
+
+    def counter(self, name: str) -> float:
+        with self._lock:
+            return self._counters.get(name, 0)
+
+    def observation(self, name: str) -> Dict[str, float]:
+        with self._lock:
+            return dict(self._observations.get(name, {}))
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "counters": dict(self._counters),
+                "observations": {
+                    name: dict(stats) for name, stats in self._observations.items()
+                },
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._observations.clear()
+
+
+METRICS = MetricsRegistry()
+
+_STATUS_FIELDS = {"VmRSS": "rss", "RssAnon": "private", "RssFile": "file", "RssShmem": "shmem"}
+
+
+def process_memory() -> Dict[str, float]:
+    """Resident memory of this process in MiB (``rss``, ``private``, ``file``, ``shmem``).
+
+    ``file`` and ``shmem`` pages (e.g. a memory-mapped index) are shared with other
+    processes mapping the same file. Reads ``/proc/self/status``; elsewhere only the
+    peak RSS is available, reported as ``rss``.
+    """
+    try:
+        lines = Path("/proc/self/status").read_text().splitlines()
+    except OSError:
+        import resource
+        import sys
+
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return {"rss": round(peak / (2**20 if sys.platform == "darwin" else 1024), 1)}
+    memory: Dict[str, float] = {}
+    for line in lines:
+        name, _, value = line.partition(":")
+        if name in _STATUS_FIELDS:
+            memory[_STATUS_FIELDS[name]] = round(int(value.split()[0]) / 1024, 1)
+    return memory
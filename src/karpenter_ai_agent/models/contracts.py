@@ -70,6 +70,8 @@ class AnalysisInput(BaseModel):
     yaml_text: str
     region: Optional[str] = None
     monthly_spend: Optional[float] = None
+    # Optional ``kubectl get pods,nodes -o yaml|json`` output for the consolidation simulator.
+    snapshot_yaml: Optional[str] = None
     options: Dict[str, Any] = Field(default_factory=dict)
 
 
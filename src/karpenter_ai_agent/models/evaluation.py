@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import List, Optional
+from typing import List, Optional, Set
 
 from pydantic import BaseModel, Field
 
@@ -17,3 +17,6 @@ class EvaluationResult(BaseModel):
     notes: List[str] = Field(default_factory=list)
     retries: int = 0
     latency_ms: float = Field(default=0.0, ge=0.0)
+
+    def failing_rule_ids(self) -> Set[str]:
+        return {reason.rule_id for reason in self.reasons if reason.rule_id}
@@ -76,5 +76,7 @@ def aggregate_results(
         raw={
             "nodepool_refs": nodepool_refs,
             "nodeclass_names": [nc.name for nc in parser_output.config.ec2_nodeclasses],
+            "cost_signals": dict(cost_result.signals) if cost_result else {},
+            "consolidation": reliability_result.signals.get("consolidation") if reliability_result else None,
         },
     )
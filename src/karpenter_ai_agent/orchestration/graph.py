@@ -1,20 +1,23 @@
 from __future__ import annotations
 
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Set
 from pydantic import BaseModel
 
 from langgraph.graph import StateGraph, END
 
 from karpenter_ai_agent.models import AnalysisInput, ParserOutput, AgentResult, AnalysisReport
+from karpenter_ai_agent.models.evaluation import EvaluationResult
 from karpenter_ai_agent.agents.parser_agent import ParserAgent
 from karpenter_ai_agent.agents.cost_agent import CostAgent
 from karpenter_ai_agent.agents.reliability_agent import ReliabilityAgent
 from karpenter_ai_agent.agents.security_agent import SecurityAgent
 from karpenter_ai_agent.agents.evaluator_agent import EvaluatorAgent
+from karpenter_ai_agent.llm.resilience import Deadline
 from karpenter_ai_agent.orchestration.aggregate import aggregate_results
+from karpenter_ai_agent.rag.cache import current_usage, track_usage
 from karpenter_ai_agent.rag.explain import attach_contract_explanations
-from karpenter_ai_agent.rag.models import RAGQuery, RetrievedContext
-from karpenter_ai_agent.rag.tool import build_issue_query, retrieve_context
+from karpenter_ai_agent.rag.models import RAGResult, RetrievedContext
+from karpenter_ai_agent.rag.tool import retrieve_issue_contexts
 
 
 class GraphState(BaseModel):
@@ -25,6 +28,9 @@ class GraphState(BaseModel):
     security_result: Optional[AgentResult] = None
     report: Optional[AnalysisReport] = None
     explain_attempts: int = 0
+    # One retrieval per report issue, in order; filled by explain and reused downstream.
+    retrievals: Optional[List[RAGResult]] = None
+    rag_retrievals: int = 0
 
 
 parser_agent = ParserAgent()
@@ -51,7 +57,12 @@ def node_reliability(state: GraphState) -> Dict[str, Any]:
     config = state.parser_output.config if state.parser_output else None
     if config is None:
         return {"reliability_result": AgentResult()}
-    result = reliability_agent.run(config)
+    result = reliability_agent.run(
+        config,
+        state.input.snapshot_yaml,
+        state.input.region,
+        workers=_simulation_workers(state),
+    )
     return {"reliability_result": result}
 
 
@@ -82,18 +93,37 @@ def _evaluator_enabled(state: GraphState) -> bool:
     return bool(state.input.options.get("enable_evaluator")) if state.input else False
 
 
+def _simulation_workers(state: GraphState) -> Optional[int]:
+    workers = state.input.options.get("simulation_workers") if state.input else None
+    return workers if isinstance(workers, int) else None
+
+
+def _llm_deadline(state: GraphState) -> Optional[Deadline]:
+    deadline = state.input.options.get("llm_deadline") if state.input else None
+    return deadline if isinstance(deadline, Deadline) else None
+
+
 def node_explain(state: GraphState) -> Dict[str, Any]:
     report = state.report
     if report is None:
         return {}
     if not _explanations_enabled(state):
         return {}
-    attach_contract_explanations(
+    retrievals = attach_contract_explanations(
         report.issues,
         llm_available=bool(state.input.options.get("enable_explanation_llm")),
+        deadline=_llm_deadline(state),
+        retrievals=state.retrievals,
     )
+    rag_retrievals = state.rag_retrievals + (len(retrievals) if state.retrievals is None else 0)
     report.raw["explanations_enabled"] = True
-    return {"report": report, "explain_attempts": state.explain_attempts + 1}
+    report.raw["rag_retrievals"] = rag_retrievals
+    return {
+        "report": report,
+        "explain_attempts": state.explain_attempts + 1,
+        "retrievals": retrievals,
+        "rag_retrievals": rag_retrievals,
+    }
 
 
 def node_evaluate(state: GraphState) -> Dict[str, Any]:
@@ -105,7 +135,17 @@ def node_evaluate(state: GraphState) -> Dict[str, Any]:
     if not _explanations_enabled(state):
         return {}
 
-    rag_context = _build_rag_context(report.issues)
+    retrievals = state.retrievals
+    rag_retrievals = state.rag_retrievals
+    if retrievals is None:
+        retrievals = retrieve_issue_contexts(report.issues, top_k=3)
+        rag_retrievals += len(retrievals)
+    report.raw["rag_retrievals"] = rag_retrievals
+    rag_context = _build_rag_context(report.issues, retrievals)
+    usage = current_usage()
+    if usage is not None:
+        # This run's lookups only; the process-wide rate is in the rag.query_cache.* metrics.
+        report.raw["rag_query_cache_hit_rate"] = round(usage.hit_rate, 4)
     evaluation = evaluator_agent.run(
         report,
         rag_context=rag_context,
@@ -116,17 +156,28 @@ def node_evaluate(state: GraphState) -> Dict[str, Any]:
     report.raw["evaluation_latency_ms"] = round(evaluation.latency_ms, 2)
     report.raw["evaluation_retries"] = 0
 
+    reused = {"retrievals": retrievals, "rag_retrievals": rag_retrievals}
     if evaluation.passed:
-        return {"report": report}
-
+        return {"report": report, **reused}
+
+    targets = _retry_targets(report, evaluation)
+    positions = [
+        position
+        for position, issue in enumerate(report.issues)
+        if targets is None or issue.rule_id in targets
+    ]
     attach_contract_explanations(
-        report.issues,
+        [report.issues[position] for position in positions],
         llm_available=bool(state.input.options.get("enable_explanation_llm")),
+        deadline=_llm_deadline(state),
+        retrievals=[retrievals[position] for position in positions],
     )
+    report.raw["evaluation_retry_issues"] = len(positions)
     retry_evaluation = evaluator_agent.run(
         report,
         rag_context=rag_context,
         generated_explanation=report.ai_summary,
+        rule_ids=targets,
     )
     retry_evaluation.retries = 1
     report.evaluation_notes = retry_evaluation.notes
@@ -135,7 +186,7 @@ def node_evaluate(state: GraphState) -> Dict[str, Any]:
     report.raw["evaluation_retries"] = 1
 
     if retry_evaluation.passed:
-        return {"report": report, "explain_attempts": state.explain_attempts + 1}
+        return {"report": report, "explain_attempts": state.explain_attempts + 1, **reused}
 
     for issue in report.issues:
         issue.explanation = None
@@ -143,18 +194,25 @@ def node_evaluate(state: GraphState) -> Dict[str, Any]:
     report.raw["explanations_enabled"] = False
     report.raw["explanation_fail_closed"] = True
 
-    return {"report": report}
+    return {"report": report, **reused}
+
+
+def _retry_targets(report: AnalysisReport, evaluation: EvaluationResult) -> Optional[Set[str]]:
+    """Rule IDs whose explanations failed, or None to regenerate every issue.
+
+    Reasons without a rule ID, or naming a finding that is not in the report
+    (hallucinated references), cannot be pinned to one explanation.
+    """
+    if not evaluation.reasons or any(not reason.rule_id for reason in evaluation.reasons):
+        return None
+    failing = evaluation.failing_rule_ids()
+    if not failing <= {issue.rule_id for issue in report.issues}:
+        return None
+    return failing
 
 
-def _build_rag_context(issues: list) -> Dict[str, list[RetrievedContext]]:
-    context_by_rule: Dict[str, list[RetrievedContext]] = {}
-    for issue in issues:
-        query = build_issue_query(issue)
-        if not query:
-            continue
-        result = retrieve_context(RAGQuery(query=query, top_k=3))
-        context_by_rule[issue.rule_id] = result.contexts
-    return context_by_rule
+def _build_rag_context(issues: list, retrievals: List[RAGResult]) -> Dict[str, list[RetrievedContext]]:
+    return {issue.rule_id: result.contexts for issue, result in zip(issues, retrievals)}
 
 
 def _should_short_circuit(state: GraphState) -> str:
@@ -194,9 +252,19 @@ def build_graph() -> StateGraph:
     return graph
 
 
+_COMPILED_GRAPH: Any = None
+
+
+def compiled_graph() -> Any:
+    """The analysis graph, compiled once per process; each invoke gets its own state."""
+    global _COMPILED_GRAPH
+    if _COMPILED_GRAPH is None:
+        _COMPILED_GRAPH = build_graph().compile()
+    return _COMPILED_GRAPH
+
+
 def run_analysis_graph(analysis_input: AnalysisInput) -> AnalysisReport:
-    graph = build_graph()
-    runnable = graph.compile()
-    result = runnable.invoke(GraphState(input=analysis_input))
+    with track_usage():
+        result = compiled_graph().invoke(GraphState(input=analysis_input))
     report = result["report"]
     return report
@@ -0,0 +1,13 @@
+"""Offline EC2 pricing and cost-finding savings estimates."""
+
+from karpenter_ai_agent.pricing.savings import SavingsEstimate, estimate_savings, vectorized_available
+from karpenter_ai_agent.pricing.table import InstancePrice, PriceTable, get_price_table
+
+__all__ = [
+    "InstancePrice",
+    "PriceTable",
+    "SavingsEstimate",
+    "estimate_savings",
+    "get_price_table",
+    "vectorized_available",
+]
@@ -0,0 +1,161 @@
+"""Estimated savings of the Spot and Graviton cost findings, per NodePool.
+
+Each NodePool can launch a set of instance types: its instance families, or
+every x86 type in the price table when it does not restrict them. Savings
+rates are averaged over that set, each type counted once:
+
+* Spot: ``sum(price * spot_discount) / sum(price)``;
+* Graviton: ``sum(price - graviton_price) / sum(price)`` over the types that
+  have a same-size Graviton equivalent.
+
+With a ``monthly_spend``, it is split evenly across the NodePools and each
+finding saves its rate of that share. Without one, savings are quoted per
+always-on node: the set's mean hourly price times the rate, over a month.
+
+Sums are taken once per distinct eligible set. With NumPy (``pip install
+karpenter-ai-agent[fast]``) they come from one matrix product of the sets'
+eligibility mask and the price columns; without it, from pure Python.
+
+The estimates rank findings by dollar impact; they are not a bill. The total
+counts a NodePool's Graviton savings only on the price left after Spot.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from karpenter_ai_agent.models import CanonicalProvisioner
+from karpenter_ai_agent.pricing.table import HOURS_PER_MONTH, PriceTable, get_price_table
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised only without the extra
+    np = None  # type: ignore[assignment]
+
+# Per eligible set: price, Spot saving, price of types with a Graviton
+# equivalent, Graviton saving, type count, count with a Graviton equivalent.
+_SUMS = 6
+
+
+def vectorized_available() -> bool:
+    return np is not None
+
+
+@dataclass(frozen=True)
+class SavingsEstimate:
+    nodepool: str
+    finding: str  # "spot" or "graviton"
+    savings_percent: float
+    monthly_savings_usd: float
+    eligible_instance_types: int
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "nodepool": self.nodepool,
+            "finding": self.finding,
+            "savings_percent": round(self.savings_percent, 1),
+            "monthly_savings_usd": round(self.monthly_savings_usd, 2),
+            "eligible_instance_types": self.eligible_instance_types,
+        }
+
+
+def _columns(table: PriceTable) -> List[Tuple[float, ...]]:
+    columns = []
+    for price in table.instances:
+        graviton = table.get(price.graviton_equivalent) if price.graviton_equivalent else None
+        hourly = price.on_demand_hourly
+        columns.append(
+            (
+                hourly,
+                hourly * price.spot_discount,
+                hourly if graviton else 0.0,
+                hourly - graviton.on_demand_hourly if graviton else 0.0,
+                1.0,
+                1.0 if graviton else 0.0,
+            )
+        )
+    return columns
+
+
+def eligible_sums(table: PriceTable, eligible: Sequence[Sequence[int]], *, vectorized: Optional[bool] = None):
+    """Row ``i`` holds the ``_SUMS`` sums over the instance types in ``eligible[i]``."""
+    columns = _columns(table)
+    if vectorized is None:
+        vectorized = vectorized_available()
+    if vectorized and np is not None:
+        mask = np.zeros((len(eligible), len(columns)), dtype=np.float64)
+        rows = np.repeat(np.arange(len(eligible)), [len(cols) for cols in eligible])
+        flat = np.fromiter((c for cols in eligible for c in cols), dtype=np.intp, count=len(rows))
+        mask[rows, flat] = 1.0
+        return (mask @ np.asarray(columns, dtype=np.float64).reshape(-1, _SUMS)).tolist()
+    sums = []
+    for cols in eligible:
+        row = [0.0] * _SUMS
+        for c in set(cols):
+            for k, value in enumerate(columns[c]):
+                row[k] += value
+        sums.append(row)
+    return sums
+
+
+def estimate_savings(
+    provisioners: Sequence[CanonicalProvisioner],
+    *,
+    region: Optional[str] = None,
+    monthly_spend: Optional[float] = None,
+    table: Optional[PriceTable] = None,
+    vectorized: Optional[bool] = None,
+) -> Dict[str, Any]:
+    """Savings of each Spot / Graviton finding, ranked by monthly dollar impact."""
+    table = table or get_price_table()
+    region_name, multiplier, region_known = table.resolve_region(region)
+    # NodePools often share family lists; sum each distinct eligible set once.
+    keys: Dict[Tuple[str, ...], int] = {}
+    rows = [
+        keys.setdefault(tuple(sorted({f.lower() for f in p.instance_families})), len(keys))
+        for p in provisioners
+    ]
+    set_sums = eligible_sums(table, [table.eligible(key) for key in keys], vectorized=vectorized)
+    sums = [set_sums[row] for row in rows]
+    share = monthly_spend / len(provisioners) if monthly_spend and provisioners else None
+
+    estimates: List[SavingsEstimate] = []
+    unpriced: List[str] = []
+    total = 0.0
+    for prov, row in zip(provisioners, sums):
+        price, spot, graviton_base, graviton, count, graviton_count = row
+        if not count:
+            if not (prov.spot_allowed and prov.graviton_used):
+                unpriced.append(prov.name)
+            continue
+        findings = []
+        if not prov.spot_allowed:
+            findings.append(("spot", spot / price, spot / count))
+        if not prov.graviton_used and graviton_count:
+            findings.append(("graviton", graviton / graviton_base, graviton / graviton_count))
+        # Graviton savings apply to what is left after the Spot discount.
+        remaining = 1.0
+        for finding, rate, hourly_saving in findings:
+            monthly = share * rate if share is not None else hourly_saving * multiplier * HOURS_PER_MONTH
+            total += monthly * remaining
+            remaining -= rate if finding == "spot" else 0.0
+            estimates.append(
+                SavingsEstimate(
+                    nodepool=prov.name,
+                    finding=finding,
+                    savings_percent=rate * 100.0,
+                    monthly_savings_usd=monthly,
+                    eligible_instance_types=int(count),
+                )
+            )
+
+    estimates.sort(key=lambda e: (-e.monthly_savings_usd, e.nodepool, e.finding))
+    return {
+        "region": region_name,
+        "region_priced": region_known,
+        "price_table_version": table.version,
+        "savings_basis": "monthly_spend" if share is not None else "per_node",
+        "estimated_savings": [estimate.to_dict() for estimate in estimates],
+        "estimated_monthly_savings_usd": round(total, 2),
+        "unpriced_nodepools": unpriced,
+    }
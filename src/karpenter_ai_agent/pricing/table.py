@@ -0,0 +1,136 @@
+"""Offline EC2 price table.
+
+``aws_prices.json`` ships approximate Linux On-Demand list prices for
+us-east-1 per instance type, a typical Spot discount and Graviton equivalent
+per family, and a regional price multiplier. The figures are for ranking
+findings by dollar impact, not for billing; point ``PRICE_TABLE_PATH`` at a
+file of the same shape to use your own (e.g. negotiated) prices.
+"""
+from __future__ import annotations
+
+import json
+import os
+from dataclasses import dataclass, field, replace
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+PRICE_TABLE_ENV = "PRICE_TABLE_PATH"
+DEFAULT_PRICE_TABLE = Path(__file__).with_name("aws_prices.json")
+DEFAULT_REGION = "us-east-1"
+HOURS_PER_MONTH = 730.0
+
+
+@dataclass(frozen=True)
+class InstancePrice:
+    instance_type: str
+    family: str
+    arch: str
+    vcpu: float
+    memory_gib: float
+    # us-east-1 On-Demand USD per hour.
+    on_demand_hourly: float
+    spot_discount: float
+    # Same-size Graviton instance type, when the table has one.
+    graviton_equivalent: Optional[str] = None
+
+
+@dataclass
+class PriceTable:
+    version: str
+    currency: str
+    instances: Tuple[InstancePrice, ...]
+    regions: Dict[str, float]
+    _by_type: Dict[str, int] = field(init=False, repr=False)
+    _by_family: Dict[str, List[int]] = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self._by_type = {price.instance_type: i for i, price in enumerate(self.instances)}
+        self._by_family = {}
+        for i, price in enumerate(self.instances):
+            self._by_family.setdefault(price.family, []).append(i)
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "PriceTable":
+        families = data.get("families", {})
+        instances = []
+        for instance_type, (vcpu, memory_gib, hourly) in data.get("instances", {}).items():
+            family, _, size = instance_type.partition(".")
+            info = families.get(family, {})
+            graviton = info.get("graviton_equivalent")
+            instances.append(
+                InstancePrice(
+                    instance_type=instance_type,
+                    family=family,
+                    arch=info.get("arch", "amd64"),
+                    vcpu=float(vcpu),
+                    memory_gib=float(memory_gib),
+                    on_demand_hourly=float(hourly),
+                    spot_discount=float(info.get("spot_discount", 0.0)),
+                    graviton_equivalent=f"{graviton}.{size}" if graviton else None,
+                )
+            )
+        known = {price.instance_type for price in instances}
+        instances = [
+            price
+            if price.graviton_equivalent is None or price.graviton_equivalent in known
+            else replace(price, graviton_equivalent=None)
+            for price in instances
+        ]
+        return cls(
+            version=str(data.get("version", "")),
+            currency=str(data.get("currency", "USD")),
+            instances=tuple(instances),
+            regions={str(k): float(v) for k, v in data.get("regions", {}).items()},
+        )
+
+    @classmethod
+    def load(cls, path: Optional[Path] = None) -> "PriceTable":
+        return cls.from_dict(json.loads(Path(path or DEFAULT_PRICE_TABLE).read_text(encoding="utf-8")))
+
+    def index(self, instance_type: str) -> Optional[int]:
+        return self._by_type.get(instance_type)
+
+    def get(self, instance_type: str) -> Optional[InstancePrice]:
+        i = self._by_type.get(instance_type)
+        return None if i is None else self.instances[i]
+
+    def resolve_region(self, region: Optional[str]) -> Tuple[str, float, bool]:
+        """Region name, price multiplier and whether the table knows the region.
+
+        Missing regions fall back to us-east-1; unknown ones are priced like it.
+        """
+        name = (region or DEFAULT_REGION).strip() or DEFAULT_REGION
+        if name in self.regions:
+            return name, self.regions[name], True
+        return name, self.regions.get(DEFAULT_REGION, 1.0), False
+
+    def on_demand_hourly(self, instance_type: str, region: Optional[str] = None) -> Optional[float]:
+        price = self.get(instance_type)
+        if price is None:
+            return None
+        return price.on_demand_hourly * self.resolve_region(region)[1]
+
+    def eligible(self, families: Sequence[str]) -> List[int]:
+        """Indices of the instance types a NodePool restricted to ``families`` can launch.
+
+        An unrestricted NodePool may launch any x86 type in the table. Families
+        the table does not price are ignored.
+        """
+        if not families:
+            return [i for i, price in enumerate(self.instances) if price.arch == "amd64"]
+        columns: List[int] = []
+        for family in dict.fromkeys(f.lower() for f in families):
+            columns.extend(self._by_family.get(family, ()))
+        return columns
+
+
+@lru_cache(maxsize=1)
+def _load_cached(path: str) -> PriceTable:
+    return PriceTable.load(Path(path))
+
+
+def get_price_table() -> PriceTable:
+    """The configured table, loaded once per path."""
+    configured = os.environ.get(PRICE_TABLE_ENV, "").strip()
+    return _load_cached(configured or str(DEFAULT_PRICE_TABLE))
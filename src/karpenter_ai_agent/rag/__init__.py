@@ -8,9 +8,12 @@ from karpenter_ai_agent.rag.models import (
     RetrievedContext,
     RAGResult,
 )
-from karpenter_ai_agent.rag.retrieve import retrieve, retrieve_for_issue, build_issue_query
+from karpenter_ai_agent.rag.bm25 import BM25Index
+from karpenter_ai_agent.rag.engine import InvertedIndex
+from karpenter_ai_agent.rag.incremental import IncrementalKnowledgeIndex, KnowledgeWatcher
+from karpenter_ai_agent.rag.retrieve import retrieve, retrieve_many, retrieve_for_issue, build_issue_query
 from karpenter_ai_agent.rag.store import KnowledgeStore, get_default_store
-from karpenter_ai_agent.rag.tool import retrieve_context
+from karpenter_ai_agent.rag.tool import retrieve_context, retrieve_context_many, retrieve_issue_contexts
 
 __all__ = [
     "Chunk",
@@ -19,10 +22,17 @@ __all__ = [
     "RAGQuery",
     "RetrievedContext",
     "RAGResult",
+    "InvertedIndex",
+    "BM25Index",
     "KnowledgeStore",
+    "IncrementalKnowledgeIndex",
+    "KnowledgeWatcher",
     "get_default_store",
     "retrieve",
+    "retrieve_many",
     "retrieve_for_issue",
     "build_issue_query",
     "retrieve_context",
+    "retrieve_context_many",
+    "retrieve_issue_contexts",
 ]
@@ -0,0 +1,3 @@
+from karpenter_ai_agent.rag.artifact import main
+
+main()
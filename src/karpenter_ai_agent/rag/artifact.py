@@ -0,0 +1,312 @@
+"""Prebuilt, memory-mapped retrieval index.
+
+The artifact is one file: a small JSON header (manifest, vocabulary, idf,
+chunk metadata, section table) followed by packed native arrays for the
+postings, chunk text and, when an ``embed`` function is given, the chunks'
+dense vectors. Workers ``mmap`` it read-only, so the pages are shared between
+processes and nothing is re-tokenized or re-embedded at startup. The header
+carries a manifest of source file hashes; when it no longer matches the docs
+on disk, the artifact is rebuilt.
+
+    PYTHONPATH=src python -m karpenter_ai_agent.rag build
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+from karpenter_ai_agent.rag.engine import InvertedIndex, Tokenizer
+from karpenter_ai_agent.rag.models import Chunk
+
+FORMAT_VERSION = 5
+MAGIC = b"KRAGIDX1"
+INDEX_DIR_ENV = "RAG_INDEX_DIR"
+DEFAULT_INDEX_DIR = Path(__file__).resolve().parents[3] / ".rag-index"
+
+_PREFIX = struct.Struct("<8sQ")
+_ALIGN = 8
+# Section name -> item size in bytes; "dense" is optional.
+_SECTION_ITEMSIZES = {"term_offsets": 8, "docs": 4, "weights": 8, "text_offsets": 8, "text": 1, "dense": 1}
+
+Builder = Callable[[], Tuple[Sequence[Chunk], InvertedIndex]]
+# Packed native float32 vectors, one row per chunk.
+Embedder = Callable[[Sequence[Chunk]], bytes]
+Loaded = Tuple[Sequence[Chunk], InvertedIndex, Optional[memoryview]]
+
+
+def index_dir() -> Path:
+    configured = os.environ.get(INDEX_DIR_ENV, "").strip()
+    return Path(configured) if configured else DEFAULT_INDEX_DIR
+
+
+def source_manifest(source_path: Path, params: Dict[str, Any]) -> Dict[str, Any]:
+    sources: Dict[str, str] = {}
+    if source_path.exists():
+        for file_path in sorted(source_path.glob("**/*.md")):
+            relative = file_path.relative_to(source_path).as_posix()
+            sources[relative] = hashlib.sha256(file_path.read_bytes()).hexdigest()
+    return {"format": FORMAT_VERSION, "byteorder": sys.byteorder, "params": params, "sources": sources}
+
+
+class MappedPostings(Mapping[str, List[Tuple[int, float]]]):
+    """Read-only ``term -> [(doc, weight)]`` view over the mapped arrays."""
+
+    def __init__(self, term_ids: Dict[str, int], offsets: memoryview, docs: memoryview, weights: memoryview):
+        self._term_ids = term_ids
+        self._offsets = offsets
+        self._docs = docs
+        self._weights = weights
+
+    def __getitem__(self, term: str) -> List[Tuple[int, float]]:
+        term_id = self._term_ids[term]
+        start, end = self._offsets[term_id], self._offsets[term_id + 1]
+        return list(zip(self._docs[start:end], self._weights[start:end]))
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._term_ids)
+
+    def __len__(self) -> int:
+        return len(self._term_ids)
+
+    @property
+    def term_ids(self) -> Dict[str, int]:
+        return self._term_ids
+
+    def buffers(self) -> Tuple[memoryview, memoryview, memoryview]:
+        """The mapped ``term_offsets`` (int64), ``docs`` (int32) and ``weights`` (float64) arrays."""
+        return self._offsets, self._docs, self._weights
+
+
+class MappedChunks(Sequence[Chunk]):
+    """Chunks whose text is decoded from the mapped blob on access."""
+
+    def __init__(self, metadata: List[List[str]], offsets: memoryview, text: memoryview):
+        self._metadata = metadata
+        self._offsets = offsets
+        self._text = text
+
+    def __getitem__(self, index):  # type: ignore[override]
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        chunk_id, doc_id, title, source_url = self._metadata[index]
+        start, end = self._offsets[index], self._offsets[index + 1]
+        return Chunk(
+            chunk_id=chunk_id,
+            doc_id=doc_id,
+            title=title,
+            source_url=source_url,
+            text=bytes(self._text[start:end]).decode("utf-8"),
+        )
+
+    def __len__(self) -> int:
+        return len(self._metadata)
+
+
+def _pad(length: int) -> int:
+    return (-length) % _ALIGN
+
+
+def write_artifact(
+    target: Path,
+    chunks: Sequence[Chunk],
+    engine: InvertedIndex,
+    manifest: Dict[str, Any],
+    dense: Optional[bytes] = None,
+) -> None:
+    terms = list(engine.postings)
+    term_offsets = array("q", [0])
+    docs = array("i")
+    weights = array("d")
+    for term in terms:
+        for doc, weight in engine.postings[term]:
+            docs.append(doc)
+            weights.append(weight)
+        term_offsets.append(len(docs))
+
+    text_offsets = array("q", [0])
+    text = bytearray()
+    for chunk in chunks:
+        text.extend(chunk.text.encode("utf-8"))
+        text_offsets.append(len(text))
+
+    arrays = [
+        ("term_offsets", term_offsets.tobytes()),
+        ("docs", docs.tobytes()),
+        ("weights", weights.tobytes()),
+        ("text_offsets", text_offsets.tobytes()),
+        ("text", bytes(text)),
+    ]
+    if dense is not None:
+        arrays.append(("dense", dense))
+    sections: Dict[str, List[int]] = {}
+    payload = bytearray()
+    for name, data in arrays:
+        sections[name] = [len(payload), len(data)]
+        payload.extend(data)
+        payload.extend(b"\0" * _pad(len(data)))
+
+    header = json.dumps(
+        {
+            "manifest": manifest,
+            "version": engine.version,
+            "precomputed": {key: [list(hit) for hit in hits] for key, hits in engine.precomputed.items()},
+            "precomputed_terms": {key: list(terms) for key, terms in engine.precomputed_terms.items()},
+            "precomputed_top_k": engine.precomputed_top_k,
+            "size": engine.size,
+            "terms": terms,
+            "idf": [engine.idf.get(term, 0.0) for term in terms],
+            "chunks": [[c.chunk_id, c.doc_id, c.title, c.source_url] for c in chunks],
+            "sections": sections,
+        },
+        separators=(",", ":"),
+    ).encode("utf-8")
+    header += b" " * _pad(_PREFIX.size + len(header))
+
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp = target.with_name(f"{target.name}.{os.getpid()}.tmp")
+    with tmp.open("wb") as handle:
+        handle.write(_PREFIX.pack(MAGIC, len(header)))
+        handle.write(header)
+        handle.write(payload)
+    tmp.replace(target)
+
+
+def _read_header(buffer: mmap.mmap) -> Optional[Dict[str, Any]]:
+    if len(buffer) < _PREFIX.size:
+        return None
+    magic, header_len = _PREFIX.unpack_from(buffer, 0)
+    if magic != MAGIC:
+        return None
+    try:
+        return json.loads(bytes(buffer[_PREFIX.size : _PREFIX.size + header_len]))
+    except ValueError:
+        return None
+
+
+def _sections_fit(header: Dict[str, Any], base: int, size: int) -> bool:
+    """Every required section lies inside the file and holds whole items."""
+    sections = header.get("sections")
+    if not isinstance(sections, dict):
+        return False
+    for name, itemsize in _SECTION_ITEMSIZES.items():
+        if name == "dense" and name not in sections:
+            continue
+        try:
+            offset, length = (int(value) for value in sections[name])
+        except (KeyError, TypeError, ValueError):
+            return False
+        if offset < 0 or length < 0 or length % itemsize or base + offset + length > size:
+            return False
+    return True
+
+
+def open_artifact(
+    target: Path,
+    tokenize: Tokenizer,
+    manifest: Optional[Dict[str, Any]] = None,
+) -> Optional[Tuple[MappedChunks, InvertedIndex, Optional[memoryview]]]:
+    """Map ``target``; returns None if it is missing, corrupt or does not match ``manifest``.
+
+    Section bounds are checked against the file size; an artifact whose
+    sections do not fit (truncated, say) is treated as stale and rebuilt by
+    ``load_or_build``. The third item is the mapped ``dense`` section (raw
+    bytes), if the artifact has one.
+    """
+    try:
+        with target.open("rb") as handle:
+            buffer = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+    header = _read_header(buffer)
+    if header is None or (manifest is not None and header.get("manifest") != manifest):
+        buffer.close()
+        return None
+
+    base = _PREFIX.size + _PREFIX.unpack_from(buffer, 0)[1]
+    if not _sections_fit(header, base, len(buffer)):
+        buffer.close()
+        return None
+    view = memoryview(buffer)
+
+    def section(name: str, fmt: str) -> memoryview:
+        offset, length = header["sections"][name]
+        raw = view[base + offset : base + offset + length]
+        return raw.cast(fmt) if fmt != "B" else raw
+
+    terms: List[str] = header["terms"]
+    term_ids = {term: term_id for term_id, term in enumerate(terms)}
+    postings = MappedPostings(
+        term_ids, section("term_offsets", "q"), section("docs", "i"), section("weights", "d")
+    )
+    chunks = MappedChunks(header["chunks"], section("text_offsets", "q"), section("text", "B"))
+    engine = InvertedIndex(
+        idf=dict(zip(terms, header["idf"])),
+        postings=postings,
+        size=int(header["size"]),
+        tokenize=tokenize,
+        version=str(header["version"]),
+        precomputed={
+            key: tuple((int(doc), float(score)) for doc, score in hits)
+            for key, hits in header["precomputed"].items()
+        },
+        precomputed_terms={key: tuple(terms) for key, terms in header["precomputed_terms"].items()},
+        precomputed_top_k=int(header["precomputed_top_k"]),
+    )
+    dense = section("dense", "B") if "dense" in header["sections"] else None
+    return chunks, engine, dense
+
+
+def load_or_build(
+    name: str,
+    source_path: Path,
+    build: Builder,
+    tokenize: Tokenizer,
+    params: Dict[str, Any],
+    directory: Optional[Path] = None,
+    embed: Optional[Embedder] = None,
+) -> Loaded:
+    """Open the ``name`` artifact, rebuilding it first if the sources changed.
+
+    With ``embed``, the artifact also stores the chunks' dense vectors; the
+    embedder's settings belong in ``params`` so a change rebuilds it. Falls
+    back to the in-memory build when the index directory is not writable.
+    """
+    target = (directory or index_dir()) / f"{name}.idx"
+    manifest = source_manifest(source_path, params)
+    opened = open_artifact(target, tokenize, manifest)
+    if opened is not None and (embed is None or opened[2] is not None):
+        return opened
+
+    chunks, engine = build()
+    dense = embed(chunks) if embed is not None else None
+    built: Loaded = (chunks, engine, memoryview(dense) if dense is not None else None)
+    try:
+        write_artifact(target, chunks, engine, manifest, dense)
+    except OSError:
+        return built
+    return open_artifact(target, tokenize, manifest) or built
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    from karpenter_ai_agent.rag.index import build_default_index
+    from karpenter_ai_agent.rag.store import build_default_store
+
+    parser = argparse.ArgumentParser(description="Build the prebuilt RAG index artifacts.")
+    parser.add_argument("command", choices=["build"])
+    parser.add_argument("--dir", type=Path, default=None, help=f"Output directory (default ${INDEX_DIR_ENV})")
+    args = parser.parse_args(argv)
+
+    directory = args.dir or index_dir()
+    for name, loader in (("knowledge", build_default_store), ("karpenter", build_default_index)):
+        loaded = loader(directory)
+        print(f"{name}: {len(loaded.chunks)} chunks -> {directory / (name + '.idx')}")
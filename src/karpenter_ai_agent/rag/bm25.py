@@ -0,0 +1,221 @@
+"""BM25F ranking over interned tokens and array-backed postings.
+
+Terms are interned to integer IDs once, and postings are packed into flat
+``array`` buffers in CSR layout (``term_offsets`` -> ``docs`` / ``impacts``)
+instead of per-chunk dicts of strings. Each posting stores its BM25 term
+impact (float32), precomputed from the field-weighted term frequency and the
+document length, so a query is a sum of ``idf * impact`` over its terms'
+postings. With NumPy installed the postings are scored as vector slices;
+otherwise a posting-list walk gives identical results.
+
+Title and body are weighted separately (a simplified BM25F): a term's
+frequency is ``title_weight * tf_title + body_weight * tf_body`` and the
+document length is weighted the same way.
+"""
+from __future__ import annotations
+
+import hashlib
+import heapq
+import math
+import sys
+import uuid
+from array import array
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised only without the extra
+    np = None  # type: ignore[assignment]
+
+from karpenter_ai_agent.rag.cache import QueryCache, default_query_cache
+from karpenter_ai_agent.rag.engine import Tokenizer
+
+Document = Tuple[str, str]
+
+
+def bm25_idf(document_frequency: int, size: int) -> float:
+    return math.log(1 + (size - document_frequency + 0.5) / (document_frequency + 0.5))
+
+
+def _pack_postings(
+    terms: array, docs: array, tfs: array, norms: array, term_offsets: array, k1: float
+) -> Tuple[array, array]:
+    """Group doc-ordered triples by term into CSR ``docs`` / ``impacts`` buffers.
+
+    Both paths keep document order within each term, so posting lists are sorted by doc.
+    """
+    if np is not None and len(terms):
+        term_ids = np.frombuffer(terms, dtype=np.int32)
+        order = np.argsort(term_ids, kind="stable")
+        doc_ids = np.frombuffer(docs, dtype=np.int32)[order]
+        tf = np.frombuffer(tfs, dtype=np.float64)[order]
+        impact = tf * (k1 + 1) / (tf + np.frombuffer(norms, dtype=np.float64)[doc_ids])
+        return array("i", doc_ids.tobytes()), array("f", impact.astype(np.float32).tobytes())
+
+    packed_docs = array("i", bytes(4 * len(terms)))
+    impacts = array("f", bytes(4 * len(terms)))
+    cursor = term_offsets[:-1]
+    for term, doc, tf in zip(terms, docs, tfs):
+        slot = cursor[term]
+        packed_docs[slot] = doc
+        impacts[slot] = tf * (k1 + 1) / (tf + norms[doc])
+        cursor[term] = slot + 1
+    return packed_docs, impacts
+
+
+@dataclass
+class BM25Index:
+    """Top-k BM25F search; results are ``(doc index, score)`` like ``InvertedIndex``."""
+
+    vocabulary: Dict[str, int]
+    idf: array
+    term_offsets: array
+    docs: array
+    impacts: array
+    size: int
+    tokenize: Tokenizer
+    k1: float = 1.2
+    b: float = 0.75
+    title_weight: float = 2.0
+    body_weight: float = 1.0
+    version: str = field(default_factory=lambda: uuid.uuid4().hex)
+    cache: Optional[QueryCache] = field(default_factory=default_query_cache, repr=False, compare=False)
+    _arrays: Optional[Tuple[Any, Any]] = field(default=None, init=False, repr=False, compare=False)
+
+    @classmethod
+    def build(
+        cls,
+        documents: Sequence[Document],
+        tokenize: Tokenizer,
+        *,
+        k1: float = 1.2,
+        b: float = 0.75,
+        title_weight: float = 2.0,
+        body_weight: float = 1.0,
+    ) -> "BM25Index":
+        """Index ``(title, body)`` pairs."""
+        vocabulary: Dict[str, int] = {}
+        document_frequency = array("q")
+        # Flat (term, doc, weighted tf) triples, in document order.
+        terms = array("i")
+        docs = array("i")
+        tfs = array("d")
+        doc_lengths = array("d")
+        digest = hashlib.sha256(
+            f"bm25:{k1}:{b}:{title_weight}:{body_weight}:{tokenize.__module__}.{tokenize.__qualname__}".encode("utf-8")
+        )
+
+        for doc, (title, body) in enumerate(documents):
+            digest.update(b"\0" + title.encode("utf-8") + b"\1" + body.encode("utf-8"))
+            weighted: Dict[int, float] = {}
+            length = 0.0
+            for text, weight in ((title, title_weight), (body, body_weight)):
+                tokens = tokenize(text) if weight else []
+                length += weight * len(tokens)
+                for token in tokens:
+                    term = vocabulary.get(token)
+                    if term is None:
+                        term = vocabulary[token] = len(vocabulary)
+                        document_frequency.append(0)
+                    weighted[term] = weighted.get(term, 0.0) + weight
+            for term in weighted:
+                document_frequency[term] += 1
+            terms.extend(weighted.keys())
+            tfs.extend(weighted.values())
+            docs.extend([doc] * len(weighted))
+            doc_lengths.append(length)
+
+        size = len(doc_lengths)
+        average_length = (sum(doc_lengths) / size) if size else 0.0
+        norms = array(
+            "d",
+            (k1 * (1 - b + b * length / average_length) if average_length else k1 for length in doc_lengths),
+        )
+        term_offsets = array("q", [0]) * (len(vocabulary) + 1)
+        for term, count in enumerate(document_frequency):
+            term_offsets[term + 1] = term_offsets[term] + count
+        docs, impacts = _pack_postings(terms, docs, tfs, norms, term_offsets, k1)
+
+        return cls(
+            vocabulary=vocabulary,
+            idf=array("d", (bm25_idf(count, size) for count in document_frequency)),
+            term_offsets=term_offsets,
+            docs=docs,
+            impacts=impacts,
+            size=size,
+            tokenize=tokenize,
+            k1=k1,
+            b=b,
+            title_weight=title_weight,
+            body_weight=body_weight,
+            version=digest.hexdigest()[:16],
+        )
+
+    def query_terms(self, query: str) -> Dict[int, float]:
+        """Interned query terms with their ``idf * query term frequency`` weights."""
+        weights: Dict[int, float] = {}
+        for token in self.tokenize(query):
+            term = self.vocabulary.get(token)
+            if term is not None:
+                weights[term] = weights.get(term, 0.0) + self.idf[term]
+        return weights
+
+    def _score(self, weights: Dict[int, float], top_k: int) -> List[Tuple[int, float]]:
+        if not weights or top_k <= 0:
+            return []
+        if np is not None:
+            return self._score_numpy(weights, top_k)
+
+        scores: Dict[int, float] = {}
+        for term, weight in weights.items():
+            start, end = self.term_offsets[term], self.term_offsets[term + 1]
+            for doc, impact in zip(self.docs[start:end], self.impacts[start:end]):
+                scores[doc] = scores.get(doc, 0.0) + weight * impact
+        best = heapq.nlargest(top_k, scores.items(), key=lambda item: (item[1], -item[0]))
+        return [(doc, score) for doc, score in best if score > 0]
+
+    def _score_numpy(self, weights: Dict[int, float], top_k: int) -> List[Tuple[int, float]]:
+        if self._arrays is None:
+            self._arrays = (
+                np.frombuffer(self.docs, dtype=np.int32),
+                np.frombuffer(self.impacts, dtype=np.float32),
+            )
+        docs, impacts = self._arrays
+        scores = np.zeros(self.size, dtype=np.float64)
+        for term, weight in weights.items():
+            start, end = self.term_offsets[term], self.term_offsets[term + 1]
+            # Docs are unique within a posting list, so fancy-index add is exact.
+            scores[docs[start:end]] += np.multiply(impacts[start:end], weight, dtype=np.float64)
+        candidates = np.flatnonzero(scores > 0)
+        if not len(candidates):
+            return []
+        k = min(top_k, len(candidates))
+        values = scores[candidates]
+        kth = -np.partition(-values, k - 1)[k - 1]
+        candidates = candidates[values >= kth]
+        ordered = candidates[np.lexsort((candidates, -scores[candidates]))][:k]
+        return [(int(doc), float(scores[doc])) for doc in ordered]
+
+    def search(self, query: str, top_k: int = 3) -> List[Tuple[int, float]]:
+        tokens = self.tokenize(query) if top_k > 0 else []
+        if not tokens:
+            return []
+        # Unlike TF-IDF cosine, BM25 counts repeated query terms, so the key keeps them.
+        key = ("bm25", *sorted(tokens))
+        hits = self.cache.get(self.version, key, top_k) if self.cache is not None else None
+        if hits is not None:
+            return list(hits)
+        result = self._score(self.query_terms(query), top_k)
+        if self.cache is not None:
+            self.cache.put(self.version, key, top_k, tuple(result))
+        return result
+
+    def search_many(self, queries: Sequence[str], top_k: int = 3) -> List[List[Tuple[int, float]]]:
+        return [self.search(query, top_k=top_k) for query in queries]
+
+    def memory_bytes(self) -> int:
+        """Approximate resident size of the index structures."""
+        buffers = (self.idf, self.term_offsets, self.docs, self.impacts)
+        vocabulary = sys.getsizeof(self.vocabulary) + sum(sys.getsizeof(term) for term in self.vocabulary)
+        return vocabulary + sum(buffer.itemsize * len(buffer) for buffer in buffers)
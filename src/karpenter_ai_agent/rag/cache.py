@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import os
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Dict, Hashable, Iterator, Optional, Tuple
+
+from karpenter_ai_agent.metrics import METRICS
+
+QUERY_CACHE_SIZE_ENV = "RAG_QUERY_CACHE_SIZE"
+DEFAULT_QUERY_CACHE_SIZE = 1024
+
+Hits = Tuple[Tuple[int, float], ...]
+
+
+@dataclass
+class CacheUsage:
+    """Lookups made by one run (see ``track_usage``), unlike the cache's process-lifetime counts."""
+
+    hits: int = 0
+    misses: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+_USAGE: ContextVar[Optional[CacheUsage]] = ContextVar("rag_query_cache_usage", default=None)
+
+
+@contextmanager
+def track_usage() -> Iterator[CacheUsage]:
+    """Count query cache lookups made in this context, including threads started with a copy of it."""
+    usage = CacheUsage()
+    token = _USAGE.set(usage)
+    try:
+        yield usage
+    finally:
+        _USAGE.reset(token)
+
+
+def current_usage() -> Optional[CacheUsage]:
+    return _USAGE.get()
+
+
+class QueryCache:
+    """Bounded LRU of retrieval results.
+
+    Keys include the index version, so results computed against an index
+    that has since been rebuilt are never served; ``drop_version`` frees them
+    eagerly.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_QUERY_CACHE_SIZE) -> None:
+        self.max_entries = max(int(max_entries), 0)
+        self._entries: "OrderedDict[Tuple[str, Hashable, int], Hits]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, version: str, query: Hashable, top_k: int) -> Optional[Hits]:
+        if not self.max_entries:
+            return None
+        key = (version, query, top_k)
+        usage = _USAGE.get()
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+            else:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            if usage is not None:
+                if value is None:
+                    usage.misses += 1
+                else:
+                    usage.hits += 1
+        METRICS.increment("rag.query_cache.miss" if value is None else "rag.query_cache.hit")
+        return value
+
+    def put(self, version: str, query: Hashable, top_k: int, value: Hits) -> None:
+        if not self.max_entries:
+            return
+        with self._lock:
+            self._entries[(version, query, top_k)] = value
+            self._entries.move_to_end((version, query, top_k))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def drop_version(self, version: str) -> None:
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == version]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            size = len(self._entries)
+        return {"size": size, "hits": self.hits, "misses": self.misses, "hit_rate": round(self.hit_rate, 4)}
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+def _size_from_env() -> int:
+    raw = os.environ.get(QUERY_CACHE_SIZE_ENV, "").strip()
+    try:
+        return int(raw) if raw else DEFAULT_QUERY_CACHE_SIZE
+    except ValueError:
+        return DEFAULT_QUERY_CACHE_SIZE
+
+
+QUERY_CACHE = QueryCache(_size_from_env())
+
+
+def default_query_cache() -> QueryCache:
+    return QUERY_CACHE
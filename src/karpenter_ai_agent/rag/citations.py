@@ -0,0 +1,124 @@
+"""Citations precomputed at index build time, one query per rule.
+
+Each rule is run once on a canonical manifest (every resource named
+``default``), and the issue it raises is turned into a query with the same
+``build_issue_query`` the live path uses, so the text, rule ID and field come
+from the rule itself. Citations are looked up by ``rule_id`` and used only
+when the issue's query has the same indexed terms as the canonical one;
+resource names or numbers that appear in the docs change the terms, and
+such issues are searched live. Either way the result equals a live search.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+from functools import lru_cache
+from typing import TYPE_CHECKING, Dict, Tuple
+
+if TYPE_CHECKING:
+    from karpenter_ai_agent.models import Issue
+
+PRECOMPUTED_TOP_K = 5
+
+# One small manifest per group of rules; every rule fires on exactly one of them.
+CANONICAL_MANIFESTS: Tuple[str, ...] = (
+    """
+apiVersion: karpenter.sh/v1beta1
+kind: Provisioner
+metadata:
+  name: default
+spec:
+  consolidation:
+    enabled: false
+  requirements:
+    - key: karpenter.sh/capacity-type
+      operator: In
+      values: ["on-demand"]
+    - key: node.kubernetes.io/instance-type
+      operator: In
+      values: ["m5.large"]
+""",
+    """
+apiVersion: karpenter.sh/v1beta1
+kind: Provisioner
+metadata:
+  name: default
+spec:
+  ttlSecondsAfterEmpty: 900
+""",
+    """
+apiVersion: karpenter.k8s.aws/v1
+kind: EC2NodeClass
+metadata:
+  name: default
+spec: {}
+""",
+    """
+apiVersion: karpenter.k8s.aws/v1
+kind: EC2NodeClass
+metadata:
+  name: default
+spec:
+  amiSelectorTerms:
+    - {}
+  instanceProfile: default
+  role: default
+""",
+    """
+apiVersion: karpenter.k8s.aws/v1
+kind: EC2NodeClass
+metadata:
+  name: default
+spec:
+  instanceProfile: "   "
+""",
+    """
+apiVersion: karpenter.sh/v1
+kind: NodePool
+metadata:
+  name: default
+spec:
+  nodeClassRef:
+    name: default
+""",
+    """
+apiVersion: karpenter.sh/v1
+kind: NodePool
+metadata:
+  name: default
+spec:
+  template:
+    spec: {}
+""",
+)
+
+
+@lru_cache(maxsize=1)
+def canonical_issues() -> Tuple["Issue", ...]:
+    """The first issue each rule raises on the canonical manifests, one per ``rule_id``."""
+    # Imported here: the agents reach the index through the MCP tools.
+    from karpenter_ai_agent.agents import CostAgent, ParserAgent, ReliabilityAgent, SecurityAgent
+    from karpenter_ai_agent.models import AnalysisInput
+
+    issues: Dict[str, "Issue"] = {}
+    for manifest in CANONICAL_MANIFESTS:
+        config = ParserAgent().run(AnalysisInput(yaml_text=manifest)).config
+        if config is None:
+            raise ValueError("Canonical citation manifest failed to parse")
+        for agent in (CostAgent(), ReliabilityAgent(), SecurityAgent()):
+            for issue in agent.run(config).issues:
+                issues.setdefault(issue.rule_id, issue)
+    return tuple(issues.values())
+
+
+def rule_queries() -> Dict[str, str]:
+    """``rule_id -> build_issue_query(issue)`` for every canonical issue."""
+    from karpenter_ai_agent.rag.tool import build_issue_query
+
+    return {issue.rule_id: build_issue_query(issue) for issue in canonical_issues()}
+
+
+def registry_version() -> str:
+    """Changes whenever a rule's query does, so prebuilt artifacts get rebuilt."""
+    encoded = json.dumps([rule_queries(), PRECOMPUTED_TOP_K], sort_keys=True)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()[:16]
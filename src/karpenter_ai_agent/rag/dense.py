@@ -0,0 +1,263 @@
+"""Approximate dense retrieval with local hashed n-gram embeddings.
+
+Optional: requires ``numpy`` (``pip install karpenter-ai-agent[fast]``); no
+network, model download or GPU. Text is split into words (camelCase field
+names such as ``ttlSecondsAfterEmpty`` become ``ttl seconds after empty``),
+and word unigrams, word bigrams and character 3-4 grams are hashed into a
+fixed feature space. A seeded random Gaussian matrix projects the hashed
+features to a small dense vector, so texts that share sub-word pieces
+(inflections, compound field names) land close together even when their
+exact tokens differ.
+
+``LSHIndex`` buckets the vectors by random-hyperplane signatures over several
+tables; a query probes its own bucket and the buckets one bit away, then
+re-ranks only those candidates by exact cosine. Hashed n-gram neighbours
+have modest cosine, which random hyperplanes separate poorly, so LSH trades a
+lot of recall for speed (see ``benchmarks/rag_dense.py``). Corpora smaller
+than ``exact_below`` are scanned exactly; a NumPy scan of 50k vectors takes a
+few milliseconds.
+"""
+from __future__ import annotations
+
+import math
+import re
+import zlib
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised only without the extra
+    np = None  # type: ignore[assignment]
+
+DEFAULT_FEATURES = 1 << 14
+DEFAULT_DIM = 256
+DEFAULT_SEED = 1729
+
+_CAMEL_RE = re.compile(r"([a-z0-9])([A-Z])")
+_WORD_RE = re.compile(r"[a-z0-9]+")
+_PROJECTIONS: Dict[Tuple[int, int, int], "np.ndarray"] = {}
+
+
+def dense_available() -> bool:
+    return np is not None
+
+
+def _words(text: str) -> List[str]:
+    return _WORD_RE.findall(_CAMEL_RE.sub(r"\1 \2", text).lower())
+
+
+def _hash(gram: str) -> int:
+    return zlib.crc32(gram.encode("utf-8"))
+
+
+@lru_cache(maxsize=65536)
+def _word_features(word: str) -> Tuple[Tuple[int, float], ...]:
+    """Signed hashes of a word and its character 3-4 grams (bounded by ``<`` ``>``)."""
+    padded = f"<{word}>"
+    grams = [padded[i : i + n] for n in (3, 4) for i in range(len(padded) - n + 1)]
+    features = [(_hash(f"w:{word}"), 1.0)]
+    features.extend((_hash(f"c:{gram}"), 0.5) for gram in grams)
+    return tuple(features)
+
+
+def _projection(features: int, dim: int, seed: int) -> "np.ndarray":
+    key = (features, dim, seed)
+    matrix = _PROJECTIONS.get(key)
+    if matrix is None:
+        rng = np.random.default_rng(seed)
+        matrix = (rng.standard_normal((features, dim)) / math.sqrt(dim)).astype(np.float32)
+        _PROJECTIONS[key] = matrix
+    return matrix
+
+
+@dataclass(frozen=True)
+class HashedNgramEmbedder:
+    """Deterministic text -> unit vector; identical across processes and runs."""
+
+    features: int = DEFAULT_FEATURES
+    dim: int = DEFAULT_DIM
+    seed: int = DEFAULT_SEED
+
+    def hashed(self, text: str) -> Dict[int, float]:
+        words = _words(text)
+        sparse: Dict[int, float] = {}
+        hashes = [feature for word in words for feature in _word_features(word)]
+        hashes.extend((_hash(f"b:{a} {b}"), 1.0) for a, b in zip(words, words[1:]))
+        for value, weight in hashes:
+            bucket = value % self.features
+            signed = weight if value & 0x80000000 else -weight
+            sparse[bucket] = sparse.get(bucket, 0.0) + signed
+        return sparse
+
+    def embed(self, text: str) -> "np.ndarray":
+        return self.embed_many([text])[0]
+
+    def embed_many(self, texts: Sequence[str]) -> "np.ndarray":
+        projection = _projection(self.features, self.dim, self.seed)
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            sparse = self.hashed(text)
+            if not sparse:
+                continue
+            buckets = np.fromiter(sparse.keys(), dtype=np.int64, count=len(sparse))
+            weights = np.fromiter(sparse.values(), dtype=np.float32, count=len(sparse))
+            # Sublinear term weighting, keeping the hash sign.
+            weights = np.sign(weights) * np.log1p(np.abs(weights))
+            vectors[row] = weights @ projection[buckets]
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        np.divide(vectors, norms, out=vectors, where=norms > 0)
+        return vectors
+
+
+def _top_k(candidates: "np.ndarray", scores: "np.ndarray", top_k: int) -> List[Tuple[int, float]]:
+    """Best ``top_k`` positive scores; ties resolve by doc index like the lexical engine."""
+    positive = scores > 0
+    candidates, scores = candidates[positive], scores[positive]
+    if not len(candidates) or top_k <= 0:
+        return []
+    k = min(top_k, len(candidates))
+    kth = -np.partition(-scores, k - 1)[k - 1]
+    keep = scores >= kth
+    candidates, scores = candidates[keep], scores[keep]
+    order = np.lexsort((candidates, -scores))[:k]
+    return [(int(candidates[i]), float(scores[i])) for i in order]
+
+
+@dataclass
+class LSHIndex:
+    """Random-hyperplane LSH over unit vectors with single-bit multi-probe."""
+
+    hyperplanes: "np.ndarray"  # (tables, bits, dim)
+    buckets: List[Dict[int, "np.ndarray"]]
+    size: int
+    probe: bool = True
+
+    @classmethod
+    def build(cls, vectors: "np.ndarray", tables: int = 12, bits: int = 10, seed: int = DEFAULT_SEED) -> "LSHIndex":
+        rng = np.random.default_rng(seed + 1)
+        hyperplanes = rng.standard_normal((tables, bits, vectors.shape[1])).astype(np.float32)
+        codes = cls._codes(hyperplanes, vectors)
+        buckets: List[Dict[int, np.ndarray]] = []
+        for table in range(tables):
+            order = np.argsort(codes[table], kind="stable")
+            values, starts = np.unique(codes[table][order], return_index=True)
+            groups = np.split(order, starts[1:])
+            buckets.append({int(code): docs for code, docs in zip(values, groups)})
+        return cls(hyperplanes=hyperplanes, buckets=buckets, size=int(vectors.shape[0]))
+
+    @staticmethod
+    def _codes(hyperplanes: "np.ndarray", vectors: "np.ndarray") -> "np.ndarray":
+        bits = hyperplanes.shape[1]
+        weights = (1 << np.arange(bits, dtype=np.int64))
+        signs = np.einsum("tbd,nd->tnb", hyperplanes, vectors) > 0
+        return signs.astype(np.int64) @ weights  # (tables, n)
+
+    def candidates(self, vector: "np.ndarray") -> "np.ndarray":
+        codes = self._codes(self.hyperplanes, vector[None, :])[:, 0]
+        bits = self.hyperplanes.shape[1]
+        # A flag per doc is cheaper than sorting the concatenated buckets to dedupe them.
+        selected = np.zeros(self.size, dtype=bool)
+        for table, code in enumerate(codes):
+            probes = [int(code)]
+            if self.probe:
+                probes.extend(int(code) ^ (1 << bit) for bit in range(bits))
+            for probe in probes:
+                docs = self.buckets[table].get(probe)
+                if docs is not None:
+                    selected[docs] = True
+        return np.flatnonzero(selected)
+
+
+@dataclass
+class DenseIndex:
+    """Cosine search over embedded chunks; results are ``(doc index, score)``."""
+
+    vectors: "np.ndarray"
+    embedder: HashedNgramEmbedder = field(default_factory=HashedNgramEmbedder)
+    lsh: Optional[LSHIndex] = None
+
+    @classmethod
+    def build(
+        cls,
+        texts: Sequence[str],
+        embedder: Optional[HashedNgramEmbedder] = None,
+        *,
+        exact_below: int = 50_000,
+        tables: int = 12,
+        bits: int = 10,
+    ) -> "DenseIndex":
+        embedder = embedder or HashedNgramEmbedder()
+        return cls.from_vectors(
+            embedder.embed_many(texts), embedder, exact_below=exact_below, tables=tables, bits=bits
+        )
+
+    @classmethod
+    def from_vectors(
+        cls,
+        vectors: "np.ndarray",
+        embedder: HashedNgramEmbedder,
+        *,
+        exact_below: int = 50_000,
+        tables: int = 12,
+        bits: int = 10,
+    ) -> "DenseIndex":
+        """Wrap vectors ``embedder`` produced, e.g. read-only views of a mapped artifact.
+
+        The vectors are not copied; LSH buckets, when built, are this process's own.
+        """
+        lsh = None
+        if vectors.shape[0] >= exact_below:
+            lsh = LSHIndex.build(vectors, tables=tables, bits=bits, seed=embedder.seed)
+        return cls(vectors=vectors, embedder=embedder, lsh=lsh)
+
+    @property
+    def size(self) -> int:
+        return int(self.vectors.shape[0])
+
+    def search_exact(self, query: str, top_k: int = 3) -> List[Tuple[int, float]]:
+        scores = self.vectors @ self.embedder.embed(query)
+        return _top_k(np.arange(self.size), scores, top_k)
+
+    def search(self, query: str, top_k: int = 3) -> List[Tuple[int, float]]:
+        if self.lsh is None:
+            return self.search_exact(query, top_k)
+        vector = self.embedder.embed(query)
+        candidates = self.lsh.candidates(vector)
+        return _top_k(candidates, self.vectors[candidates] @ vector, top_k)
+
+    def memory_bytes(self) -> int:
+        """Approximate size of the vectors and LSH buckets (the projection matrix is shared)."""
+        size = self.vectors.nbytes
+        if self.lsh is not None:
+            size += self.lsh.hyperplanes.nbytes
+            size += sum(docs.nbytes for table in self.lsh.buckets for docs in table.values())
+        return size
+
+    def scores_for(self, query: str, docs: Sequence[int]) -> List[float]:
+        """Exact cosine for specific docs (used by hybrid fusion)."""
+        if not docs:
+            return []
+        vector = self.embedder.embed(query)
+        return [float(score) for score in self.vectors[np.asarray(docs, dtype=np.int64)] @ vector]
+
+
+def fuse_scores(
+    lexical: Sequence[Tuple[int, float]],
+    dense: Sequence[Tuple[int, float]],
+    alpha: float,
+    top_k: int,
+) -> List[Tuple[int, float]]:
+    """Convex combination ``alpha * lexical + (1 - alpha) * dense`` of cosine scores.
+
+    Both inputs are cosine similarities in [0, 1]; a doc missing from one
+    list contributes 0 from it.
+    """
+    combined: Dict[int, float] = {}
+    for doc, score in lexical:
+        combined[doc] = combined.get(doc, 0.0) + alpha * score
+    for doc, score in dense:
+        combined[doc] = combined.get(doc, 0.0) + (1 - alpha) * max(score, 0.0)
+    ranked = sorted(combined.items(), key=lambda item: (-item[1], item[0]))
+    return [(doc, score) for doc, score in ranked[:top_k] if score > 0]
@@ -0,0 +1,222 @@
+from __future__ import annotations
+
+import hashlib
+import heapq
+import math
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from karpenter_ai_agent.rag.cache import QueryCache, default_query_cache
+
+Tokenizer = Callable[[str], List[str]]
+# term -> [(doc index, tf-idf weight already divided by the doc's norm)]
+Postings = Mapping[str, Sequence[Tuple[int, float]]]
+
+
+def compute_idf(token_sets: Iterable[Iterable[str]]) -> Dict[str, float]:
+    document_frequency: Dict[str, int] = {}
+    total = 0
+    for tokens in token_sets:
+        total += 1
+        for token in set(tokens):
+            document_frequency[token] = document_frequency.get(token, 0) + 1
+    return idf_from_frequencies(document_frequency, total)
+
+
+def idf_from_frequencies(document_frequency: Mapping[str, int], total: int) -> Dict[str, float]:
+    return {
+        token: math.log((1 + total) / (1 + count)) + 1
+        for token, count in document_frequency.items()
+    }
+
+
+def term_counts(tokens: Iterable[str]) -> Dict[str, int]:
+    counts: Dict[str, int] = {}
+    for token in tokens:
+        counts[token] = counts.get(token, 0) + 1
+    return counts
+
+
+def tfidf_vector(tokens: Sequence[str], idf: Dict[str, float]) -> Dict[str, float]:
+    if not tokens:
+        return {}
+    return counts_vector(term_counts(tokens), idf)
+
+
+def counts_vector(counts: Mapping[str, int], idf: Dict[str, float]) -> Dict[str, float]:
+    total = sum(counts.values())
+    if not total:
+        return {}
+    vector: Dict[str, float] = {}
+    for token, count in counts.items():
+        weight = (count / total) * idf.get(token, 0.0)
+        if weight:
+            vector[token] = weight
+    return vector
+
+
+def vector_norm(vector: Dict[str, float]) -> float:
+    return math.sqrt(sum(weight * weight for weight in vector.values()))
+
+
+def _content_version(texts: Sequence[str], tokenize: Tokenizer) -> str:
+    digest = hashlib.sha256(f"{tokenize.__module__}.{tokenize.__qualname__}".encode("utf-8"))
+    for text in texts:
+        digest.update(b"\0")
+        digest.update(text.encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+@dataclass
+class InvertedIndex:
+    """TF-IDF cosine retrieval over an inverted index.
+
+    Only the postings of the query's terms are visited, so query cost grows
+    with how common those terms are rather than with the corpus size.
+    Results are memoized in ``cache`` under ``version``, which changes
+    whenever the indexed content does.
+    """
+
+    idf: Dict[str, float]
+    postings: Postings
+    size: int
+    tokenize: Tokenizer
+    version: str = field(default_factory=lambda: uuid.uuid4().hex)
+    # Named queries scored once at build time (see ``precompute``), with their indexed terms.
+    precomputed: Dict[str, Tuple[Tuple[int, float], ...]] = field(default_factory=dict)
+    precomputed_terms: Dict[str, Tuple[str, ...]] = field(default_factory=dict)
+    precomputed_top_k: int = 0
+    cache: Optional[QueryCache] = field(default_factory=default_query_cache, repr=False, compare=False)
+    _scorer: Optional[Any] = field(default=None, init=False, repr=False, compare=False)
+
+    @classmethod
+    def build(cls, texts: Sequence[str], tokenize: Tokenizer) -> "InvertedIndex":
+        counts = [term_counts(tokenize(text)) for text in texts]
+        return cls.from_counts(counts, tokenize, version=_content_version(texts, tokenize))
+
+    @classmethod
+    def from_counts(
+        cls,
+        counts: Sequence[Mapping[str, int]],
+        tokenize: Tokenizer,
+        version: Optional[str] = None,
+        idf: Optional[Dict[str, float]] = None,
+    ) -> "InvertedIndex":
+        """Weight per-document term counts; ``idf`` may be supplied if already maintained."""
+        if idf is None:
+            idf = compute_idf(counts)
+        postings: Dict[str, List[Tuple[int, float]]] = {}
+        for doc, doc_counts in enumerate(counts):
+            vector = counts_vector(doc_counts, idf)
+            norm = vector_norm(vector)
+            if norm == 0:
+                continue
+            for token, weight in vector.items():
+                postings.setdefault(token, []).append((doc, weight / norm))
+        index = cls(idf=idf, postings=postings, size=len(counts), tokenize=tokenize)
+        if version is not None:
+            index.version = version
+        return index
+
+    def query_vector(self, query: str) -> Dict[str, float]:
+        return tfidf_vector(self.tokenize(query), self.idf)
+
+    def indexed_terms(self, query: str) -> Tuple[str, ...]:
+        """The query's tokens that occur in the corpus, sorted.
+
+        Queries with the same indexed terms get the same cosine ranking and
+        scores; other tokens only scale the query vector.
+        """
+        return tuple(sorted(token for token in self.tokenize(query) if token in self.idf))
+
+    def precompute(self, queries: Mapping[str, str], top_k: int) -> None:
+        self.precomputed = {
+            key: tuple(self._score(self.query_vector(query), top_k)) for key, query in queries.items()
+        }
+        self.precomputed_terms = {key: self.indexed_terms(query) for key, query in queries.items()}
+        self.precomputed_top_k = top_k
+
+    def lookup(self, key: str, query: str, top_k: int = 3) -> Optional[List[Tuple[int, float]]]:
+        """Precomputed hits for ``key``, or None if it was not precomputed that deep or
+        ``query`` has different indexed terms than the precomputed one."""
+        hits = self.precomputed.get(key)
+        if hits is None or top_k > self.precomputed_top_k:
+            return None
+        if self.indexed_terms(query) != self.precomputed_terms.get(key):
+            return None
+        return list(hits[: max(top_k, 0)])
+
+    def _cached(self, key: Tuple[str, ...], top_k: int) -> Optional[List[Tuple[int, float]]]:
+        if self.cache is None:
+            return None
+        hits = self.cache.get(self.version, key, top_k)
+        return list(hits) if hits is not None else None
+
+    def _remember(self, key: Tuple[str, ...], top_k: int, hits: List[Tuple[int, float]]) -> None:
+        if self.cache is not None:
+            self.cache.put(self.version, key, top_k, tuple(hits))
+
+    def _score(self, query_vec: Dict[str, float], top_k: int) -> List[Tuple[int, float]]:
+        query_norm = vector_norm(query_vec)
+        if query_norm == 0:
+            return []
+
+        scores: Dict[int, float] = {}
+        for token, weight in query_vec.items():
+            for doc, doc_weight in self.postings.get(token, ()):
+                scores[doc] = scores.get(doc, 0.0) + weight * doc_weight
+
+        # Ties keep corpus order, matching a stable sort over all documents.
+        best = heapq.nlargest(top_k, scores.items(), key=lambda item: (item[1], -item[0]))
+        return [(doc, score / query_norm) for doc, score in best if score > 0]
+
+    def search(self, query: str, top_k: int = 3) -> List[Tuple[int, float]]:
+        """Top-k ``(doc index, cosine score)`` pairs with a positive score."""
+        tokens = self.tokenize(query) if top_k > 0 else []
+        if not tokens:
+            return []
+        # TF-IDF ignores token order, so queries with the same terms share an entry.
+        key = tuple(sorted(tokens))
+        hits = self._cached(key, top_k)
+        if hits is None:
+            hits = self._score(tfidf_vector(tokens, self.idf), top_k)
+            self._remember(key, top_k, hits)
+        return hits
+
+    def search_many(self, queries: Sequence[str], top_k: int = 3) -> List[List[Tuple[int, float]]]:
+        """``search`` for a batch of queries; cache misses are scored together."""
+        results: List[List[Tuple[int, float]]] = [[] for _ in queries]
+        pending: Dict[Tuple[str, ...], List[int]] = {}
+        for position, query in enumerate(queries):
+            tokens = self.tokenize(query) if top_k > 0 else []
+            if not tokens:
+                continue
+            key = tuple(sorted(tokens))
+            if key in pending:
+                pending[key].append(position)
+                continue
+            hits = self._cached(key, top_k)
+            if hits is None:
+                pending[key] = [position]
+            else:
+                results[position] = hits
+
+        if pending:
+            keys = list(pending)
+            vectors = [tfidf_vector(list(key), self.idf) for key in keys]
+            for key, hits in zip(keys, self._score_many(vectors, top_k)):
+                self._remember(key, top_k, hits)
+                for position in pending[key]:
+                    results[position] = list(hits)
+        return results
+
+    def _score_many(self, vectors: List[Dict[str, float]], top_k: int) -> List[List[Tuple[int, float]]]:
+        """One sparse product for the whole batch when SciPy is installed."""
+        from karpenter_ai_agent.rag.sparse import SparseScorer, sparse_available
+
+        if not sparse_available():
+            return [self._score(vector, top_k) for vector in vectors]
+        if self._scorer is None:
+            self._scorer = SparseScorer.from_postings(self.postings, self.size)
+        return self._scorer.search_many(vectors, top_k)
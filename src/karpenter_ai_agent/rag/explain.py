@@ -1,31 +1,46 @@
 from __future__ import annotations
 
-from typing import List, Optional
+from typing import Callable, List, Optional, Sequence
 
-from karpenter_ai_agent.rag.models import RAGQuery, RetrievedChunk
+from karpenter_ai_agent.llm.resilience import Deadline
+from karpenter_ai_agent.rag.models import RAGResult, RetrievedChunk
 from karpenter_ai_agent.rag.render import render_citations
-from karpenter_ai_agent.rag.tool import build_issue_query, retrieve_context
+from karpenter_ai_agent.rag.tool import retrieve_issue_contexts
 from karpenter_ai_agent.models import Issue as ContractIssue, ExplanationDoc, IssueExplanation as ContractExplanation
 from models import Issue, IssueDoc, IssueExplanation
-from llm_client import generate_issue_explanation, is_llm_enabled
+from llm_client import generate_issue_explanation, is_llm_enabled, llm_circuit_open
 
 DEFAULT_NO_LLM_NOTE = (
     "Relevant docs found; enable AI summary for narrative explanation."
 )
 
 
+def _llm_call_allowed(deadline: Optional[Deadline]) -> bool:
+    if deadline is not None and deadline.expired:
+        return False
+    return not llm_circuit_open()
+
+
 def attach_issue_explanations(
     issues: List[Issue],
     *,
     top_k: int = 3,
     llm_available: Optional[bool] = None,
+    should_stop: Optional[Callable[[], bool]] = None,
+    deadline: Optional[Deadline] = None,
 ) -> None:
+    """Attach doc citations and, optionally, LLM explanations to legacy issues.
+
+    ``should_stop`` is checked before each issue so long LLM runs can be
+    cancelled between calls. Once ``deadline`` is spent or the provider
+    circuit opens, remaining issues fall back to the docs-only note.
+    """
     if llm_available is None:
         llm_available = is_llm_enabled()
 
-    for issue in issues:
-        query = RAGQuery(query=build_issue_query(issue), top_k=top_k)
-        retrieval = retrieve_context(query)
+    for issue, retrieval in zip(issues, retrieve_issue_contexts(issues, top_k)):
+        if should_stop is not None and should_stop():
+            break
         chunks = [
             RetrievedChunk(
                 chunk_id=f"ctx-{index}",
@@ -49,8 +64,8 @@ def attach_issue_explanations(
             for citation in citations
         ]
 
-        if llm_available:
-            explanation = generate_issue_explanation(issue, chunks)
+        if llm_available and _llm_call_allowed(deadline):
+            explanation = generate_issue_explanation(issue, chunks, deadline=deadline)
             if explanation is None:
                 explanation = IssueExplanation(why_matters=DEFAULT_NO_LLM_NOTE)
         else:
@@ -65,13 +80,20 @@ def attach_contract_explanations(
     *,
     top_k: int = 3,
     llm_available: Optional[bool] = None,
-) -> None:
+    deadline: Optional[Deadline] = None,
+    retrievals: Optional[Sequence[RAGResult]] = None,
+) -> List[RAGResult]:
+    """Attach citations (and optional LLM text) to contract issues.
+
+    Pass ``retrievals`` from an earlier call (one per issue, in order) to
+    reuse them instead of searching again; the retrievals used are returned.
+    """
     if llm_available is None:
         llm_available = is_llm_enabled()
+    if retrievals is None:
+        retrievals = retrieve_issue_contexts(issues, top_k)
 
-    for issue in issues:
-        query = RAGQuery(query=build_issue_query(issue), top_k=top_k)
-        retrieval = retrieve_context(query)
+    for issue, retrieval in zip(issues, retrievals):
         chunks = [
             RetrievedChunk(
                 chunk_id=f"ctx-{index}",
@@ -95,7 +117,7 @@ def attach_contract_explanations(
             for citation in citations
         ]
 
-        if llm_available:
+        if llm_available and _llm_call_allowed(deadline):
             legacy_issue = Issue(
                 severity=issue.severity,
                 category=issue.category,
@@ -106,7 +128,9 @@ def attach_contract_explanations(
                 resource_name=issue.resource_name,
                 patch_snippet=issue.patch_snippet,
             )
-            legacy_explanation = generate_issue_explanation(legacy_issue, chunks)
+            legacy_explanation = generate_issue_explanation(
+                legacy_issue, chunks, deadline=deadline
+            )
             if legacy_explanation is None:
                 explanation = ContractExplanation(why_matters=DEFAULT_NO_LLM_NOTE)
             else:
@@ -119,3 +143,5 @@ def attach_contract_explanations(
 
         explanation.docs = docs
         issue.explanation = explanation
+
+    return list(retrievals)
@@ -0,0 +1,238 @@
+"""Document-level updates for the knowledge store.
+
+``IncrementalKnowledgeIndex`` keeps each markdown file's chunks with their
+term counts, plus corpus document frequencies. Adding, updating or removing a
+file re-reads and re-tokenizes only that file. IDF and chunk norms depend on
+the whole corpus, so they are re-weighted lazily from the stored counts when
+the next store snapshot is taken. Snapshots are ordinary, immutable
+``KnowledgeStore`` objects: queries against the current one never wait on an
+update.
+
+``KnowledgeWatcher`` polls the directory from a background thread, applies
+changes, and publishes each new snapshot (by default as the store returned by
+``get_default_store``).
+"""
+from __future__ import annotations
+
+import os
+import threading
+from dataclasses import dataclass
+from pathlib import Path, PurePosixPath
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from karpenter_ai_agent.rag.engine import (
+    InvertedIndex,
+    Tokenizer,
+    _content_version,
+    idf_from_frequencies,
+    term_counts,
+)
+from karpenter_ai_agent.rag.models import Chunk
+from karpenter_ai_agent.rag.store import (
+    DEFAULT_KNOWLEDGE_PATH,
+    KnowledgeStore,
+    _file_chunks,
+    _tokenize,
+    set_default_store,
+)
+
+WATCH_INTERVAL_ENV = "RAG_KNOWLEDGE_WATCH_SECONDS"
+
+Signature = Tuple[int, int]
+
+
+def watch_interval() -> float:
+    """Polling interval from ``RAG_KNOWLEDGE_WATCH_SECONDS``; 0 disables the watcher."""
+    raw = os.environ.get(WATCH_INTERVAL_ENV, "").strip()
+    try:
+        return max(float(raw), 0.0) if raw else 0.0
+    except ValueError:
+        return 0.0
+
+
+def _sort_key(key: str) -> Tuple[str, ...]:
+    # Same order as sorted(root.glob(...)), which compares path parts.
+    return PurePosixPath(key).parts
+
+
+@dataclass(frozen=True)
+class _IndexedChunk:
+    chunk: Chunk
+    counts: Dict[str, int]
+
+
+class IncrementalKnowledgeIndex:
+    """Knowledge chunks keyed by source file, re-weighted on ``store()``.
+
+    A snapshot of the same files is identical to ``KnowledgeStore.load``.
+    """
+
+    def __init__(self, root: Path, max_len: int = 800, tokenize: Tokenizer = _tokenize) -> None:
+        self.root = root
+        self.max_len = max_len
+        self.tokenize = tokenize
+        self._documents: Dict[str, List[_IndexedChunk]] = {}
+        self._document_frequency: Dict[str, int] = {}
+        self._chunk_count = 0
+        self._lock = threading.Lock()
+        self._snapshot: Optional[KnowledgeStore] = None
+
+    @classmethod
+    def from_directory(cls, root: Path, max_len: int = 800) -> "IncrementalKnowledgeIndex":
+        index = cls(root, max_len)
+        if root.exists():
+            for file_path in sorted(root.glob("**/*.md")):
+                index.upsert_file(file_path)
+        return index
+
+    def key_for(self, file_path: Path) -> str:
+        return file_path.relative_to(self.root).as_posix()
+
+    @property
+    def documents(self) -> List[str]:
+        with self._lock:
+            return sorted(self._documents, key=_sort_key)
+
+    def upsert(self, key: str, chunks: Sequence[Chunk]) -> None:
+        """Add or replace the chunks of document ``key``."""
+        indexed = [
+            _IndexedChunk(chunk=chunk, counts=term_counts(self.tokenize(f"{chunk.title} {chunk.text}")))
+            for chunk in chunks
+        ]
+        with self._lock:
+            self._drop(key)
+            if not indexed:
+                return
+            self._documents[key] = indexed
+            for entry in indexed:
+                for token in entry.counts:
+                    self._document_frequency[token] = self._document_frequency.get(token, 0) + 1
+            self._chunk_count += len(indexed)
+            self._snapshot = None
+
+    def remove(self, key: str) -> bool:
+        with self._lock:
+            return self._drop(key)
+
+    def upsert_file(self, file_path: Path) -> str:
+        key = self.key_for(file_path)
+        self.upsert(key, _file_chunks(file_path, self.root, self.max_len))
+        return key
+
+    def remove_file(self, file_path: Path) -> bool:
+        return self.remove(self.key_for(file_path))
+
+    def _drop(self, key: str) -> bool:
+        previous = self._documents.pop(key, None)
+        if previous is None:
+            return False
+        for entry in previous:
+            for token in entry.counts:
+                remaining = self._document_frequency[token] - 1
+                if remaining:
+                    self._document_frequency[token] = remaining
+                else:
+                    del self._document_frequency[token]
+        self._chunk_count -= len(previous)
+        self._snapshot = None
+        return True
+
+    def store(self) -> KnowledgeStore:
+        """The current snapshot, re-weighting from stored counts if anything changed."""
+        with self._lock:
+            if self._snapshot is None:
+                self._snapshot = self._build()
+            return self._snapshot
+
+    def _build(self) -> KnowledgeStore:
+        entries = [
+            entry
+            for key in sorted(self._documents, key=_sort_key)
+            for entry in self._documents[key]
+        ]
+        chunks = [entry.chunk for entry in entries]
+        engine = InvertedIndex.from_counts(
+            [entry.counts for entry in entries],
+            self.tokenize,
+            version=_content_version([f"{chunk.title} {chunk.text}" for chunk in chunks], self.tokenize),
+            idf=idf_from_frequencies(self._document_frequency, self._chunk_count),
+        )
+        return KnowledgeStore(chunks=chunks, engine=engine)
+
+
+class KnowledgeWatcher:
+    """Polls ``index.root`` for added, changed and deleted markdown files."""
+
+    def __init__(
+        self,
+        index: IncrementalKnowledgeIndex,
+        interval: float = 2.0,
+        on_update: Optional[Callable[[KnowledgeStore], None]] = set_default_store,
+    ) -> None:
+        self.index = index
+        self.interval = interval
+        self.on_update = on_update
+        self._seen = self._signatures()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _signatures(self) -> Dict[Path, Signature]:
+        signatures: Dict[Path, Signature] = {}
+        if not self.index.root.exists():
+            return signatures
+        for file_path in self.index.root.glob("**/*.md"):
+            try:
+                stat = file_path.stat()
+            except OSError:
+                continue
+            signatures[file_path] = (stat.st_mtime_ns, stat.st_size)
+        return signatures
+
+    def scan(self) -> bool:
+        """Apply changes since the last scan; returns True if the index changed."""
+        current = self._signatures()
+        changed = False
+        for file_path in self._seen.keys() - current.keys():
+            changed = self.index.remove_file(file_path) or changed
+        for file_path, signature in list(current.items()):
+            if self._seen.get(file_path) == signature:
+                continue
+            try:
+                self.index.upsert_file(file_path)
+            except (OSError, UnicodeDecodeError):
+                # Removed or mid-write: keep the old signature so the next scan retries.
+                if file_path in self._seen:
+                    current[file_path] = self._seen[file_path]
+                else:
+                    current.pop(file_path)
+                continue
+            changed = True
+        self._seen = current
+        if changed and self.on_update is not None:
+            self.on_update(self.index.store())
+        return changed
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.scan()
+
+    def start(self) -> "KnowledgeWatcher":
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="knowledge-watcher", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+
+def start_knowledge_watcher(
+    root: Path = DEFAULT_KNOWLEDGE_PATH, interval: Optional[float] = None
+) -> KnowledgeWatcher:
+    """Serve the default store from ``root`` and keep it in sync with the files."""
+    index = IncrementalKnowledgeIndex.from_directory(root)
+    set_default_store(index.store())
+    return KnowledgeWatcher(index, interval=interval or watch_interval() or 2.0).start()
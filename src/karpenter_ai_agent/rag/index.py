@@ -1,65 +1,156 @@
 from __future__ import annotations
 
-import math
-from dataclasses import dataclass
+import os
+from dataclasses import asdict, dataclass
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import List, Optional, Sequence, Tuple
 
-from karpenter_ai_agent.rag.embedder import TfidfEmbedder
+from karpenter_ai_agent.rag.artifact import load_or_build
+from karpenter_ai_agent.rag.citations import PRECOMPUTED_TOP_K, registry_version, rule_queries
+from karpenter_ai_agent.rag.dense import DenseIndex, HashedNgramEmbedder, dense_available, fuse_scores
+from karpenter_ai_agent.rag.embedder import _STOPWORDS, tokenize
+from karpenter_ai_agent.rag.engine import InvertedIndex
 from karpenter_ai_agent.rag.loader import DEFAULT_DOCS_PATH, chunk_documents, load_markdown_documents
 from karpenter_ai_agent.rag.models import Chunk, RetrievedContext
 
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised only without the extra
+    np = None  # type: ignore[assignment]
+
+RETRIEVAL_MODE_ENV = "RAG_RETRIEVAL_MODE"
+HYBRID_ALPHA_ENV = "RAG_HYBRID_ALPHA"
+RETRIEVAL_MODES = ("lexical", "dense", "hybrid")
+DEFAULT_HYBRID_ALPHA = 0.5
+
+
+def _texts(chunks: Sequence[Chunk]) -> List[str]:
+    return [f"{chunk.title} {chunk.text}" for chunk in chunks]
+
+
+def retrieval_mode() -> str:
+    mode = os.environ.get(RETRIEVAL_MODE_ENV, "").strip().lower()
+    return mode if mode in RETRIEVAL_MODES else "lexical"
+
+
+def hybrid_alpha() -> float:
+    raw = os.environ.get(HYBRID_ALPHA_ENV, "").strip()
+    try:
+        return min(max(float(raw), 0.0), 1.0) if raw else DEFAULT_HYBRID_ALPHA
+    except ValueError:
+        return DEFAULT_HYBRID_ALPHA
+
 
 @dataclass
 class InMemoryVectorIndex:
-    chunks: List[Chunk]
-    vectors: List[Dict[str, float]]
-    norms: List[float]
-    embedder: TfidfEmbedder
+    chunks: Sequence[Chunk]
+    engine: InvertedIndex
+    # Optional dense retrieval (rag.dense); ``mode`` is "lexical", "dense" or "hybrid".
+    dense: Optional[DenseIndex] = None
+    mode: str = "lexical"
+    alpha: float = DEFAULT_HYBRID_ALPHA
+    # Chunk vectors mapped from the artifact (see ``build_prebuilt``), reused by ``with_dense``.
+    vectors: Optional["np.ndarray"] = None
 
     @classmethod
     def build(cls, docs_path: Path = DEFAULT_DOCS_PATH) -> "InMemoryVectorIndex":
         documents = load_markdown_documents(docs_path)
         chunks = chunk_documents(documents)
-        embedder = TfidfEmbedder()
-        corpus = [f"{chunk.title} {chunk.text}" for chunk in chunks]
-        embedder.fit(corpus)
-        vectors: List[Dict[str, float]] = [embedder.transform(text) for text in corpus]
-        norms = [math.sqrt(sum(value * value for value in vector.values())) for vector in vectors]
-        return cls(chunks=chunks, vectors=vectors, norms=norms, embedder=embedder)
+        engine = InvertedIndex.build([f"{chunk.title} {chunk.text}" for chunk in chunks], tokenize)
+        engine.precompute(rule_queries(), PRECOMPUTED_TOP_K)
+        return cls(chunks=chunks, engine=engine)
+
+    @classmethod
+    def build_prebuilt(
+        cls, docs_path: Path = DEFAULT_DOCS_PATH, directory: Optional[Path] = None, mode: str = "lexical"
+    ) -> "InMemoryVectorIndex":
+        """Like ``build``, but memory-mapped from the index artifact (rebuilt when the docs change).
+
+        For dense and hybrid ``mode`` with NumPy installed, the artifact also
+        holds the chunks' dense vectors, so workers share one mapped copy of
+        those too. The manifest does not depend on whether NumPy is installed.
+        """
+        embedder = HashedNgramEmbedder()
+        with_vectors = mode != "lexical" and dense_available()
+
+        def build():
+            index = cls.build(docs_path)
+            return index.chunks, index.engine
+
+        def embed(chunks: Sequence[Chunk]) -> bytes:
+            return embedder.embed_many(_texts(chunks)).astype(np.float32).tobytes()
+
+        chunks, engine, dense = load_or_build(
+            "karpenter",
+            docs_path,
+            build,
+            tokenize,
+            params={
+                "max_chars": 700,
+                "stopwords": sorted(_STOPWORDS),
+                "rule_templates": registry_version(),
+                "embedder": asdict(embedder),
+            },
+            directory=directory,
+            embed=embed if with_vectors else None,
+        )
+        index = cls(chunks=chunks, engine=engine)
+        if dense is not None and with_vectors:
+            index.vectors = np.frombuffer(dense, dtype=np.float32).reshape(len(chunks), embedder.dim)
+        return index
+
+    def with_dense(self, mode: str, alpha: float = DEFAULT_HYBRID_ALPHA) -> "InMemoryVectorIndex":
+        """Enable dense or hybrid retrieval; stays lexical when NumPy is not installed."""
+        if mode != "lexical" and dense_available():
+            if self.vectors is not None:
+                self.dense = DenseIndex.from_vectors(self.vectors, HashedNgramEmbedder())
+            else:
+                self.dense = DenseIndex.build(_texts(self.chunks))
+            self.mode = mode
+            self.alpha = alpha
+        return self
+
+    @property
+    def version(self) -> str:
+        """Changes with the indexed content and with the retrieval mode that ranks it."""
+        if self.dense is None or self.mode == "lexical":
+            return self.engine.version
+        return f"{self.engine.version}:{self.mode}:{self.alpha}"
+
+    def _hits(self, query: str, top_k: int) -> List[Tuple[int, float]]:
+        if self.dense is None or self.mode == "lexical":
+            return self.engine.search(query, top_k=top_k)
+        if self.mode == "dense":
+            return self.dense.search(query, top_k=top_k)
+        # Hybrid: fuse a deeper lexical and dense pool, with exact dense scores for every candidate.
+        pool = max(top_k * 4, 10)
+        lexical = self.engine.search(query, top_k=pool)
+        docs = sorted({doc for doc, _ in lexical} | {doc for doc, _ in self.dense.search(query, top_k=pool)})
+        dense = list(zip(docs, self.dense.scores_for(query, docs)))
+        return fuse_scores(lexical, dense, self.alpha, top_k)
+
+    def _context(self, doc: int, score: float) -> RetrievedContext:
+        chunk = self.chunks[doc]
+        return RetrievedContext(title=chunk.title, source_url=chunk.source_url, text=chunk.text, score=score)
 
     def search(self, query: str, top_k: int = 3) -> List[RetrievedContext]:
-        cleaned = query.strip()
-        if not cleaned:
-            return []
-
-        query_vec = self.embedder.transform(cleaned)
-        if not query_vec:
-            return []
-        query_norm = math.sqrt(sum(value * value for value in query_vec.values()))
-        if query_norm == 0:
-            return []
-
-        scored: List[Tuple[Chunk, float]] = []
-        for chunk, vector, norm in zip(self.chunks, self.vectors, self.norms):
-            if norm == 0:
-                continue
-            dot = 0.0
-            for token, weight in query_vec.items():
-                dot += weight * vector.get(token, 0.0)
-            score = dot / (query_norm * norm)
-            if score > 0:
-                scored.append((chunk, score))
-        scored.sort(key=lambda item: item[1], reverse=True)
-        return [
-            RetrievedContext(
-                title=chunk.title,
-                source_url=chunk.source_url,
-                text=chunk.text,
-                score=score,
-            )
-            for chunk, score in scored[: max(top_k, 0)]
-        ]
+        return [self._context(doc, score) for doc, score in self._hits(query, top_k)]
+
+    def lookup(self, rule_id: str, query: str, top_k: int = 3) -> Optional[List[RetrievedContext]]:
+        """Citations precomputed at build time for ``rule_id``, if they match a live search for ``query``."""
+        if self.dense is not None and self.mode != "lexical":
+            return None  # precomputed citations are lexical; search in the configured mode
+        hits = self.engine.lookup(rule_id, query, top_k)
+        if hits is None:
+            return None
+        return [self._context(doc, score) for doc, score in hits]
+
+    def search_many(self, queries: Sequence[str], top_k: int = 3) -> List[List[RetrievedContext]]:
+        if self.dense is None or self.mode == "lexical":
+            batched = self.engine.search_many(queries, top_k=top_k)
+        else:
+            batched = [self._hits(query, top_k) for query in queries]
+        return [[self._context(doc, score) for doc, score in hits] for hits in batched]
 
 
 _DEFAULT_INDEX: InMemoryVectorIndex | None = None
@@ -68,5 +159,11 @@ _DEFAULT_INDEX: InMemoryVectorIndex | None = None
 def get_default_index() -> InMemoryVectorIndex:
     global _DEFAULT_INDEX
     if _DEFAULT_INDEX is None:
-        _DEFAULT_INDEX = InMemoryVectorIndex.build(DEFAULT_DOCS_PATH)
+        _DEFAULT_INDEX = build_default_index()
     return _DEFAULT_INDEX
+
+
+def build_default_index(directory: Optional[Path] = None) -> InMemoryVectorIndex:
+    mode = retrieval_mode()
+    index = InMemoryVectorIndex.build_prebuilt(DEFAULT_DOCS_PATH, directory=directory, mode=mode)
+    return index.with_dense(mode, hybrid_alpha())
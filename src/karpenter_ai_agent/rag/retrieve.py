@@ -1,15 +1,29 @@
 from __future__ import annotations
 
-from typing import Any, List
+from typing import Any, List, Sequence, Tuple
 
-from karpenter_ai_agent.rag.models import RetrievedChunk, RetrievalResult
+from karpenter_ai_agent.rag.models import Chunk, RetrievedChunk, RetrievalResult
 from karpenter_ai_agent.rag.store import KnowledgeStore, get_default_store
 
 
 def retrieve(query: str, top_k: int = 3, store: KnowledgeStore | None = None) -> RetrievalResult:
     if store is None:
         store = get_default_store()
-    results = store.search(query, top_k=top_k)
+    return _to_result(store.search(query, top_k=top_k))
+
+
+def retrieve_many(
+    queries: Sequence[str],
+    top_k: int = 3,
+    store: KnowledgeStore | None = None,
+) -> List[RetrievalResult]:
+    """Retrieve for several queries at once; one result per query, in order."""
+    if store is None:
+        store = get_default_store()
+    return [_to_result(results) for results in store.search_many(queries, top_k=top_k)]
+
+
+def _to_result(results: List[Tuple[Chunk, float]]) -> RetrievalResult:
     chunks = [
         RetrievedChunk(
             chunk_id=chunk.chunk_id,
@@ -0,0 +1,110 @@
+"""Batched TF-IDF scoring with a SciPy CSR matrix.
+
+Optional: requires ``numpy`` and ``scipy`` (``pip install karpenter-ai-agent[fast]``).
+Without them, ``InvertedIndex.search_many`` falls back to one posting-list
+walk per query.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, List, Sequence, Tuple
+
+try:
+    import numpy as np
+    from scipy import sparse
+except ImportError:  # pragma: no cover - exercised only without the extra
+    np = None  # type: ignore[assignment]
+    sparse = None  # type: ignore[assignment]
+
+from karpenter_ai_agent.rag.artifact import MappedPostings
+from karpenter_ai_agent.rag.engine import Postings, vector_norm
+
+
+def sparse_available() -> bool:
+    return sparse is not None
+
+
+@dataclass
+class SparseScorer:
+    """Chunk vectors as rows of a CSR matrix, each pre-divided by its norm."""
+
+    vocabulary: Dict[str, int]
+    matrix: "sparse.csr_matrix"
+
+    @classmethod
+    def from_postings(cls, postings: Postings, size: int) -> "SparseScorer":
+        if isinstance(postings, MappedPostings):
+            return cls.from_mapped(postings, size)
+        vocabulary: Dict[str, int] = {}
+        rows: List[int] = []
+        cols: List[int] = []
+        data: List[float] = []
+        for term, entries in postings.items():
+            column = vocabulary.setdefault(term, len(vocabulary))
+            for doc, weight in entries:
+                rows.append(doc)
+                cols.append(column)
+                data.append(weight)
+        matrix = sparse.csr_matrix(
+            (np.asarray(data, dtype=np.float64), (rows, cols)),
+            shape=(size, len(vocabulary)),
+        )
+        return cls(vocabulary=vocabulary, matrix=matrix)
+
+    @classmethod
+    def from_mapped(cls, postings: MappedPostings, size: int) -> "SparseScorer":
+        """Zero-copy: the artifact's term-major postings are already a CSC matrix.
+
+        ``docs`` and ``weights`` stay views into the shared mapping, so every
+        worker scores against the same physical pages. Only the (small) offset
+        array is narrowed to int32 so SciPy does not upcast, and copy, ``docs``.
+        """
+        offsets, docs, weights = postings.buffers()
+        indptr = np.frombuffer(offsets, dtype=np.int64)
+        if indptr[-1] <= np.iinfo(np.int32).max:
+            indptr = indptr.astype(np.int32)
+        matrix = sparse.csc_matrix(
+            (np.frombuffer(weights, dtype=np.float64), np.frombuffer(docs, dtype=np.int32), indptr),
+            shape=(size, len(postings)),
+        )
+        return cls(vocabulary=postings.term_ids, matrix=matrix)
+
+    def _query_matrix(self, query_vectors: Sequence[Dict[str, float]]) -> "sparse.csr_matrix":
+        rows: List[int] = []
+        cols: List[int] = []
+        data: List[float] = []
+        for row, vector in enumerate(query_vectors):
+            norm = vector_norm(vector)
+            if norm == 0:
+                continue
+            for term, weight in vector.items():
+                column = self.vocabulary.get(term)
+                if column is not None:
+                    rows.append(row)
+                    cols.append(column)
+                    data.append(weight / norm)
+        return sparse.csr_matrix(
+            (np.asarray(data, dtype=np.float64), (rows, cols)),
+            shape=(len(query_vectors), len(self.vocabulary)),
+        )
+
+    def search_many(
+        self, query_vectors: Sequence[Dict[str, float]], top_k: int
+    ) -> List[List[Tuple[int, float]]]:
+        if not query_vectors:
+            return []
+        n_docs = self.matrix.shape[0]
+        if top_k <= 0 or n_docs == 0:
+            return [[] for _ in query_vectors]
+
+        scores = (self._query_matrix(query_vectors) @ self.matrix.T).toarray()
+        k = min(top_k, n_docs)
+        results: List[List[Tuple[int, float]]] = []
+        for row in scores:
+            # Keep every doc tied with the k-th best so ties resolve by corpus
+            # order, exactly like the posting-list path.
+            kth = -np.partition(-row, k - 1)[k - 1]
+            candidates = np.flatnonzero(row >= kth)
+            ordered = candidates[np.lexsort((candidates, -row[candidates]))][:k]
+            results.append([(int(doc), float(row[doc])) for doc in ordered if row[doc] > 0])
+        return results
@@ -2,10 +2,11 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, Iterable, List
-import math
+from typing import Dict, List, Optional, Sequence
 import re
 
+from karpenter_ai_agent.rag.artifact import load_or_build
+from karpenter_ai_agent.rag.engine import InvertedIndex
 from karpenter_ai_agent.rag.models import Chunk
 
 DEFAULT_KNOWLEDGE_PATH = Path(__file__).resolve().parents[3] / "docs" / "knowledge"
@@ -108,105 +109,75 @@ def _content_without_metadata(lines: List[str]) -> str:
 def _load_chunks(path: Path, max_len: int) -> List[Chunk]:
     chunks: List[Chunk] = []
     for file_path in sorted(path.glob("**/*.md")):
-        lines = file_path.read_text(encoding="utf-8").splitlines()
-        title, source_url = _extract_doc_metadata(lines)
-        content = _content_without_metadata(lines)
-        if not content:
-            continue
-        blocks = _split_blocks(content)
-        doc_id = str(file_path.relative_to(path)).replace("/", "-").replace("\\", "-")
-        idx = 0
-        for block in blocks:
-            for part in _split_long_block(block, max_len):
-                chunk_id = f"{doc_id}-{idx}"
-                idx += 1
-                chunks.append(
-                    Chunk(
-                        chunk_id=chunk_id,
-                        doc_id=doc_id,
-                        title=title,
-                        source_url=source_url,
-                        text=part,
-                    )
-                )
+        chunks.extend(_file_chunks(file_path, path, max_len))
     return chunks
 
 
-def _compute_idf(chunks: Iterable[Chunk]) -> Dict[str, float]:
-    docs = list(chunks)
-    if not docs:
-        return {}
-    df: Dict[str, int] = {}
-    for chunk in docs:
-        tokens = set(_tokenize(f"{chunk.title} {chunk.text}"))
-        for token in tokens:
-            df[token] = df.get(token, 0) + 1
-    n_docs = len(docs)
-    return {term: math.log((1 + n_docs) / (1 + count)) + 1 for term, count in df.items()}
-
-
-def _tfidf_vector(text: str, idf: Dict[str, float]) -> Dict[str, float]:
-    tokens = _tokenize(text)
-    if not tokens:
-        return {}
-    counts: Dict[str, int] = {}
-    for token in tokens:
-        counts[token] = counts.get(token, 0) + 1
-    total = len(tokens)
-    vector: Dict[str, float] = {}
-    for token, count in counts.items():
-        weight = (count / total) * idf.get(token, 0.0)
-        if weight:
-            vector[token] = weight
-    return vector
+def _file_chunks(file_path: Path, root: Path, max_len: int) -> List[Chunk]:
+    lines = file_path.read_text(encoding="utf-8").splitlines()
+    title, source_url = _extract_doc_metadata(lines)
+    content = _content_without_metadata(lines)
+    if not content:
+        return []
+    doc_id = str(file_path.relative_to(root)).replace("/", "-").replace("\\", "-")
+    chunks: List[Chunk] = []
+    idx = 0
+    for block in _split_blocks(content):
+        for part in _split_long_block(block, max_len):
+            chunks.append(
+                Chunk(
+                    chunk_id=f"{doc_id}-{idx}",
+                    doc_id=doc_id,
+                    title=title,
+                    source_url=source_url,
+                    text=part,
+                )
+            )
+            idx += 1
+    return chunks
 
 
 @dataclass
 class KnowledgeStore:
-    chunks: List[Chunk]
-    idf: Dict[str, float]
-    vectors: List[Dict[str, float]]
-    norms: List[float]
+    chunks: Sequence[Chunk]
+    engine: InvertedIndex
 
     @classmethod
     def load(cls, path: Path, max_len: int = 800) -> "KnowledgeStore":
-        if not path.exists():
-            return cls([], {}, [], [])
-        chunks = _load_chunks(path, max_len)
-        idf = _compute_idf(chunks)
-        vectors: List[Dict[str, float]] = []
-        norms: List[float] = []
-        for chunk in chunks:
-            vec = _tfidf_vector(f"{chunk.title} {chunk.text}", idf)
-            vectors.append(vec)
-            norms.append(math.sqrt(sum(weight * weight for weight in vec.values())))
-        return cls(chunks=chunks, idf=idf, vectors=vectors, norms=norms)
+        chunks = _load_chunks(path, max_len) if path.exists() else []
+        engine = InvertedIndex.build([f"{chunk.title} {chunk.text}" for chunk in chunks], _tokenize)
+        return cls(chunks=chunks, engine=engine)
+
+    @classmethod
+    def load_prebuilt(cls, path: Path, max_len: int = 800, directory: Optional[Path] = None) -> "KnowledgeStore":
+        """Like ``load``, but memory-mapped from the index artifact (rebuilt when ``path`` changes)."""
+
+        def build():
+            store = cls.load(path, max_len)
+            return store.chunks, store.engine
+
+        chunks, engine, _ = load_or_build(
+            "knowledge",
+            path,
+            build,
+            _tokenize,
+            params={"max_len": max_len, "stopwords": sorted(_STOPWORDS)},
+            directory=directory,
+        )
+        return cls(chunks=chunks, engine=engine)
+
+    @property
+    def idf(self) -> Dict[str, float]:
+        return self.engine.idf
 
     def search(self, query: str, top_k: int = 3) -> List[tuple[Chunk, float]]:
-        if not self.chunks:
-            return []
-        query = query.strip()
-        if not query:
-            return []
-        q_vec = _tfidf_vector(query, self.idf)
-        if not q_vec:
-            return []
-        q_norm = math.sqrt(sum(weight * weight for weight in q_vec.values()))
-        if q_norm == 0:
-            return []
-
-        scored: List[tuple[Chunk, float]] = []
-        for chunk, vec, norm in zip(self.chunks, self.vectors, self.norms):
-            if norm == 0:
-                continue
-            dot = 0.0
-            for token, weight in q_vec.items():
-                dot += weight * vec.get(token, 0.0)
-            score = dot / (q_norm * norm)
-            if score > 0:
-                scored.append((chunk, score))
-        scored.sort(key=lambda item: item[1], reverse=True)
-        return scored[: max(top_k, 0)]
+        return [(self.chunks[doc], score) for doc, score in self.engine.search(query, top_k=top_k)]
+
+    def search_many(self, queries: Sequence[str], top_k: int = 3) -> List[List[tuple[Chunk, float]]]:
+        return [
+            [(self.chunks[doc], score) for doc, score in hits]
+            for hits in self.engine.search_many(queries, top_k=top_k)
+        ]
 
 
 _DEFAULT_STORE: KnowledgeStore | None = None
@@ -215,5 +186,23 @@ _DEFAULT_STORE: KnowledgeStore | None = None
 def get_default_store() -> KnowledgeStore:
     global _DEFAULT_STORE
     if _DEFAULT_STORE is None:
-        _DEFAULT_STORE = KnowledgeStore.load(DEFAULT_KNOWLEDGE_PATH)
+        _DEFAULT_STORE = build_default_store()
     return _DEFAULT_STORE
+
+
+def set_default_store(store: KnowledgeStore) -> None:
+    """Swap the store served by ``get_default_store``; in-flight searches keep the old one.
+
+    Cached query results for the replaced index are dropped, since nothing
+    will look them up again.
+    """
+    global _DEFAULT_STORE
+    previous, _DEFAULT_STORE = _DEFAULT_STORE, store
+    if previous is None or previous.engine.cache is None:
+        return
+    if previous.engine.version != store.engine.version:
+        previous.engine.cache.drop_version(previous.engine.version)
+
+
+def build_default_store(directory: Optional[Path] = None) -> KnowledgeStore:
+    return KnowledgeStore.load_prebuilt(DEFAULT_KNOWLEDGE_PATH, directory=directory)
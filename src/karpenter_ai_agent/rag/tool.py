@@ -1,7 +1,8 @@
 from __future__ import annotations
 
-from typing import Any, List
+from typing import Any, Dict, List, Sequence
 
+from karpenter_ai_agent.metrics import METRICS
 from karpenter_ai_agent.rag.index import InMemoryVectorIndex, get_default_index
 from karpenter_ai_agent.rag.models import RAGQuery, RAGResult
 
@@ -16,6 +17,49 @@ def retrieve_context(
     return RAGResult(contexts=contexts)
 
 
+def retrieve_context_many(
+    queries: Sequence[str],
+    top_k: int = 3,
+    *,
+    index: InMemoryVectorIndex | None = None,
+) -> List[RAGResult]:
+    """Batch form of ``retrieve_context``: one result per query, in order."""
+    search_index = index or get_default_index()
+    return [
+        RAGResult(contexts=contexts)
+        for contexts in search_index.search_many(queries, top_k=top_k)
+    ]
+
+
+def retrieve_issue_contexts(
+    issues: Sequence[Any],
+    top_k: int = 3,
+    *,
+    index: InMemoryVectorIndex | None = None,
+) -> List[RAGResult]:
+    """Contexts for each issue: precomputed rule citations when they apply, else live search."""
+    search_index = index or get_default_index()
+    results: List[RAGResult] = []
+    live: Dict[int, str] = {}
+    for position, issue in enumerate(issues):
+        query = build_issue_query(issue)
+        contexts = search_index.lookup(getattr(issue, "rule_id", "") or "", query, top_k)
+        if contexts is None:
+            live[position] = query
+            contexts = []
+        results.append(RAGResult(contexts=contexts))
+
+    METRICS.increment("rag.citations.precomputed", len(issues) - len(live))
+    if live:
+        METRICS.increment("rag.citations.live", len(live))
+        # One batched search scores every live query in a single pass; fanning out one
+        # retrieve_karpenter_docs call per issue would repeat that work per query.
+        searched = search_index.search_many(list(live.values()), top_k=top_k)
+        for position, contexts in zip(live, searched):
+            results[position] = RAGResult(contexts=contexts)
+    return results
+
+
 def build_issue_query(issue: Any) -> str:
     parts: List[str] = []
     for attr in ("rule_id", "category", "message", "recommendation", "resource_kind", "resource_name"):
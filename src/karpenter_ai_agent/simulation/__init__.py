@@ -0,0 +1,20 @@
+"""Pod bin-packing simulation of NodePool consolidation."""
+
+from karpenter_ai_agent.simulation.binpack import NodeCapacity, first_fit_decreasing, node_capacity, packer_available
+from karpenter_ai_agent.simulation.simulate import PackingJob, pack_nodepool, simulate_consolidation
+from karpenter_ai_agent.simulation.snapshot import NodeInfo, PodDemand, Snapshot, parse_quantity, parse_snapshot
+
+__all__ = [
+    "NodeCapacity",
+    "NodeInfo",
+    "PackingJob",
+    "PodDemand",
+    "Snapshot",
+    "first_fit_decreasing",
+    "node_capacity",
+    "pack_nodepool",
+    "packer_available",
+    "parse_quantity",
+    "parse_snapshot",
+    "simulate_consolidation",
+]
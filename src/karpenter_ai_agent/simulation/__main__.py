@@ -0,0 +1,3 @@
+from karpenter_ai_agent.simulation.simulate import main
+
+main()
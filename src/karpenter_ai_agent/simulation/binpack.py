@@ -0,0 +1,286 @@
+"""First-fit-decreasing bin packing of pod requests onto one instance type.
+
+Pods are grouped into distinct (millicores, bytes) shapes first; snapshots
+are mostly replicas, so 50k pods are typically a few hundred shapes. Shapes
+are placed largest first (by their larger share of a node's CPU or memory).
+First fit places identical pods by filling open nodes in order up to what
+each still holds, so a whole shape is placed at once: per-node room comes
+from one vectorized division over the open nodes, and its cumulative sum
+says how many nodes the shape spans. The result is the same node count as
+placing pods one by one.
+
+Open nodes are scanned in blocks that track their most free CPU, memory and
+pod slots, and blocks that cannot take a pod are skipped without looking at
+their nodes. That keeps snapshots where most pods have their own requests
+(few replicas, so nearly one shape per pod) within a few seconds as well.
+
+NumPy (``pip install karpenter-ai-agent[fast]``) runs the per-block scans;
+without it the same algorithm runs in pure Python.
+"""
+from __future__ import annotations
+
+import math
+from collections import Counter
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
+
+from karpenter_ai_agent.pricing.table import InstancePrice
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised only without the extra
+    np = None  # type: ignore[assignment]
+
+DEFAULT_MAX_PODS = 110
+MIB = 2**20
+# Open nodes are scanned in blocks; a block is skipped when its roomiest node
+# per resource cannot take the pod.
+_BLOCK = 64
+_WINDOW = 4
+# kube-reserved CPU as Karpenter computes it on AWS: a share of each core range.
+_CPU_RESERVED_STEPS = ((1, 0.06), (1, 0.01), (2, 0.005), (math.inf, 0.0025))
+_EVICTION_THRESHOLD_BYTES = 100 * MIB
+
+Shapes = Tuple[Sequence[int], Sequence[int], Sequence[int]]
+
+
+def packer_available() -> bool:
+    return np is not None
+
+
+@dataclass(frozen=True)
+class NodeCapacity:
+    """What pods can request on one node of an instance type."""
+
+    instance_type: str
+    cpu_millis: int
+    memory_bytes: int
+    max_pods: int
+    hourly: float
+
+
+def kube_reserved(vcpu: float, max_pods: int) -> Tuple[int, int]:
+    """(millicores, bytes) kept back for the kubelet, system daemons and eviction."""
+    cpu, left = 0.0, vcpu
+    for cores, share in _CPU_RESERVED_STEPS:
+        step = min(left, cores)
+        cpu += step * share * 1000
+        left -= step
+        if left <= 0:
+            break
+    memory = (11 * max_pods + 255) * MIB + _EVICTION_THRESHOLD_BYTES
+    return int(math.ceil(cpu)), memory
+
+
+def node_capacity(
+    price: InstancePrice,
+    *,
+    max_pods: int = DEFAULT_MAX_PODS,
+    daemon: Tuple[int, int, int] = (0, 0, 0),
+    multiplier: float = 1.0,
+) -> Optional[NodeCapacity]:
+    """Allocatable capacity left for workload pods after DaemonSet pods, or None if nothing is."""
+    reserved_cpu, reserved_memory = kube_reserved(price.vcpu, max_pods)
+    capacity = NodeCapacity(
+        instance_type=price.instance_type,
+        cpu_millis=int(price.vcpu * 1000) - reserved_cpu - daemon[0],
+        memory_bytes=int(price.memory_gib * 2**30) - reserved_memory - daemon[1],
+        max_pods=max_pods - daemon[2],
+        hourly=price.on_demand_hourly * multiplier,
+    )
+    if min(capacity.cpu_millis, capacity.memory_bytes, capacity.max_pods) <= 0:
+        return None
+    return capacity
+
+
+def group_pods(cpu_millis: Sequence[int], memory_bytes: Sequence[int]) -> Shapes:
+    """Distinct (millicores, bytes) request shapes and how many pods have each."""
+    if np is not None and len(cpu_millis):
+        pairs = np.stack([np.asarray(cpu_millis, dtype=np.int64), np.asarray(memory_bytes, dtype=np.int64)], axis=1)
+        unique, counts = np.unique(pairs, axis=0, return_counts=True)
+        return unique[:, 0].tolist(), unique[:, 1].tolist(), counts.tolist()
+    grouped = sorted(Counter(zip(cpu_millis, memory_bytes)).items())
+    return [c for (c, _), _ in grouped], [m for (_, m), _ in grouped], [n for _, n in grouped]
+
+
+@dataclass(frozen=True)
+class Demand:
+    """Totals and largest single request of a set of pod shapes."""
+
+    cpu_millis: int
+    memory_bytes: int
+    pods: int
+    largest_cpu: int
+    largest_memory: int
+
+    @classmethod
+    def of(cls, shapes: Shapes) -> "Demand":
+        cpu, memory, counts = shapes
+        return cls(
+            cpu_millis=sum(c * n for c, n in zip(cpu, counts)),
+            memory_bytes=sum(m * n for m, n in zip(memory, counts)),
+            pods=sum(counts),
+            largest_cpu=max(cpu, default=0),
+            largest_memory=max(memory, default=0),
+        )
+
+    def fits_on(self, capacity: NodeCapacity) -> bool:
+        """Whether every pod fits on an empty node."""
+        return self.largest_cpu <= capacity.cpu_millis and self.largest_memory <= capacity.memory_bytes
+
+    def lower_bound(self, capacity: NodeCapacity) -> int:
+        """Nodes needed if requests could be split freely across nodes."""
+        return max(
+            -(-self.cpu_millis // capacity.cpu_millis),
+            -(-self.memory_bytes // capacity.memory_bytes),
+            -(-self.pods // capacity.max_pods),
+        )
+
+
+def _order(shapes: Shapes, capacity: NodeCapacity) -> List[Tuple[int, int, int]]:
+    """Shapes largest first: by the larger of their CPU and memory share, then CPU, then memory."""
+    return sorted(
+        zip(shapes[0], shapes[1], shapes[2]),
+        key=lambda s: (max(s[0] / capacity.cpu_millis, s[1] / capacity.memory_bytes), s[0], s[1]),
+        reverse=True,
+    )
+
+
+def _per_node(c: int, m: int, capacity: NodeCapacity) -> int:
+    per_node = capacity.max_pods
+    if c:
+        per_node = min(per_node, capacity.cpu_millis // c)
+    if m:
+        per_node = min(per_node, capacity.memory_bytes // m)
+    return per_node
+
+
+def _ffd_numpy(ordered: List[Tuple[int, int, int]], capacity: NodeCapacity) -> int:
+    total = sum(k for _, _, k in ordered)
+    blocks = -(-total // _BLOCK)
+    # Unopened node slots have no room, so they never fit.
+    rem_c = np.zeros(blocks * _BLOCK, dtype=np.int64)
+    rem_m = np.zeros(blocks * _BLOCK, dtype=np.int64)
+    rem_p = np.zeros(blocks * _BLOCK, dtype=np.int64)
+    max_c = np.zeros(blocks, dtype=np.int64)
+    max_m = np.zeros(blocks, dtype=np.int64)
+    max_p = np.zeros(blocks, dtype=np.int64)
+
+    lanes = np.arange(_BLOCK)
+
+    def refresh(touched: "np.ndarray") -> None:
+        nodes = touched[:, None] * _BLOCK + lanes
+        max_c[touched] = rem_c[nodes].max(axis=1)
+        max_m[touched] = rem_m[nodes].max(axis=1)
+        max_p[touched] = rem_p[nodes].max(axis=1)
+
+    opened = 0
+    for c, m, k in ordered:
+        used = -(-opened // _BLOCK)
+        # Blocks whose best node per resource could take a pod; the node may still not.
+        candidates = np.flatnonzero((max_c[:used] >= c) & (max_m[:used] >= m) & (max_p[:used] > 0))
+        # Scan candidate blocks a few at a time, widening the window, as most
+        # shapes are placed within the first few.
+        start, window = 0, _WINDOW
+        while k and start < candidates.size:
+            chunk = candidates[start : start + window]
+            start, window = start + chunk.size, window * 2
+            nodes = (chunk[:, None] * _BLOCK + lanes).ravel()
+            room = rem_p[nodes]
+            if c:
+                np.minimum(room, rem_c[nodes] // c, out=room)
+            if m:
+                np.minimum(room, rem_m[nodes] // m, out=room)
+            filled = np.cumsum(room)
+            if not filled[-1]:
+                continue
+            if filled[-1] > k:
+                last = int(np.searchsorted(filled, k))
+                nodes, room = nodes[: last + 1], room[: last + 1]
+                room[-1] -= filled[last] - k
+            rem_c[nodes] -= room * c
+            rem_m[nodes] -= room * m
+            rem_p[nodes] -= room
+            refresh(chunk[: -(-nodes.size // _BLOCK)])
+            k -= int(room.sum())
+        if k:
+            per_node = _per_node(c, m, capacity)
+            new = -(-k // per_node)
+            placed = np.full(new, per_node, dtype=np.int64)
+            placed[-1] = k - per_node * (new - 1)
+            rem_c[opened : opened + new] = capacity.cpu_millis - placed * c
+            rem_m[opened : opened + new] = capacity.memory_bytes - placed * m
+            rem_p[opened : opened + new] = capacity.max_pods - placed
+            refresh(np.arange(opened // _BLOCK, (opened + new - 1) // _BLOCK + 1))
+            opened += new
+    return opened
+
+
+def _ffd_python(ordered: List[Tuple[int, int, int]], capacity: NodeCapacity) -> int:
+    rem_c: List[int] = []
+    rem_m: List[int] = []
+    rem_p: List[int] = []
+    max_c: List[int] = []
+    max_m: List[int] = []
+    max_p: List[int] = []
+
+    def refresh(block: int) -> None:
+        lo = block * _BLOCK
+        values = (max(rem_c[lo : lo + _BLOCK]), max(rem_m[lo : lo + _BLOCK]), max(rem_p[lo : lo + _BLOCK]))
+        if block == len(max_c):
+            max_c.append(values[0])
+            max_m.append(values[1])
+            max_p.append(values[2])
+        else:
+            max_c[block], max_m[block], max_p[block] = values
+
+    for c, m, k in ordered:
+        for block in range(len(max_c)):
+            if max_c[block] < c or max_m[block] < m or not max_p[block]:
+                continue
+            touched = False
+            for i in range(block * _BLOCK, min((block + 1) * _BLOCK, len(rem_p))):
+                room = rem_p[i]
+                if c:
+                    room = min(room, rem_c[i] // c)
+                if m:
+                    room = min(room, rem_m[i] // m)
+                room = min(room, k)
+                if room:
+                    rem_c[i] -= room * c
+                    rem_m[i] -= room * m
+                    rem_p[i] -= room
+                    k -= room
+                    touched = True
+                    if not k:
+                        break
+            if touched:
+                refresh(block)
+            if not k:
+                break
+        per_node = _per_node(c, m, capacity)
+        while k:
+            placed = min(per_node, k)
+            rem_c.append(capacity.cpu_millis - placed * c)
+            rem_m.append(capacity.memory_bytes - placed * m)
+            rem_p.append(capacity.max_pods - placed)
+            refresh((len(rem_p) - 1) // _BLOCK)
+            k -= placed
+    return len(rem_p)
+
+
+def first_fit_decreasing(shapes: Shapes, capacity: NodeCapacity, *, vectorized: Optional[bool] = None) -> int:
+    """Nodes of ``capacity`` that first-fit-decreasing needs for ``shapes``.
+
+    Raises ``ValueError`` if a pod does not fit on an empty node.
+    """
+    if not Demand.of(shapes).fits_on(capacity):
+        raise ValueError(f"A pod does not fit on an empty {capacity.instance_type} node")
+    ordered = [shape for shape in _order(shapes, capacity) if shape[2]]
+    if not ordered:
+        return 0
+    if vectorized is None:
+        vectorized = packer_available()
+    if vectorized and np is not None:
+        return _ffd_numpy(ordered, capacity)
+    return _ffd_python(ordered, capacity)
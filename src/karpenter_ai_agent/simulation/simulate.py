@@ -0,0 +1,250 @@
+"""Consolidation simulator: current vs. packed node count and cost per NodePool.
+
+Each NodePool's workload pods from a snapshot are packed first-fit-decreasing
+onto every instance type it may launch (see ``pricing.PriceTable.eligible``),
+one type at a time; the cheapest result is reported as the packed optimum.
+DaemonSet pods are not packed; their requests are reserved on every node.
+Types are tried in order of their lower-bound cost and the search stops once
+that bound reaches the best packed cost, so most NodePools pack only a few.
+
+Current and packed costs both use On-Demand prices from the offline table,
+so the difference isolates packing from Spot or Graviton savings. The packed
+count is a heuristic optimum, not a proof: it ignores affinity, topology
+spread, PodDisruptionBudgets and mixed instance types.
+
+Library callers (the analysis graph, the MCP server, the web app) pack
+in-process by default. ``workers`` above 1 packs NodePools in parallel
+processes, for snapshots spanning many NodePools; the CLI defaults it to
+``SIMULATION_WORKERS``.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from karpenter_ai_agent.models import CanonicalConfig
+from karpenter_ai_agent.pricing.table import HOURS_PER_MONTH, PriceTable, get_price_table
+from karpenter_ai_agent.simulation.binpack import (
+    DEFAULT_MAX_PODS,
+    Demand,
+    NodeCapacity,
+    Shapes,
+    first_fit_decreasing,
+    group_pods,
+    node_capacity,
+)
+from karpenter_ai_agent.simulation.snapshot import NodeInfo, PodDemand, Snapshot, parse_snapshot
+
+SIMULATION_WORKERS_ENV = "SIMULATION_WORKERS"
+
+
+def _workers_from_env() -> int:
+    raw = os.environ.get(SIMULATION_WORKERS_ENV, "").strip()
+    try:
+        return max(int(raw), 1) if raw else 1
+    except ValueError:
+        return 1
+
+
+@dataclass(frozen=True)
+class PackingJob:
+    nodepool: str
+    shapes: Shapes
+    candidates: Tuple[NodeCapacity, ...]
+    vectorized: Optional[bool] = None
+
+
+def pack_nodepool(job: PackingJob) -> Dict[str, Any]:
+    """The cheapest first-fit-decreasing packing of a NodePool's pods over its candidates."""
+    cpu, memory, counts = job.shapes
+    # Pods too big for every candidate cannot be placed whatever type is picked;
+    # checking against the candidates no other one dominates is enough.
+    sizes = {(c.cpu_millis, c.memory_bytes) for c in job.candidates}
+    frontier = [(fc, fm) for fc, fm in sizes if not any(oc >= fc and om >= fm and (oc, om) != (fc, fm) for oc, om in sizes)]
+    placeable = [any(c <= fc and m <= fm for fc, fm in frontier) for c, m in zip(cpu, memory)]
+    shapes: Shapes = (
+        [c for c, ok in zip(cpu, placeable) if ok],
+        [m for m, ok in zip(memory, placeable) if ok],
+        [n for n, ok in zip(counts, placeable) if ok],
+    )
+    result: Dict[str, Any] = {
+        "unschedulable_pods": sum(n for n, ok in zip(counts, placeable) if not ok),
+        "packed_nodes": None,
+        "packed_instance_type": None,
+        "packed_hourly_usd": None,
+        "lower_bound_nodes": None,
+        "instance_types_packed": 0,
+    }
+    if not shapes[2]:
+        if job.candidates:
+            result.update(packed_nodes=0, packed_hourly_usd=0.0, lower_bound_nodes=0)
+        return result
+
+    demand = Demand.of(shapes)
+    bounds = []
+    for capacity in job.candidates:
+        if demand.fits_on(capacity):
+            bound = demand.lower_bound(capacity)
+            bounds.append((bound * capacity.hourly, bound, capacity))
+    bounds.sort(key=lambda item: (item[0], item[2].instance_type))
+    best: Optional[Tuple[float, int, NodeCapacity, int]] = None
+    for bound_cost, bound, capacity in bounds:
+        if best is not None and bound_cost >= best[0]:
+            break
+        nodes = first_fit_decreasing(shapes, capacity, vectorized=job.vectorized)
+        result["instance_types_packed"] += 1
+        if best is None or nodes * capacity.hourly < best[0]:
+            best = (nodes * capacity.hourly, nodes, capacity, bound)
+    if best is not None:
+        result.update(
+            packed_nodes=best[1],
+            packed_instance_type=best[2].instance_type,
+            packed_hourly_usd=best[0],
+            lower_bound_nodes=best[3],
+        )
+    else:
+        # No single type fits every placeable pod; count them as unschedulable.
+        result["unschedulable_pods"] += sum(shapes[2])
+    return result
+
+
+def _assign(
+    snapshot: Snapshot, names: Sequence[str]
+) -> Tuple[Dict[str, List[PodDemand]], Dict[str, List[NodeInfo]], int]:
+    """Pods and nodes per NodePool; unlabelled ones go to the only NodePool, if there is one."""
+    known = set(names)
+    default = names[0] if len(names) == 1 else None
+    pods: Dict[str, List[PodDemand]] = defaultdict(list)
+    nodes: Dict[str, List[NodeInfo]] = defaultdict(list)
+    unassigned = 0
+    for pod in snapshot.pods:
+        pool = pod.nodepool if pod.nodepool in known else (default if pod.nodepool is None else None)
+        if pool is None:
+            unassigned += 1
+        else:
+            pods[pool].append(pod)
+    for node in snapshot.nodes:
+        pool = node.nodepool if node.nodepool in known else (default if node.nodepool is None else None)
+        if pool is not None:
+            nodes[pool].append(node)
+    return pods, nodes, unassigned
+
+
+def _daemon_overhead(pods: Sequence[PodDemand]) -> Tuple[int, int, int]:
+    """Per-node (millicores, bytes, pods) of the DaemonSets seen in a NodePool."""
+    largest: Dict[str, Tuple[int, int]] = {}
+    for pod in pods:
+        if pod.daemonset:
+            c, m = largest.get(pod.daemonset, (0, 0))
+            largest[pod.daemonset] = (max(c, pod.cpu_millis), max(m, pod.memory_bytes))
+    return sum(c for c, _ in largest.values()), sum(m for _, m in largest.values()), len(largest)
+
+
+def simulate_consolidation(
+    config: CanonicalConfig,
+    snapshot: Snapshot,
+    *,
+    region: Optional[str] = None,
+    table: Optional[PriceTable] = None,
+    max_pods: int = DEFAULT_MAX_PODS,
+    workers: Optional[int] = None,
+    vectorized: Optional[bool] = None,
+) -> Dict[str, Any]:
+    """Current vs. packed nodes and monthly On-Demand cost for each NodePool in ``config``."""
+    table = table or get_price_table()
+    region_name, multiplier, region_known = table.resolve_region(region)
+    provisioners = config.provisioners
+    pods_by_pool, nodes_by_pool, unassigned = _assign(snapshot, [p.name for p in provisioners])
+
+    jobs = []
+    for prov in provisioners:
+        pods = pods_by_pool.get(prov.name, [])
+        workload = [pod for pod in pods if not pod.daemonset]
+        daemon = _daemon_overhead(pods)
+        candidates = []
+        for i in table.eligible(prov.instance_families):
+            capacity = node_capacity(table.instances[i], max_pods=max_pods, daemon=daemon, multiplier=multiplier)
+            if capacity is not None:
+                candidates.append(capacity)
+        shapes = group_pods([p.cpu_millis for p in workload], [p.memory_bytes for p in workload])
+        jobs.append(PackingJob(prov.name, shapes, tuple(candidates), vectorized))
+
+    workers = workers or 1
+    if workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+            packed = list(pool.map(pack_nodepool, jobs, chunksize=max(1, len(jobs) // (workers * 4))))
+    else:
+        packed = [pack_nodepool(job) for job in jobs]
+
+    nodepools = []
+    for prov, job, result in zip(provisioners, jobs, packed):
+        nodes = nodes_by_pool.get(prov.name, [])
+        prices = [table.get(node.instance_type or "") for node in nodes]
+        current_nodes = len(nodes) or len({p.node_name for p in pods_by_pool.get(prov.name, []) if p.node_name})
+        current_hourly = sum(price.on_demand_hourly for price in prices if price) * multiplier
+        unpriced_nodes = sum(1 for price in prices if price is None)
+        entry: Dict[str, Any] = {
+            "nodepool": prov.name,
+            "pods": sum(job.shapes[2]),
+            "daemonset_pods": len(pods_by_pool.get(prov.name, [])) - sum(job.shapes[2]),
+            "current_nodes": current_nodes,
+            "current_instance_types": dict(Counter(node.instance_type for node in nodes if node.instance_type)),
+            "current_monthly_cost_usd": round(current_hourly * HOURS_PER_MONTH, 2) if nodes and not unpriced_nodes else None,
+            "unpriced_nodes": unpriced_nodes,
+            "packed_nodes": result["packed_nodes"],
+            "packed_instance_type": result["packed_instance_type"],
+            "packed_monthly_cost_usd": (
+                round(result["packed_hourly_usd"] * HOURS_PER_MONTH, 2) if result["packed_hourly_usd"] is not None else None
+            ),
+            "lower_bound_nodes": result["lower_bound_nodes"],
+            "unschedulable_pods": result["unschedulable_pods"],
+            "instance_types_packed": result["instance_types_packed"],
+        }
+        savings = None
+        if entry["current_monthly_cost_usd"] is not None and entry["packed_monthly_cost_usd"] is not None:
+            savings = round(max(entry["current_monthly_cost_usd"] - entry["packed_monthly_cost_usd"], 0.0), 2)
+        entry["monthly_savings_usd"] = savings
+        nodepools.append(entry)
+
+    nodepools.sort(key=lambda e: (-(e["monthly_savings_usd"] or 0.0), e["nodepool"]))
+    return {
+        "region": region_name,
+        "region_priced": region_known,
+        "price_table_version": table.version,
+        "max_pods_per_node": max_pods,
+        "total_pods": len(snapshot.pods),
+        "unassigned_pods": unassigned,
+        "nodepools": nodepools,
+        "monthly_savings_usd": round(sum(e["monthly_savings_usd"] or 0.0 for e in nodepools), 2),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    from karpenter_ai_agent.agents.parser_agent import ParserAgent
+    from karpenter_ai_agent.models import AnalysisInput
+
+    parser = argparse.ArgumentParser(description="Bin-pack a pod snapshot onto each NodePool's instance types.")
+    parser.add_argument("snapshot", type=Path, help="kubectl get pods,nodes -A -o yaml|json output")
+    parser.add_argument("--nodepools", type=Path, required=True, help="NodePool / Provisioner YAML")
+    parser.add_argument("--region", default=None)
+    parser.add_argument("--max-pods", type=int, default=DEFAULT_MAX_PODS)
+    parser.add_argument("--workers", type=int, default=None, help=f"Packing processes (default ${SIMULATION_WORKERS_ENV})")
+    args = parser.parse_args(argv)
+
+    parsed = ParserAgent().run(AnalysisInput(yaml_text=args.nodepools.read_text(encoding="utf-8")))
+    if parsed.config is None:
+        parser.error("; ".join(error.message for error in parsed.parse_errors) or "No NodePools found")
+    config = parsed.config
+    snapshot = parse_snapshot(args.snapshot.read_text(encoding="utf-8"))
+    report = simulate_consolidation(
+        config, snapshot, region=args.region, max_pods=args.max_pods, workers=args.workers or _workers_from_env()
+    )
+    json.dump(report, sys.stdout, indent=2)
+    sys.stdout.write("\n")
@@ -0,0 +1,212 @@
+"""Pod and node snapshots, e.g. ``kubectl get pods,nodes -A -o yaml``.
+
+Only what the packer needs is kept: each running pod's effective resource
+requests, the NodePool it belongs to and its DaemonSet owner, and each
+Karpenter node's NodePool and instance type. JSON (``-o json``) parses
+faster than YAML for large snapshots; both are accepted, as a ``List`` or as
+separate documents.
+"""
+from __future__ import annotations
+
+import json
+import re
+from dataclasses import dataclass, field, replace
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import yaml
+
+NODEPOOL_LABELS = ("karpenter.sh/nodepool", "karpenter.sh/provisioner-name")
+INSTANCE_TYPE_LABELS = ("node.kubernetes.io/instance-type", "beta.kubernetes.io/instance-type")
+CAPACITY_TYPE_LABEL = "karpenter.sh/capacity-type"
+_DONE_PHASES = {"Succeeded", "Failed"}
+
+_QUANTITY_RE = re.compile(r"^([+-]?[0-9.]+(?:[eE][+-]?[0-9]+)?)([a-zA-Z]*)$")
+_SUFFIXES = {
+    "": 1,
+    "m": 1e-3,
+    "k": 1e3,
+    "M": 1e6,
+    "G": 1e9,
+    "T": 1e12,
+    "P": 1e15,
+    "E": 1e18,
+    "Ki": 2**10,
+    "Mi": 2**20,
+    "Gi": 2**30,
+    "Ti": 2**40,
+    "Pi": 2**50,
+    "Ei": 2**60,
+}
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+def parse_quantity(value: Any) -> float:
+    """A Kubernetes resource quantity (``500m``, ``1.5``, ``256Mi``, ``1e9``) as a plain number."""
+    if isinstance(value, (int, float)):
+        return float(value)
+    if not isinstance(value, str):
+        raise ValueError(f"Invalid resource quantity: {value!r}")
+    return _parse_quantity_text(value)
+
+
+@lru_cache(maxsize=4096)
+def _parse_quantity_text(value: str) -> float:
+    match = _QUANTITY_RE.match(value.strip())
+    if not match or match.group(2) not in _SUFFIXES:
+        raise ValueError(f"Invalid resource quantity: {value!r}")
+    return float(match.group(1)) * _SUFFIXES[match.group(2)]
+
+
+@dataclass(frozen=True)
+class PodDemand:
+    name: str
+    namespace: str
+    cpu_millis: int
+    memory_bytes: int
+    nodepool: Optional[str] = None
+    node_name: Optional[str] = None
+    # "namespace/name" of the owning DaemonSet, if any.
+    daemonset: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class NodeInfo:
+    name: str
+    nodepool: Optional[str]
+    instance_type: Optional[str]
+    capacity_type: Optional[str] = None
+
+
+@dataclass
+class Snapshot:
+    pods: List[PodDemand] = field(default_factory=list)
+    nodes: List[NodeInfo] = field(default_factory=list)
+
+
+def _mapping(value: Any, what: str) -> Dict[str, Any]:
+    """``value`` as a mapping (empty when unset); ValueError for any other shape."""
+    if value is None:
+        return {}
+    if not isinstance(value, dict):
+        raise ValueError(f"Expected a mapping for {what}, got {type(value).__name__}")
+    return value
+
+
+def _sequence(value: Any, what: str) -> List[Any]:
+    if value is None:
+        return []
+    if not isinstance(value, list):
+        raise ValueError(f"Expected a list for {what}, got {type(value).__name__}")
+    return value
+
+
+def _requests(containers: Any, what: str = "containers") -> Tuple[List[float], List[float]]:
+    cpu, memory = [], []
+    for container in _sequence(containers, what):
+        resources = _mapping(_mapping(container, what).get("resources"), "resources")
+        requests = _mapping(resources.get("requests"), "resources.requests")
+        cpu.append(parse_quantity(requests.get("cpu", 0)))
+        memory.append(parse_quantity(requests.get("memory", 0)))
+    return cpu, memory
+
+
+def pod_requests(spec: Dict[str, Any]) -> Tuple[int, int]:
+    """Effective (millicores, bytes) the scheduler reserves for a pod.
+
+    The larger of the app containers' sum and the biggest init container, per
+    resource, plus the pod overhead.
+    """
+    cpu, memory = _requests(spec.get("containers"))
+    init_cpu, init_memory = _requests(spec.get("initContainers"), "initContainers")
+    overhead = _mapping(spec.get("overhead"), "overhead")
+    total_cpu = max(sum(cpu), max(init_cpu, default=0.0)) + parse_quantity(overhead.get("cpu", 0))
+    total_memory = max(sum(memory), max(init_memory, default=0.0)) + parse_quantity(overhead.get("memory", 0))
+    return int(round(total_cpu * 1000)), int(round(total_memory))
+
+
+def _label(labels: Dict[str, Any], keys: Iterable[str]) -> Optional[str]:
+    for key in keys:
+        if labels.get(key):
+            return str(labels[key])
+    return None
+
+
+def _pod(item: Dict[str, Any]) -> Optional[PodDemand]:
+    if _mapping(item.get("status"), "status").get("phase") in _DONE_PHASES:
+        return None
+    metadata = _mapping(item.get("metadata"), "metadata")
+    spec = _mapping(item.get("spec"), "spec")
+    namespace = str(metadata.get("namespace") or "default")
+    daemonset = next(
+        (
+            f"{namespace}/{owner.get('name')}"
+            for owner in _sequence(metadata.get("ownerReferences"), "ownerReferences")
+            if _mapping(owner, "ownerReferences").get("kind") == "DaemonSet"
+        ),
+        None,
+    )
+    cpu_millis, memory_bytes = pod_requests(spec)
+    return PodDemand(
+        name=str(metadata.get("name") or ""),
+        namespace=namespace,
+        cpu_millis=cpu_millis,
+        memory_bytes=memory_bytes,
+        nodepool=_label(_mapping(spec.get("nodeSelector"), "nodeSelector"), NODEPOOL_LABELS),
+        node_name=spec.get("nodeName"),
+        daemonset=daemonset,
+    )
+
+
+def _node(item: Dict[str, Any]) -> NodeInfo:
+    metadata = _mapping(item.get("metadata"), "metadata")
+    labels = _mapping(metadata.get("labels"), "labels")
+    return NodeInfo(
+        name=str(metadata.get("name") or ""),
+        nodepool=_label(labels, NODEPOOL_LABELS),
+        instance_type=_label(labels, INSTANCE_TYPE_LABELS),
+        capacity_type=labels.get(CAPACITY_TYPE_LABEL),
+    )
+
+
+def _items(documents: Iterable[Any]) -> Iterable[Dict[str, Any]]:
+    for document in documents:
+        if not isinstance(document, dict):
+            continue
+        if document.get("kind") == "List" or (
+            "items" in document and str(document.get("kind", "")).endswith("List")
+        ):
+            yield from (item for item in document.get("items") or () if isinstance(item, dict))
+        else:
+            yield document
+
+
+def parse_snapshot(text: str) -> Snapshot:
+    """Pods and nodes from ``kubectl get ... -o yaml|json`` output.
+
+    Finished pods (``Succeeded`` / ``Failed``) are skipped. Pods and nodes whose
+    fields have the wrong shape (e.g. a string ``metadata``) raise ``ValueError``.
+    """
+    try:
+        documents: List[Any] = [json.loads(text)]
+    except ValueError:
+        documents = list(yaml.load_all(text, Loader=_YAML_LOADER))
+
+    snapshot = Snapshot()
+    for item in _items(documents):
+        kind = item.get("kind")
+        if kind == "Pod":
+            pod = _pod(item)
+            if pod is not None:
+                snapshot.pods.append(pod)
+        elif kind == "Node":
+            snapshot.nodes.append(_node(item))
+    # Pods take their NodePool from the node they run on, when it has one.
+    node_pools = {node.name: node.nodepool for node in snapshot.nodes if node.nodepool}
+    snapshot.pods = [
+        pod
+        if pod.node_name not in node_pools or pod.nodepool == node_pools[pod.node_name]
+        else replace(pod, nodepool=node_pools[pod.node_name])
+        for pod in snapshot.pods
+    ]
+    return snapshot
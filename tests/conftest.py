@@ -1,7 +1,22 @@
 from pathlib import Path
+import os
 import sys
 
+import pytest
+
 ROOT = Path(__file__).resolve().parents[1]
 SRC = ROOT / "src"
 if str(SRC) not in sys.path:
     sys.path.insert(0, str(SRC))
+
+
+@pytest.fixture(autouse=True, scope="session")
+def _rag_index_dir(tmp_path_factory):
+    """Artifacts built by the default index and store go to a temp dir, not the checkout's .rag-index."""
+    previous = os.environ.get("RAG_INDEX_DIR")
+    os.environ["RAG_INDEX_DIR"] = str(tmp_path_factory.mktemp("rag-index"))
+    yield
+    if previous is None:
+        os.environ.pop("RAG_INDEX_DIR", None)
+    else:
+        os.environ["RAG_INDEX_DIR"] = previous
@@ -67,3 +67,15 @@ def test_evaluator_fails_on_hallucinated_reference_and_citation():
     assert result.passed is False
     assert "unknown_finding_reference" in codes
     assert "invalid_doc_source_url" in codes
+
+
+def test_evaluator_rule_ids_limits_issue_checks():
+    agent = EvaluatorAgent()
+    report = _base_report()
+    report.issues[0].explanation.docs[0].source_url = "notaurl"
+
+    scoped = agent.run(report, rag_context={}, rule_ids={"cost:other-rule"})
+    full = agent.run(report, rag_context={})
+
+    assert scoped.passed is True
+    assert full.failing_rule_ids() == {"security:missing-nodeclass"}
@@ -78,3 +78,89 @@ def test_explanation_flow_retries_once_and_keeps_explanations_when_second_passes
     assert calls["count"] == 2
     assert report.raw.get("evaluation_retries") == 1
     assert report.raw.get("evaluation_passed") is True
+
+
+def test_explanation_flow_reuses_explain_retrievals_for_evaluation_and_retry(monkeypatch):
+    from karpenter_ai_agent.rag import explain
+
+    calls = {"retrieve": 0, "evaluate": 0, "allowed": []}
+    real_retrieve = explain.retrieve_issue_contexts
+
+    def counting_retrieve(*args, **kwargs):  # noqa: ANN002, ANN003
+        calls["retrieve"] += 1
+        return real_retrieve(*args, **kwargs)
+
+    def fail_then_pass(report, *, rag_context=None, **kwargs):  # noqa: ANN003
+        calls["evaluate"] += 1
+        calls["allowed"].append(rag_context)
+        return EvaluationResult(passed=calls["evaluate"] > 1, reasons=[], notes=[])
+
+    monkeypatch.setattr(explain, "retrieve_issue_contexts", counting_retrieve)
+    monkeypatch.setattr(
+        "karpenter_ai_agent.orchestration.graph.retrieve_issue_contexts", counting_retrieve
+    )
+    monkeypatch.setattr(
+        "karpenter_ai_agent.orchestration.graph.evaluator_agent.run",
+        fail_then_pass,
+    )
+
+    yaml_text = (FIXTURES / "basic-karpenter.yaml").read_text()
+    report = run_analysis_graph(
+        AnalysisInput(
+            yaml_text=yaml_text,
+            region="us-east-1",
+            options={"enable_explanations": True, "enable_evaluator": True},
+        )
+    )
+
+    assert calls["evaluate"] == 2
+    assert calls["retrieve"] == 1
+    assert report.raw.get("rag_retrievals") == len(report.issues)
+    assert calls["allowed"][0] == calls["allowed"][1]
+    assert set(calls["allowed"][0]) == {issue.rule_id for issue in report.issues}
+
+
+def test_explanation_flow_retry_regenerates_only_failing_rule_ids(monkeypatch):
+    from karpenter_ai_agent.orchestration import graph
+
+    explained: list = []
+    evaluated: list = []
+    real_attach = graph.attach_contract_explanations
+
+    def recording_attach(issues, **kwargs):  # noqa: ANN003
+        explained.append([issue.rule_id for issue in issues])
+        return real_attach(issues, **kwargs)
+
+    def fail_one_then_pass(report, *, rule_ids=None, **kwargs):  # noqa: ANN003
+        evaluated.append(rule_ids)
+        if len(evaluated) == 1:
+            return EvaluationResult(
+                passed=False,
+                reasons=[
+                    EvaluationReason(
+                        code="hallucinated_citation",
+                        message="Citation was not present in RAG context.",
+                        rule_id=report.issues[0].rule_id,
+                    )
+                ],
+            )
+        return EvaluationResult(passed=True)
+
+    monkeypatch.setattr(graph, "attach_contract_explanations", recording_attach)
+    monkeypatch.setattr(graph.evaluator_agent, "run", fail_one_then_pass)
+
+    yaml_text = (FIXTURES / "basic-karpenter.yaml").read_text()
+    report = run_analysis_graph(
+        AnalysisInput(
+            yaml_text=yaml_text,
+            region="us-east-1",
+            options={"enable_explanations": True, "enable_evaluator": True},
+        )
+    )
+
+    failing = report.issues[0].rule_id
+    assert len(report.issues) > 1
+    assert explained[1] == [issue.rule_id for issue in report.issues if issue.rule_id == failing]
+    assert evaluated == [None, {failing}]
+    assert report.raw.get("evaluation_retry_issues") == len(explained[1])
+    assert report.raw.get("evaluation_passed") is True
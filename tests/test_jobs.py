@@ -0,0 +1,101 @@
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from karpenter_ai_agent.jobs import JobManager, JobQueueFull
+
+
+def test_job_manager_runs_jobs_and_reports_status():
+    manager = JobManager(max_workers=1, max_pending=4)
+    job = manager.submit("demo", lambda job, value: value * 2, 21)
+
+    assert job.wait(5)
+    assert job.status == "succeeded"
+    assert job.result == 42
+    assert manager.get(job.job_id) is job
+    manager.shutdown()
+
+
+def test_job_manager_enforces_capacity_and_cancels_queued_jobs():
+    manager = JobManager(max_workers=1, max_pending=2)
+    gate = threading.Event()
+    running = manager.submit("blocker", lambda job: gate.wait(5))
+    queued = manager.submit("queued", lambda job: "never")
+
+    with pytest.raises(JobQueueFull):
+        manager.submit("overflow", lambda job: None)
+
+    assert manager.cancel(queued.job_id)
+    assert queued.status == "cancelled"
+    gate.set()
+    assert running.wait(5)
+    assert queued.result is None
+    manager.shutdown()
+
+
+def test_running_job_stops_cooperatively_on_cancel():
+    manager = JobManager(max_workers=1, max_pending=2)
+    started = threading.Event()
+
+    def body(job):
+        started.set()
+        while True:
+            job.raise_if_cancelled()
+            job.wait(0.01)
+
+    job = manager.submit("loop", body)
+    assert started.wait(5)
+    assert manager.cancel(job.job_id)
+    assert job.wait(5)
+    assert job.status == "cancelled"
+    manager.shutdown()
+
+
+def test_job_endpoints_expose_status_and_result():
+    job = main.JOBS.submit("demo", lambda job: {"ok": True})
+    assert job.wait(5)
+    client = TestClient(main.app)
+
+    assert client.get(f"/jobs/{job.job_id}").json()["status"] == "succeeded"
+    result = client.get(f"/jobs/{job.job_id}/result")
+    assert result.status_code == 200
+    assert result.json()["result"] == {"ok": True}
+    assert client.post(f"/jobs/{job.job_id}/cancel").json()["cancelled"] is False
+    assert client.get("/jobs/missing").status_code == 404
+
+
+def test_shutdown_cancels_running_and_queued_jobs():
+    manager = JobManager(max_workers=1, max_pending=2)
+    started = threading.Event()
+
+    def body(job):
+        started.set()
+        while True:
+            job.raise_if_cancelled()
+            job.wait(0.01)
+
+    running = manager.submit("loop", body)
+    queued = manager.submit("queued", lambda job: "never")
+    assert started.wait(5)
+
+    manager.shutdown(wait=False)
+
+    assert queued.status == "cancelled"
+    assert running.wait(5)
+    assert running.status == "cancelled"
+
+
+def test_app_shutdown_stops_background_jobs(monkeypatch):
+    manager = JobManager(max_workers=1, max_pending=2)
+    gate = threading.Event()
+    monkeypatch.setattr(main, "JOBS", manager)
+    monkeypatch.setattr(main, "_load_rag_indexes", lambda: None)
+    running = manager.submit("blocker", lambda job: gate.wait(5))
+
+    with TestClient(main.app):
+        pass
+
+    assert running.cancel_requested
+    gate.set()
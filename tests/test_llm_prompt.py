@@ -0,0 +1,94 @@
+import json as json_lib
+
+from karpenter_ai_agent.llm.prompt import build_summary_prompt, estimate_tokens, group_issues
+from karpenter_ai_agent.metrics import METRICS
+from llm_client import SYSTEM_PROMPT, call_free_model
+from models import Issue, IssueExplanation
+
+
+def _issue(name: str, severity: str = "high", message: str = "Spot instances are not enabled.") -> Issue:
+    return Issue(
+        severity=severity,
+        category="Cost Optimization",
+        message=message,
+        recommendation="Enable Spot capacity type.",
+        provisioner_name=name,
+        resource_name=name,
+        patch_snippet="spec:\n  requirements: []\n",
+        explanation=IssueExplanation(why_matters="Costs more."),
+    )
+
+
+def _summary() -> dict:
+    return {"issues_by_severity": {"high": 2, "medium": 0, "low": 1}, "health_score": 80}
+
+
+def test_group_issues_merges_resources_and_drops_unused_fields():
+    groups = group_issues([_issue("a"), _issue("b"), _issue("c", "low", "TTL too high.")])
+
+    assert len(groups) == 2
+    assert groups[0]["resources"] == ["a", "b"]
+    assert groups[1]["severity"] == "low"
+    for group in groups:
+        assert "patch_snippet" not in group
+        assert "explanation" not in group
+        assert "provisioner_name" not in group
+
+
+def test_build_summary_prompt_is_compact():
+    prompt = build_summary_prompt(
+        "us-east-1",
+        _summary(),
+        [_issue("a"), _issue("b")],
+        system_prompt=SYSTEM_PROMPT,
+    )
+
+    assert "\n" not in prompt.user
+    payload = json_lib.loads(prompt.user)
+    assert payload["issues"][0]["resources"] == ["a", "b"]
+    assert prompt.input_tokens == estimate_tokens(SYSTEM_PROMPT) + estimate_tokens(prompt.user)
+    assert not prompt.compacted
+
+
+def test_build_summary_prompt_degrades_under_token_ceiling():
+    issues = [
+        _issue(f"pool-{index}", "low", f"Low finding number {index} with a long message.")
+        for index in range(200)
+    ] + [_issue("critical-pool")]
+
+    budget = estimate_tokens(SYSTEM_PROMPT) + 400
+    prompt = build_summary_prompt(
+        "us-east-1",
+        _summary(),
+        issues,
+        system_prompt=SYSTEM_PROMPT,
+        max_input_tokens=budget,
+    )
+
+    payload = json_lib.loads(prompt.user)
+    assert prompt.compacted
+    assert prompt.input_tokens <= budget
+    assert payload["issues"][0]["resources"] == ["critical-pool"]
+    assert payload["omitted_issues"]["low"] == prompt.omitted_issues["low"] > 0
+    assert payload["summary"] == _summary()
+
+
+def test_call_free_model_records_input_tokens(monkeypatch):
+    monkeypatch.setenv("GROQ_API_KEY", "test-key")
+    METRICS.reset()
+
+    def fake_post(url, json=None, headers=None, timeout=None):
+        content = json["messages"][1]["content"]
+        assert "patch_snippet" not in content
+        class FakeResponse:
+            status_code = 200
+            def json(self):
+                return {"choices": [{"message": {"content": "Overall fine."}}]}
+        return FakeResponse()
+
+    monkeypatch.setattr("llm_client.requests.post", fake_post)
+
+    result = call_free_model("us-east-1", _summary(), [_issue("a")])
+
+    assert result == "Overall fine."
+    assert METRICS.observation("llm.summary.input_tokens")["count"] == 1
@@ -0,0 +1,156 @@
+import pytest
+import requests
+
+import llm_client
+from karpenter_ai_agent.llm.resilience import (
+    BackoffPolicy,
+    CircuitBreaker,
+    Deadline,
+    LLMUnavailable,
+    post_with_retries,
+)
+
+
+class FakeResponse:
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.text = ""
+
+    def json(self):
+        return {"choices": [{"message": {"content": "Recovered."}}]}
+
+
+def _scripted_post(statuses):
+    calls = []
+
+    def fake_post(url, json=None, headers=None, timeout=None):
+        calls.append(timeout)
+        status = statuses[min(len(calls) - 1, len(statuses) - 1)]
+        if isinstance(status, Exception):
+            raise status
+        return FakeResponse(status)
+
+    return fake_post, calls
+
+
+def test_retries_429_and_5xx_with_backoff_then_succeeds():
+    post, calls = _scripted_post([429, 503, 200])
+    sleeps = []
+
+    response = post_with_retries(
+        "http://llm.test",
+        json={},
+        headers={},
+        timeout_cap=10,
+        policy=BackoffPolicy(max_attempts=3, base_delay=0.5, max_delay=1.0),
+        post=post,
+        sleep=sleeps.append,
+    )
+
+    assert response.status_code == 200
+    assert len(calls) == 3
+    assert len(sleeps) == 2
+    assert all(0.0 <= delay <= 1.0 for delay in sleeps)
+
+
+def test_non_retryable_status_is_returned_immediately():
+    post, calls = _scripted_post([401])
+
+    response = post_with_retries(
+        "http://llm.test", json={}, headers={}, timeout_cap=10, post=post, sleep=lambda _: None
+    )
+
+    assert response.status_code == 401
+    assert len(calls) == 1
+
+
+def test_deadline_bounds_attempt_timeout_and_stops_retries(monkeypatch):
+    monkeypatch.setattr("karpenter_ai_agent.llm.resilience.random.uniform", lambda low, high: high)
+    post, calls = _scripted_post([503])
+    deadline = Deadline.after(0.2)
+
+    with pytest.raises(LLMUnavailable):
+        post_with_retries(
+            "http://llm.test",
+            json={},
+            headers={},
+            timeout_cap=60,
+            deadline=Deadline.after(0),
+            post=post,
+        )
+    assert calls == []
+
+    response = post_with_retries(
+        "http://llm.test",
+        json={},
+        headers={},
+        timeout_cap=60,
+        deadline=deadline,
+        policy=BackoffPolicy(max_attempts=5, base_delay=10.0, max_delay=10.0),
+        post=post,
+        sleep=lambda _: pytest.fail("should not sleep past the deadline"),
+    )
+    assert response.status_code == 503
+    assert len(calls) == 1
+    assert calls[0] <= 0.2
+
+
+def test_circuit_breaker_opens_and_short_circuits():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+    post, calls = _scripted_post([requests.exceptions.ConnectionError("down")])
+
+    with pytest.raises(LLMUnavailable):
+        post_with_retries(
+            "http://llm.test",
+            json={},
+            headers={},
+            timeout_cap=10,
+            breaker=breaker,
+            policy=BackoffPolicy(max_attempts=3, base_delay=0.0, max_delay=0.0),
+            post=post,
+            sleep=lambda _: None,
+        )
+
+    assert breaker.is_open
+    assert len(calls) == 2
+
+
+def test_circuit_breaker_half_open_probe_closes_on_success():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    breaker.record_failure()
+
+    assert breaker.state == "half_open"
+    assert breaker.allow() is True
+    assert breaker.allow() is False
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+
+def test_call_free_model_skips_provider_while_circuit_open(monkeypatch):
+    monkeypatch.setenv("GROQ_API_KEY", "test-key")
+    monkeypatch.setattr(llm_client, "LLM_BREAKER", CircuitBreaker(failure_threshold=1, reset_timeout=60))
+    llm_client.LLM_BREAKER.record_failure()
+
+    def fail_post(*args, **kwargs):  # noqa: ANN002, ANN003
+        raise AssertionError("provider should not be called")
+
+    monkeypatch.setattr("llm_client.requests.post", fail_post)
+
+    result = llm_client.call_free_model("us-east-1", {}, [])
+
+    assert result == llm_client.LLM_UNAVAILABLE_MESSAGE
+    assert llm_client.is_llm_available() is False
+
+
+def test_failed_half_open_probe_reopens_on_non_retryable_error():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    breaker.record_failure()
+    post, calls = _scripted_post([requests.exceptions.ChunkedEncodingError("cut")])
+
+    with pytest.raises(requests.exceptions.ChunkedEncodingError):
+        post_with_retries("http://llm.test", json={}, headers={}, timeout_cap=10, breaker=breaker, post=post)
+
+    assert len(calls) == 1
+    # The probe slot is released, so the next call may probe again.
+    assert [breaker.allow(), breaker.allow()] == [True, False]
@@ -0,0 +1,99 @@
+import pytest
+
+import llm_client
+from karpenter_ai_agent.llm.cassette import Cassette
+from karpenter_ai_agent.llm.resilience import CircuitBreaker
+from karpenter_ai_agent.llm.stub_server import StubConfig, StubLLMServer
+from karpenter_ai_agent.rag.models import RetrievedChunk
+from models import Issue
+
+
+def _issue() -> Issue:
+    return Issue(
+        severity="high",
+        category="Cost Optimization",
+        message="Spot instances are not enabled for this provisioner.",
+        recommendation="Enable Spot capacity type.",
+        provisioner_name="default",
+        resource_name="default",
+    )
+
+
+def _summary() -> dict:
+    return {"issues_by_severity": {"high": 1, "medium": 0, "low": 0}, "health_score": 92}
+
+
+@pytest.fixture
+def point_at(monkeypatch):
+    monkeypatch.setenv("GROQ_API_KEY", "stub-key")
+    monkeypatch.setattr(llm_client, "LLM_BREAKER", CircuitBreaker())
+
+    def _point(server: StubLLMServer) -> None:
+        monkeypatch.setenv("LLM_BASE_URL", server.base_url)
+
+    return _point
+
+
+def test_summary_and_stream_use_configured_base_url(point_at):
+    with StubLLMServer() as server:
+        point_at(server)
+        text = llm_client.call_free_model("us-east-1", _summary(), [_issue()])
+        streamed = "".join(llm_client.stream_free_model("us-east-1", _summary(), [_issue()]))
+
+    assert "High severity issues:" in text
+    assert "- Spot instances are not enabled for this provisioner. (default)" in text
+    assert llm_client._sanitize_ai_text(streamed) == text
+    assert server.request_count == 2
+
+
+def test_explanation_path_against_stub(point_at):
+    chunk = RetrievedChunk(
+        chunk_id="doc-0",
+        doc_id="spot",
+        title="Spot",
+        source_url="https://karpenter.sh/docs/concepts/disruption/",
+        text="Spot capacity lowers cost.",
+        score=0.8,
+    )
+    with StubLLMServer() as server:
+        point_at(server)
+        explanation = llm_client.generate_issue_explanation(_issue(), [chunk])
+
+    assert explanation is not None
+    assert explanation.what_to_change == ["Enable Spot capacity type."]
+
+
+def test_injected_errors_are_retried(point_at, monkeypatch):
+    monkeypatch.setattr("karpenter_ai_agent.llm.resilience.time.sleep", lambda _: None)
+    with StubLLMServer(config=StubConfig(error_rate=1.0, seed=1)) as server:
+        point_at(server)
+        text = llm_client.call_free_model("us-east-1", _summary(), [_issue()])
+
+    assert text.startswith("HTTP 503")
+    assert server.request_count == 3
+
+
+def test_record_then_replay_cassette(point_at, tmp_path):
+    cassette_path = tmp_path / "llm.json"
+    with StubLLMServer() as upstream:
+        recorder = StubLLMServer(
+            config=StubConfig(
+                mode="record",
+                cassette=Cassette.load(cassette_path),
+                upstream_url=upstream.base_url,
+            )
+        )
+        with recorder:
+            point_at(recorder)
+            recorded = llm_client.call_free_model("us-east-1", _summary(), [_issue()])
+
+    assert len(Cassette.load(cassette_path)) == 1
+
+    replay = StubConfig(mode="replay", cassette=Cassette.load(cassette_path))
+    with StubLLMServer(config=replay) as server:
+        point_at(server)
+        replayed = llm_client.call_free_model("us-east-1", _summary(), [_issue()])
+        missing = llm_client.call_free_model("eu-west-1", _summary(), [_issue()])
+
+    assert replayed == recorded
+    assert missing.startswith("HTTP 404")
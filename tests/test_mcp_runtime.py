@@ -0,0 +1,228 @@
+import asyncio
+import time
+
+import pytest
+
+from karpenter_ai_agent.mcp.cache import ToolResultCache, input_fingerprint
+from karpenter_ai_agent.mcp.runtime import LocalMCPClient, ToolRegistry, ToolSpec
+from karpenter_ai_agent.mcp.schemas import (
+    EstimateCostSignalsInput,
+    EstimateCostSignalsOutput,
+    RetrieveKarpenterDocsInput,
+    RetrieveKarpenterDocsOutput,
+)
+from karpenter_ai_agent.mcp.tools import (
+    cost_signals_key,
+    create_registry,
+    estimate_cost_signals,
+    karpenter_docs_key,
+)
+from karpenter_ai_agent.metrics import MetricsRegistry
+from karpenter_ai_agent.models import CanonicalConfig, CanonicalProvisioner
+
+
+def _registry(seen):
+    def handler(payload):
+        seen.append(payload)
+        return estimate_cost_signals(payload)
+
+    registry = ToolRegistry(metrics=MetricsRegistry())
+    registry.register(
+        ToolSpec(
+            name="estimate_cost_signals",
+            input_model=EstimateCostSignalsInput,
+            output_model=EstimateCostSignalsOutput,
+            handler=handler,
+        )
+    )
+    return registry
+
+
+def test_trusted_client_passes_typed_input_through():
+    seen = []
+    registry = _registry(seen)
+    payload = EstimateCostSignalsInput(config=CanonicalConfig(), region="us-east-1")
+
+    result = LocalMCPClient(registry, trusted=True).call("estimate_cost_signals", payload)
+
+    assert result.signals["total_provisioners"] == 0
+    assert seen[0] is payload
+    stats = registry.stats()["estimate_cost_signals"]
+    assert stats["calls"] == 1 and stats["trusted_calls"] == 1
+    assert stats["latency_ms"]["count"] == 1
+    assert stats["payload_bytes"] == {}
+    # No payload_size on this spec: the estimate is the length of its string fields.
+    assert stats["payload_size"]["count"] == 1 and stats["payload_size"]["max"] == len("us-east-1")
+
+
+def test_untrusted_client_validates_and_measures_payload():
+    seen = []
+    registry = _registry(seen)
+    client = LocalMCPClient(registry)
+    payload = EstimateCostSignalsInput(config=CanonicalConfig())
+
+    client.call("estimate_cost_signals", payload)
+    client.call("estimate_cost_signals", {"config": {}, "monthly_spend": 10})
+
+    assert seen[0] is not payload
+    stats = registry.stats()["estimate_cost_signals"]
+    assert stats["calls"] == 2 and stats["trusted_calls"] == 0
+    assert stats["payload_bytes"]["count"] == 2 and stats["payload_bytes"]["min"] > 0
+
+    with pytest.raises(ValueError, match="Invalid input"):
+        client.call("estimate_cost_signals", {"config": {"provisioners": "nope"}})
+    assert registry.stats()["estimate_cost_signals"]["errors"] == 1
+
+
+def test_cacheable_tool_returns_memoized_result():
+    registry = create_registry(["validate_yaml_schema"], metrics=MetricsRegistry())
+    client = LocalMCPClient(registry)
+    yaml_text = "kind: NodePool\nmetadata:\n  name: default\n"
+
+    first = client.call("validate_yaml_schema", {"yaml_text": yaml_text})
+    second = client.call("validate_yaml_schema", {"yaml_text": yaml_text})
+    other = client.call("validate_yaml_schema", {"yaml_text": "kind: ["})
+
+    assert second is first
+    assert other.valid is False
+    stats = registry.stats()["validate_yaml_schema"]
+    assert (stats["cache_hits"], stats["cache_misses"]) == (1, 2)
+
+
+def test_cost_signals_are_cached_per_region_and_spend():
+    registry = create_registry(["estimate_cost_signals"], metrics=MetricsRegistry())
+    client = LocalMCPClient(registry, trusted=True)
+
+    def call(region, spend):
+        payload = EstimateCostSignalsInput(config=CanonicalConfig(), region=region, monthly_spend=spend)
+        return client.call("estimate_cost_signals", payload)
+
+    first = call("us-east-1", 1000.0)
+    assert call("us-east-1", 1000.0) is first
+    assert call("eu-west-1", 1000.0) is not first
+    assert call("us-east-1", 2000.0) is not first
+    stats = registry.stats()["estimate_cost_signals"]
+    assert (stats["cache_hits"], stats["cache_misses"]) == (1, 3)
+
+
+def test_cost_signals_key_covers_only_the_fields_the_tool_reads(monkeypatch):
+    def payload(**changes):
+        fields = dict(name="default", kind="NodePool", spot_allowed=False, graviton_used=False, raw_yaml={})
+        fields.update(changes)
+        return EstimateCostSignalsInput(config=CanonicalConfig(provisioners=[CanonicalProvisioner(**fields)]))
+
+    base = cost_signals_key(payload())
+    assert cost_signals_key(payload(raw_yaml={"spec": {"x": 1}}, ttl_seconds_after_empty=30)) == base
+    assert cost_signals_key(payload(spot_allowed=True)) != base
+    assert cost_signals_key(payload(instance_families=["m5"])) != base
+
+    # Trusted agent calls must not pay for a full dump of the config.
+    monkeypatch.setattr("karpenter_ai_agent.mcp.runtime.input_fingerprint", lambda _: pytest.fail("full fingerprint"))
+    client = LocalMCPClient(create_registry(["estimate_cost_signals"], metrics=MetricsRegistry()), trusted=True)
+    assert client.call("estimate_cost_signals", payload()) is client.call("estimate_cost_signals", payload())
+
+
+def test_docs_key_changes_with_the_index_version(monkeypatch):
+    from types import SimpleNamespace
+
+    payload = RetrieveKarpenterDocsInput(query="spot")
+    monkeypatch.setattr("karpenter_ai_agent.mcp.tools.get_default_index", lambda: SimpleNamespace(version="a"))
+    before = karpenter_docs_key(payload)
+    assert karpenter_docs_key(RetrieveKarpenterDocsInput(query="spot")) == before
+    monkeypatch.setattr("karpenter_ai_agent.mcp.tools.get_default_index", lambda: SimpleNamespace(version="b"))
+    assert karpenter_docs_key(payload) != before
+
+
+def test_tool_result_cache_expires_and_evicts():
+    now = [0.0]
+    cache = ToolResultCache(max_entries=2, ttl_seconds=10, clock=lambda: now[0])
+    value = EstimateCostSignalsOutput()
+    cache.put("a", value)
+    cache.put("b", value)
+    cache.put("c", value)
+
+    assert cache.get("a") is None and cache.get("c") is value
+    now[0] = 10.0
+    assert cache.get("c") is None
+    assert input_fingerprint(EstimateCostSignalsInput(config=CanonicalConfig(), region="x")) == input_fingerprint(
+        EstimateCostSignalsInput.model_validate({"region": "x", "config": {}})
+    )
+
+
+def _async_registry(delays):
+    async def retrieve(payload):
+        await asyncio.sleep(delays.get(payload.query, 0))
+        return RetrieveKarpenterDocsOutput(chunks=[])
+
+    registry = ToolRegistry(metrics=MetricsRegistry())
+    registry.register(
+        ToolSpec(
+            name="retrieve_karpenter_docs",
+            input_model=RetrieveKarpenterDocsInput,
+            output_model=RetrieveKarpenterDocsOutput,
+            handler=retrieve,
+        )
+    )
+    return registry
+
+
+def test_call_many_overlaps_async_calls_and_times_out_individually():
+    registry = _async_registry({"a": 0.2, "b": 0.2, "c": 0.2, "slow": 5})
+    client = LocalMCPClient(registry)
+    calls = [("retrieve_karpenter_docs", {"query": query}) for query in ("a", "b", "c", "slow")]
+
+    started = time.perf_counter()
+    results = client.call_many(calls, timeout=0.5)
+    elapsed = time.perf_counter() - started
+
+    assert elapsed < 1.0
+    assert all(isinstance(result, RetrieveKarpenterDocsOutput) for result in results[:3])
+    assert isinstance(results[3], TimeoutError)
+    assert registry.stats()["retrieve_karpenter_docs"]["timeouts"] == 1
+    # Sync ``call`` also accepts coroutine handlers.
+    assert client.call("retrieve_karpenter_docs", {"query": "a"}).chunks == []
+
+
+def test_handler_timeouts_are_not_tool_timeouts_and_sync_calls_refuse_a_running_loop():
+    async def retrieve(payload):
+        raise TimeoutError("upstream timed out")
+
+    registry = ToolRegistry(metrics=MetricsRegistry())
+    registry.register(
+        ToolSpec(
+            name="retrieve_karpenter_docs",
+            input_model=RetrieveKarpenterDocsInput,
+            output_model=RetrieveKarpenterDocsOutput,
+            handler=retrieve,
+        )
+    )
+    client = LocalMCPClient(registry)
+
+    async def scenario():
+        with pytest.raises(TimeoutError, match="upstream"):
+            await client.acall("retrieve_karpenter_docs", {"query": "a"}, timeout=5)
+        with pytest.raises(RuntimeError, match="acall"):
+            client.call_many([("retrieve_karpenter_docs", {"query": "a"})])
+
+    asyncio.run(scenario())
+    stats = registry.stats()["retrieve_karpenter_docs"]
+    assert stats["timeouts"] == 0 and stats["errors"] == 1
+
+
+def test_acall_runs_sync_handlers_off_the_loop():
+    registry = create_registry(["validate_yaml_schema", "explain_recommendation"], metrics=MetricsRegistry())
+    client = LocalMCPClient(registry)
+
+    async def scenario():
+        return await client.acall_many(
+            [
+                ("validate_yaml_schema", {"yaml_text": "kind: NodePool\n"}),
+                ("explain_recommendation", {"rule_id": "cost:x"}),
+                ("explain_recommendation", {}),
+            ]
+        )
+
+    valid, explanation, invalid = asyncio.run(scenario())
+    assert valid.valid is True
+    assert "cost:x" in explanation.explanation
+    assert isinstance(invalid, ValueError)
@@ -0,0 +1,193 @@
+import asyncio
+import json
+import socket
+
+import pytest
+
+from karpenter_ai_agent.mcp.server import MCPServer, create_server_registry
+
+
+def _request(request_id, method, params=None):
+    message = {"jsonrpc": "2.0", "id": request_id, "method": method}
+    if params is not None:
+        message["params"] = params
+    return message
+
+
+def _handle(server, message):
+    raw = message if isinstance(message, bytes) else json.dumps(message).encode()
+    data = asyncio.run(server.handle_line(raw))
+    return None if data is None else json.loads(data)
+
+
+def test_server_lists_and_calls_tools():
+    server = MCPServer(create_server_registry(), max_workers=2)
+    try:
+        listed = _handle(server, _request(1, "tools/list"))["result"]["tools"]
+        assert {"validate_yaml_schema", "retrieve_karpenter_docs", "analyze_karpenter_yaml"} <= {
+            tool["name"] for tool in listed
+        }
+
+        response = _handle(
+            server, _request(2, "tools/call", {"name": "validate_yaml_schema", "arguments": {"yaml_text": "kind: ["}})
+        )
+        assert response["id"] == 2
+        assert response["result"]["structuredContent"]["valid"] is False
+
+        invalid = _handle(server, _request(3, "tools/call", {"name": "retrieve_karpenter_docs", "arguments": {}}))
+        assert invalid["result"]["isError"] is True
+        assert _handle(server, _request(4, "tools/call", {"name": "nope"}))["error"]["code"] == -32602
+        assert _handle(server, _request(6, "tools/call", ["validate_yaml_schema"]))["error"]["code"] == -32602
+        assert _handle(server, _request(5, "nope"))["error"]["code"] == -32601
+        assert _handle(server, {"jsonrpc": "2.0", "method": "notifications/initialized"}) is None
+        assert _handle(server, b"{not json")["error"]["code"] == -32700
+    finally:
+        server.close()
+
+
+def test_server_answers_batches_in_one_array():
+    server = MCPServer(create_server_registry(), max_workers=2)
+    try:
+        batch = [
+            _request(1, "ping"),
+            {"jsonrpc": "2.0", "method": "notifications/initialized"},
+            _request(2, "tools/call", {"name": "explain_recommendation", "arguments": {"rule_id": "cost:x"}}),
+        ]
+        responses = _handle(server, batch)
+        assert [response["id"] for response in responses] == [1, 2]
+        assert "cost:x" in responses[1]["result"]["structuredContent"]["explanation"]
+    finally:
+        server.close()
+
+
+@pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="needs Unix sockets")
+def test_unix_socket_serves_concurrent_requests(tmp_path):
+    path = tmp_path / "mcp.sock"
+    server = MCPServer(create_server_registry(), max_workers=2)
+
+    async def scenario():
+        serving = asyncio.create_task(server.serve_unix(path))
+        while not path.exists():
+            await asyncio.sleep(0.01)
+        reader, writer = await asyncio.open_unix_connection(str(path))
+        for request_id in (1, 2):
+            call = _request(request_id, "tools/call", {"name": "retrieve_karpenter_docs", "arguments": {"query": "spot"}})
+            writer.write(json.dumps(call).encode() + b"\n")
+        await writer.drain()
+        responses = [json.loads(await reader.readline()) for _ in range(2)]
+        writer.close()
+        serving.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await serving
+        return responses
+
+    try:
+        responses = asyncio.run(scenario())
+    finally:
+        server.close()
+    assert sorted(response["id"] for response in responses) == [1, 2]
+    assert all(response["result"]["structuredContent"]["chunks"] for response in responses)
+    assert not path.exists()
+
+
+def test_serve_stops_reading_while_max_pending_messages_are_handled():
+    from pydantic import BaseModel
+
+    from karpenter_ai_agent.mcp.runtime import ToolRegistry, ToolSpec
+
+    class Empty(BaseModel):
+        pass
+
+    class LineReader:
+        def __init__(self, lines):
+            self.lines = list(lines)
+            self.read = 0
+
+        async def readline(self):
+            if not self.lines:
+                return b""
+            self.read += 1
+            return self.lines.pop(0)
+
+    async def scenario():
+        release = asyncio.Event()
+
+        async def slow(payload):
+            await release.wait()
+            return Empty()
+
+        registry = ToolRegistry()
+        registry.register(ToolSpec(name="slow", input_model=Empty, output_model=Empty, handler=slow))
+        server = MCPServer(registry, max_workers=1, max_pending=2)
+        calls = [json.dumps(_request(i, "tools/call", {"name": "slow"})).encode() + b"\n" for i in range(5)]
+        reader = LineReader(calls)
+        sent = []
+
+        async def send(data):
+            sent.append(json.loads(data))
+
+        serving = asyncio.create_task(server.serve(reader, send))
+        await asyncio.sleep(0.05)
+        read_while_blocked = reader.read
+        release.set()
+        await serving
+        server.close()
+        return read_while_blocked, sent
+
+    read_while_blocked, sent = asyncio.run(scenario())
+    assert read_while_blocked == 2
+    assert sorted(response["id"] for response in sent) == list(range(5))
+
+
+def test_a_busy_connection_does_not_stop_others_being_read():
+    from pydantic import BaseModel
+
+    from karpenter_ai_agent.mcp.runtime import ToolRegistry, ToolSpec
+
+    class Empty(BaseModel):
+        pass
+
+    async def scenario():
+        release = asyncio.Event()
+
+        async def slow(payload):
+            await release.wait()
+            return Empty()
+
+        registry = ToolRegistry()
+        registry.register(ToolSpec(name="slow", input_model=Empty, output_model=Empty, handler=slow))
+        server = MCPServer(registry, max_workers=1, max_pending=2)
+        busy, idle = asyncio.StreamReader(), asyncio.StreamReader()
+        for i in range(3):
+            busy.feed_data(json.dumps(_request(i, "tools/call", {"name": "slow"})).encode() + b"\n")
+        idle.feed_data(json.dumps(_request(9, "ping")).encode() + b"\n")
+        busy.feed_eof()
+        idle.feed_eof()
+        sent = []
+
+        async def send(data):
+            sent.append(json.loads(data)["id"])
+
+        serving = asyncio.gather(server.serve(busy, send), server.serve(idle, send))
+        await asyncio.sleep(0.05)
+        answered_while_busy = list(sent)
+        release.set()
+        await serving
+        server.close()
+        return answered_while_busy, sent
+
+    answered_while_busy, sent = asyncio.run(scenario())
+    assert answered_while_busy == [9]
+    assert sorted(sent) == [0, 1, 2, 9]
+
+
+def test_unix_socket_refuses_to_replace_a_regular_file(tmp_path):
+    path = tmp_path / "notes.txt"
+    path.write_text("keep me")
+    server = MCPServer(create_server_registry(), max_workers=1)
+    try:
+        with pytest.raises(FileExistsError):
+            asyncio.run(server.serve_unix(path))
+    finally:
+        server.close()
+    assert path.read_text() == "keep me"
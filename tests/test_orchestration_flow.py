@@ -50,3 +50,22 @@ def test_orchestration_flow_flags_missing_nodeclass():
 
     rule_ids = {issue.rule_id for issue in report.issues}
     assert "security:missing-nodeclass" in rule_ids
+
+
+def test_query_cache_hit_rate_covers_only_this_run():
+    from karpenter_ai_agent.rag.cache import default_query_cache
+
+    yaml_text = (FIXTURES / "basic-karpenter.yaml").read_text()
+    analysis_input = AnalysisInput(
+        yaml_text=yaml_text,
+        region="us-east-1",
+        options={"enable_explanations": True, "enable_evaluator": True},
+    )
+    default_query_cache().clear()
+
+    first = run_analysis_graph(analysis_input)
+    second = run_analysis_graph(analysis_input)
+
+    assert first.raw["rag_query_cache_hit_rate"] == 0.0
+    assert second.raw["rag_query_cache_hit_rate"] == 1.0
+    assert default_query_cache().hit_rate < 1.0
@@ -0,0 +1,74 @@
+import pytest
+
+from karpenter_ai_agent.agents import CostAgent
+from karpenter_ai_agent.models import CanonicalConfig, CanonicalProvisioner
+from karpenter_ai_agent.pricing import estimate_savings, get_price_table, vectorized_available
+
+
+def _pool(name, families=(), spot=False, graviton=False):
+    return CanonicalProvisioner(
+        name=name,
+        kind="NodePool",
+        spot_allowed=spot,
+        graviton_used=graviton,
+        instance_families=list(families),
+        raw_yaml={},
+    )
+
+
+def test_price_table_resolves_regions_and_graviton_equivalents():
+    table = get_price_table()
+
+    assert table.get("m5.xlarge").graviton_equivalent == "m6g.xlarge"
+    assert table.get("m7g.large").graviton_equivalent is None
+    assert table.on_demand_hourly("m5.large", "eu-central-1") > table.on_demand_hourly("m5.large", "us-east-1")
+    assert table.resolve_region(None)[0] == "us-east-1"
+    assert table.resolve_region("mars-1")[2] is False
+    assert all(table.instances[i].arch == "amd64" for i in table.eligible([]))
+
+
+def test_savings_are_ranked_and_split_monthly_spend():
+    pools = [
+        _pool("small", ["t3"], graviton=False),
+        _pool("big", ["r5", "m5"]),
+        _pool("arm", ["m7g"], spot=True, graviton=True),
+        _pool("exotic", ["x2iedn"]),
+    ]
+
+    result = estimate_savings(pools, region="us-east-1", monthly_spend=40000)
+
+    assert result["savings_basis"] == "monthly_spend"
+    ranked = result["estimated_savings"]
+    assert [e["monthly_savings_usd"] for e in ranked] == sorted((e["monthly_savings_usd"] for e in ranked), reverse=True)
+    assert {(e["nodepool"], e["finding"]) for e in ranked} == {
+        ("small", "spot"),
+        ("small", "graviton"),
+        ("big", "spot"),
+        ("big", "graviton"),
+    }
+    big_spot = next(e for e in ranked if e["nodepool"] == "big" and e["finding"] == "spot")
+    assert big_spot["monthly_savings_usd"] == pytest.approx(10000 * big_spot["savings_percent"] / 100, rel=1e-2)
+    assert result["unpriced_nodepools"] == ["exotic"]
+    assert 0 < result["estimated_monthly_savings_usd"] < sum(e["monthly_savings_usd"] for e in ranked)
+
+
+@pytest.mark.skipif(not vectorized_available(), reason="numpy not installed")
+def test_vectorized_and_pure_python_estimates_agree():
+    families = [[], ["m5"], ["c6i", "c7g"], ["r5", "r6i", "t3"], ["nope"]]
+    pools = [_pool(f"p{i}", families[i % len(families)], spot=i % 3 == 0) for i in range(500)]
+
+    fast = estimate_savings(pools, region="eu-west-1", vectorized=True)
+    slow = estimate_savings(pools, region="eu-west-1", vectorized=False)
+
+    assert fast == slow
+    assert fast["savings_basis"] == "per_node"
+
+
+def test_cost_agent_attaches_savings_to_findings():
+    config = CanonicalConfig(provisioners=[_pool("default", ["m5"])])
+
+    result = CostAgent().run(config, region="us-west-2", monthly_spend=1000)
+
+    assert {issue.metadata["estimated_monthly_savings_usd"] > 0 for issue in result.issues} == {True}
+    assert result.signals["region"] == "us-west-2"
+    assert len(result.signals["estimated_savings"]) == 2
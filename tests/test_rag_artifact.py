@@ -0,0 +1,127 @@
+from karpenter_ai_agent.rag.artifact import open_artifact
+from karpenter_ai_agent.rag.store import DEFAULT_KNOWLEDGE_PATH, KnowledgeStore, _tokenize
+
+QUERIES = ["instanceProfile", "subnet selectors", "spot interruption", "consolidation policy"]
+
+
+def _write_docs(path, body):
+    path.mkdir()
+    (path / "spot.md").write_text(f"# Spot\nSource: https://example.test/spot\n\n{body}\n", encoding="utf-8")
+    (path / "subnets.md").write_text(
+        "# Subnets\nSource: https://example.test/subnets\n\nSubnet selectors pick subnets.\n",
+        encoding="utf-8",
+    )
+
+
+def test_prebuilt_store_matches_in_memory_store(tmp_path):
+    in_memory = KnowledgeStore.load(DEFAULT_KNOWLEDGE_PATH)
+    KnowledgeStore.load_prebuilt(DEFAULT_KNOWLEDGE_PATH, directory=tmp_path)
+    mapped = KnowledgeStore.load_prebuilt(DEFAULT_KNOWLEDGE_PATH, directory=tmp_path)
+
+    assert (tmp_path / "knowledge.idx").exists()
+    assert not isinstance(mapped.chunks, list)
+    assert len(mapped.chunks) == len(in_memory.chunks)
+    assert mapped.chunks[-1] == in_memory.chunks[-1]
+    for query in QUERIES:
+        assert mapped.search(query, top_k=3) == in_memory.search(query, top_k=3)
+
+
+def test_artifact_rebuilds_when_sources_change(tmp_path):
+    docs = tmp_path / "docs"
+    index_dir = tmp_path / "index"
+    _write_docs(docs, "Spot capacity lowers cost.")
+    first = KnowledgeStore.load_prebuilt(docs, directory=index_dir)
+    assert first.search("graviton", top_k=1) == []
+
+    (docs / "spot.md").write_text("# Spot\n\nGraviton and Spot together.\n", encoding="utf-8")
+    second = KnowledgeStore.load_prebuilt(docs, directory=index_dir)
+
+    assert second.search("graviton", top_k=1)[0][0].doc_id == "spot.md"
+    assert open_artifact(index_dir / "knowledge.idx", _tokenize) is not None
+
+
+def test_corrupt_artifact_is_replaced(tmp_path):
+    docs = tmp_path / "docs"
+    _write_docs(docs, "Spot capacity lowers cost.")
+    (tmp_path / "knowledge.idx").write_bytes(b"not an index")
+
+    store = KnowledgeStore.load_prebuilt(docs, directory=tmp_path)
+
+    assert store.search("spot", top_k=1)[0][0].doc_id == "spot.md"
+    assert (tmp_path / "knowledge.idx").read_bytes()[:8] == b"KRAGIDX1"
+
+
+def test_batched_scoring_uses_zero_copy_views_of_the_artifact(tmp_path):
+    import pytest
+
+    pytest.importorskip("scipy")
+    from karpenter_ai_agent.rag.sparse import SparseScorer
+
+    in_memory = KnowledgeStore.load(DEFAULT_KNOWLEDGE_PATH)
+    KnowledgeStore.load_prebuilt(DEFAULT_KNOWLEDGE_PATH, directory=tmp_path)
+    mapped = KnowledgeStore.load_prebuilt(DEFAULT_KNOWLEDGE_PATH, directory=tmp_path)
+
+    matrix = SparseScorer.from_postings(mapped.engine.postings, mapped.engine.size).matrix
+    for array in (matrix.data, matrix.indices):
+        # Read-only and not owned: a view into the shared read-only mapping.
+        assert not array.flags.owndata and not array.flags.writeable
+    mapped.engine.cache = in_memory.engine.cache = None
+    assert mapped.search_many(QUERIES, top_k=3) == in_memory.search_many(QUERIES, top_k=3)
+
+
+def test_process_memory_reports_resident_set():
+    from karpenter_ai_agent.metrics import process_memory
+
+    assert process_memory()["rss"] > 0
+
+
+def test_dense_vectors_are_mapped_from_the_artifact(tmp_path):
+    import pytest
+
+    pytest.importorskip("numpy")
+    from karpenter_ai_agent.rag.index import InMemoryVectorIndex
+    from karpenter_ai_agent.rag.loader import DEFAULT_DOCS_PATH
+
+    in_memory = InMemoryVectorIndex.build(DEFAULT_DOCS_PATH).with_dense("hybrid")
+    InMemoryVectorIndex.build_prebuilt(DEFAULT_DOCS_PATH, directory=tmp_path, mode="hybrid")
+    mapped = InMemoryVectorIndex.build_prebuilt(DEFAULT_DOCS_PATH, directory=tmp_path, mode="hybrid")
+    mapped = mapped.with_dense("hybrid")
+
+    vectors = mapped.dense.vectors
+    assert not vectors.flags.owndata and not vectors.flags.writeable
+    assert (vectors == in_memory.dense.vectors).all()
+    mapped.engine.cache = in_memory.engine.cache = None
+    assert mapped.search_many(QUERIES, top_k=3) == in_memory.search_many(QUERIES, top_k=3)
+
+
+def test_lexical_artifact_has_no_vectors_and_ignores_optional_dependencies(tmp_path, monkeypatch):
+    import mmap
+
+    from karpenter_ai_agent.rag.artifact import _read_header
+    from karpenter_ai_agent.rag.dense import dense_available
+    from karpenter_ai_agent.rag.index import InMemoryVectorIndex
+    from karpenter_ai_agent.rag.loader import DEFAULT_DOCS_PATH
+
+    InMemoryVectorIndex.build_prebuilt(DEFAULT_DOCS_PATH, directory=tmp_path)
+    target = tmp_path / "karpenter.idx"
+    written = target.stat().st_mtime_ns
+    with target.open("rb") as handle, mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+        assert "dense" not in _read_header(buffer)["sections"]
+
+    monkeypatch.setattr("karpenter_ai_agent.rag.index.dense_available", lambda: not dense_available())
+    InMemoryVectorIndex.build_prebuilt(DEFAULT_DOCS_PATH, directory=tmp_path)
+    assert target.stat().st_mtime_ns == written
+
+
+def test_truncated_artifact_is_treated_as_stale(tmp_path):
+    docs = tmp_path / "docs"
+    _write_docs(docs, "Spot capacity lowers cost.")
+    KnowledgeStore.load_prebuilt(docs, directory=tmp_path)
+    target = tmp_path / "knowledge.idx"
+    data = target.read_bytes()
+    target.write_bytes(data[:-16])
+
+    assert open_artifact(target, _tokenize) is None
+    store = KnowledgeStore.load_prebuilt(docs, directory=tmp_path)
+    assert store.search("spot", top_k=1)[0][0].doc_id == "spot.md"
+    assert target.read_bytes() == data
@@ -0,0 +1,81 @@
+import math
+
+import pytest
+
+from karpenter_ai_agent.rag import bm25
+from karpenter_ai_agent.rag.bm25 import BM25Index, bm25_idf
+from karpenter_ai_agent.rag.embedder import tokenize
+
+
+CORPUS = [
+    ("Spot capacity", "Spot capacity lowers cost for interruption tolerant workloads"),
+    ("Consolidation", "Consolidation replaces underutilized nodes to lower cost"),
+    ("Graviton", "Graviton arm64 instances offer better price performance"),
+    ("Subnets", "Subnet selectors choose which subnets nodes launch into"),
+    ("Capacity types", "Spot and on-demand capacity types can be mixed in one nodepool"),
+    ("", ""),
+]
+
+
+def _brute_force(query, top_k, title_weight=2.0, body_weight=1.0, k1=1.2, b=0.75):
+    fields = [(tokenize(title), tokenize(body)) for title, body in CORPUS]
+    lengths = [title_weight * len(t) + body_weight * len(d) for t, d in fields]
+    average = sum(lengths) / len(lengths)
+    df = {}
+    for t, d in fields:
+        for token in set(t) | set(d):
+            df[token] = df.get(token, 0) + 1
+    scored = []
+    for doc, (t, d) in enumerate(fields):
+        score = 0.0
+        for token in tokenize(query):
+            tf = title_weight * t.count(token) + body_weight * d.count(token)
+            if not tf:
+                continue
+            norm = k1 * (1 - b + b * lengths[doc] / average)
+            score += bm25_idf(df[token], len(CORPUS)) * tf * (k1 + 1) / (tf + norm)
+        if score > 0:
+            scored.append((doc, score))
+    scored.sort(key=lambda item: item[1], reverse=True)
+    return scored[:top_k]
+
+
+@pytest.mark.parametrize("use_numpy", [True, False])
+def test_bm25_matches_brute_force(monkeypatch, use_numpy):
+    if use_numpy:
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(bm25, "np", None)
+    index = BM25Index.build(CORPUS, tokenize)
+    index.cache = None
+
+    for query in ("spot capacity", "lower cost nodes", "arm64", "subnets", "spot spot", "unknown"):
+        for top_k in (1, 2, 5):
+            expected = _brute_force(query, top_k)
+            actual = index.search(query, top_k=top_k)
+            assert [doc for doc, _ in actual] == [doc for doc, _ in expected]
+            # Impacts are stored as float32.
+            assert all(math.isclose(a, e, rel_tol=1e-6) for (_, a), (_, e) in zip(actual, expected))
+
+
+def test_bm25_title_weight_boosts_title_matches():
+    corpus = [("Notes", "consolidation consolidation"), ("Consolidation", "notes")]
+    boosted = BM25Index.build(corpus, tokenize, title_weight=3.0)
+    flat = BM25Index.build(corpus, tokenize, title_weight=1.0)
+
+    assert boosted.search("consolidation", top_k=1)[0][0] == 1
+    assert flat.search("consolidation", top_k=1)[0][0] == 0
+    assert boosted.version != flat.version
+
+
+def test_bm25_interns_terms_into_packed_postings():
+    index = BM25Index.build(CORPUS, tokenize)
+    spot = index.vocabulary["spot"]
+
+    start, end = index.term_offsets[spot], index.term_offsets[spot + 1]
+    assert list(index.docs[start:end]) == [0, 4]
+    assert index.docs.typecode == "i" and index.impacts.typecode == "f"
+    assert len(index.term_offsets) == len(index.vocabulary) + 1
+    assert index.search("", top_k=3) == []
+    assert index.search("spot", top_k=0) == []
+    assert index.search_many(["spot", ""], top_k=1) == [index.search("spot", top_k=1), []]
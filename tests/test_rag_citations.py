@@ -0,0 +1,114 @@
+import re
+from pathlib import Path
+
+import pytest
+
+from karpenter_ai_agent.agents import CoordinatorAgent
+from karpenter_ai_agent.metrics import METRICS
+from karpenter_ai_agent.models import AnalysisInput, Issue
+from karpenter_ai_agent.rag.citations import canonical_issues, rule_queries
+from karpenter_ai_agent.rag.index import InMemoryVectorIndex
+from karpenter_ai_agent.rag.tool import build_issue_query, retrieve_issue_contexts
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+# No fixture leaves out the networking selectors.
+BARE_NODECLASS = """
+apiVersion: karpenter.k8s.aws/v1
+kind: EC2NodeClass
+metadata:
+  name: bare
+spec:
+  role: KarpenterNodeRole
+  amiSelectorTerms:
+    - alias: al2023@latest
+"""
+
+
+def _issue(message, resource_name="default"):
+    return Issue(
+        rule_id="security:missing-subnets",
+        severity="high",
+        category="EC2NodeClass – Networking",
+        message=message,
+        recommendation=(
+            "Configure subnetSelectorTerms so nodes are placed into approved subnets for your cluster."
+        ),
+        resource_kind="EC2NodeClass",
+        resource_name=resource_name,
+        metadata={"field": "spec.subnetSelectorTerms"},
+    )
+
+
+def _fixture_issues():
+    manifests = [path.read_text() for path in sorted(FIXTURES.glob("*.yaml")) if path.name != "pod-snapshot.yaml"]
+    return [
+        issue
+        for yaml_text in manifests + [BARE_NODECLASS]
+        for issue in CoordinatorAgent().run(AnalysisInput(yaml_text=yaml_text)).issues
+    ]
+
+
+def _rule_family(issue):
+    # Messages embed quoted resource names and numbers; the rest is fixed per rule.
+    return issue.category, re.sub(r"\d+", "n", re.sub(r"'[^']*'", "name", issue.message))
+
+
+def _same_hits(left, right):
+    assert [(c.source_url, c.title) for c in left] == [(c.source_url, c.title) for c in right]
+    assert [c.score for c in left] == pytest.approx([c.score for c in right])
+
+
+def test_index_build_precomputes_every_rule():
+    index = InMemoryVectorIndex.build()
+    rule_id, query = next(iter(rule_queries().items()))
+
+    assert set(index.engine.precomputed) == set(rule_queries())
+    assert all(index.engine.precomputed.values())
+    assert index.lookup("not-a-rule", query) is None
+    assert index.lookup(rule_id, query, top_k=index.engine.precomputed_top_k + 1) is None
+
+
+def test_lookup_only_applies_when_the_indexed_terms_match():
+    index = InMemoryVectorIndex.build()
+    plain = _issue("EC2NodeClass 'default' does not specify subnets.")
+    # "missing" and "ami" occur in the docs, so this name changes the live ranking input.
+    named = _issue("EC2NodeClass 'missing-ami' does not specify subnets.", resource_name="missing-ami")
+
+    _same_hits(index.lookup(plain.rule_id, build_issue_query(plain)), index.search(build_issue_query(plain)))
+    assert index.lookup(named.rule_id, build_issue_query(named)) is None
+
+
+def test_registered_issues_use_lookup_and_unknown_ones_search():
+    index = InMemoryVectorIndex.build()
+    known = _issue("EC2NodeClass 'default' does not specify subnets.")
+    custom = _issue("Custom finding about subnet tagging for prod.")
+    custom.rule_id = "security:custom"
+    before = METRICS.counter("rag.citations.live")
+
+    known_result, custom_result = retrieve_issue_contexts([known, custom], top_k=3, index=index)
+
+    assert known_result.contexts == index.lookup(known.rule_id, build_issue_query(known), top_k=3)
+    assert custom_result.contexts == index.search(build_issue_query(custom), top_k=3)
+    assert METRICS.counter("rag.citations.live") == before + 1
+
+
+def test_precomputed_citations_equal_live_search_for_issues_rules_raise():
+    index = InMemoryVectorIndex.build()
+    issues = _fixture_issues()
+
+    precomputed = 0
+    for issue, result in zip(issues, retrieve_issue_contexts(issues, top_k=3, index=index)):
+        query = build_issue_query(issue)
+        _same_hits(result.contexts, index.search(query, top_k=3))
+        precomputed += index.lookup(issue.rule_id, query) is not None
+    assert precomputed
+
+
+def test_every_rule_has_a_canonical_query():
+    produced = {_rule_family(issue) for issue in _fixture_issues()}
+    canonical = {_rule_family(issue) for issue in canonical_issues()}
+
+    # A new rule, or one the canonical manifests stop triggering, would lose its precomputed citations.
+    assert produced <= canonical
+    assert len(canonical) == len(canonical_issues()) == len(rule_queries())
@@ -0,0 +1,73 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from karpenter_ai_agent.rag.citations import rule_queries  # noqa: E402
+from karpenter_ai_agent.rag.dense import DenseIndex, HashedNgramEmbedder, fuse_scores  # noqa: E402
+from karpenter_ai_agent.rag.index import InMemoryVectorIndex  # noqa: E402
+from karpenter_ai_agent.rag.loader import DEFAULT_DOCS_PATH  # noqa: E402
+
+CORPUS = [
+    "Spot capacity lowers cost for interruption tolerant workloads",
+    "Consolidation replaces underutilized nodes to lower cost",
+    "Graviton arm64 instances offer better price performance",
+    "Subnet selectors choose which subnets nodes launch into",
+    "ttlSecondsAfterEmpty removes empty nodes after the timeout",
+]
+
+
+def test_embedder_is_deterministic_and_splits_camel_case():
+    embedder = HashedNgramEmbedder()
+    first = embedder.embed("ttlSecondsAfterEmpty")
+    assert np.array_equal(first, HashedNgramEmbedder().embed("ttlSecondsAfterEmpty"))
+    assert np.isclose(np.linalg.norm(first), 1.0)
+
+    split = embedder.embed("ttl seconds after empty")
+    unrelated = embedder.embed("graviton arm64 price")
+    assert float(first @ split) > 0.9
+    assert float(first @ split) > float(first @ unrelated)
+
+
+def test_dense_search_matches_subword_variants():
+    index = DenseIndex.build(CORPUS)
+
+    assert index.lsh is None
+    assert index.search("consolidate underutilised nodes", top_k=1)[0][0] == 1
+    assert index.search("seconds after empty", top_k=1)[0][0] == 4
+    assert index.search("", top_k=3) == []
+
+
+def test_lsh_finds_exact_duplicates_and_only_reranks_candidates():
+    index = DenseIndex.build(CORPUS, exact_below=0, tables=4, bits=4)
+
+    assert index.lsh is not None
+    for doc, text in enumerate(CORPUS):
+        assert index.search(text, top_k=1)[0][0] == doc
+    exact = dict(index.search_exact("spot cost", top_k=len(CORPUS)))
+    for doc, score in index.search("spot cost", top_k=3):
+        assert np.isclose(score, exact[doc])
+
+
+def test_fuse_scores_blends_lexical_and_dense():
+    lexical = [(0, 0.8), (1, 0.2)]
+    dense = [(1, 0.9), (2, 0.6), (3, -0.1)]
+
+    assert fuse_scores(lexical, dense, alpha=1.0, top_k=3) == [(0, 0.8), (1, 0.2)]
+    fused = fuse_scores(lexical, dense, alpha=0.5, top_k=3)
+    assert [doc for doc, _ in fused] == [1, 0, 2]
+    assert fused[0][1] == pytest.approx(0.55)
+
+
+def test_vector_index_modes():
+    lexical = InMemoryVectorIndex.build(DEFAULT_DOCS_PATH)
+    hybrid = InMemoryVectorIndex.build(DEFAULT_DOCS_PATH).with_dense("hybrid", alpha=0.5)
+    dense = InMemoryVectorIndex.build(DEFAULT_DOCS_PATH).with_dense("dense")
+
+    query = "spot interruption disruption budgets"
+    rule_id, rule_query = next(iter(rule_queries().items()))
+    assert lexical.dense is None and lexical.lookup(rule_id, rule_query) is not None
+    assert hybrid.lookup(rule_id, rule_query) is None
+    for index in (hybrid, dense):
+        results = index.search(query, top_k=3)
+        assert results and all(0 < context.score <= 1 for context in results)
+        assert index.search_many([query], top_k=3) == [results]
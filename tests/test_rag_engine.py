@@ -0,0 +1,77 @@
+import math
+
+import pytest
+
+from karpenter_ai_agent.rag.embedder import tokenize
+from karpenter_ai_agent.rag.engine import InvertedIndex, compute_idf, tfidf_vector
+from karpenter_ai_agent.rag.index import get_default_index
+from karpenter_ai_agent.rag.tool import retrieve_context_many
+
+
+CORPUS = [
+    "Spot capacity lowers cost for interruption tolerant workloads",
+    "Consolidation replaces underutilized nodes to lower cost",
+    "Graviton arm64 instances offer better price performance",
+    "Subnet selectors choose which subnets nodes launch into",
+    "Spot and on-demand capacity types can be mixed in one nodepool",
+    "",
+]
+
+
+def _brute_force(query, top_k):
+    idf = compute_idf(tokenize(text) for text in CORPUS)
+    q_vec = tfidf_vector(tokenize(query), idf)
+    q_norm = math.sqrt(sum(w * w for w in q_vec.values()))
+    scored = []
+    for doc, text in enumerate(CORPUS):
+        vec = tfidf_vector(tokenize(text), idf)
+        norm = math.sqrt(sum(w * w for w in vec.values()))
+        if not norm or not q_norm:
+            continue
+        score = sum(w * vec.get(t, 0.0) for t, w in q_vec.items()) / (q_norm * norm)
+        if score > 0:
+            scored.append((doc, score))
+    scored.sort(key=lambda item: item[1], reverse=True)
+    return scored[:top_k]
+
+
+def test_inverted_index_matches_brute_force_cosine():
+    index = InvertedIndex.build(CORPUS, tokenize)
+
+    for query in ("spot capacity", "lower cost nodes", "arm64", "subnets", "unknown term"):
+        for top_k in (1, 2, 5):
+            expected = _brute_force(query, top_k)
+            actual = index.search(query, top_k=top_k)
+            assert [doc for doc, _ in actual] == [doc for doc, _ in expected]
+            assert all(math.isclose(a, e) for (_, a), (_, e) in zip(actual, expected))
+
+
+def test_inverted_index_only_posts_matching_terms():
+    index = InvertedIndex.build(CORPUS, tokenize)
+
+    assert [doc for doc, _ in index.postings["spot"]] == [0, 4]
+    assert index.size == len(CORPUS)
+    assert index.search("", top_k=3) == []
+    assert index.search("spot", top_k=0) == []
+
+
+def test_search_many_matches_single_query_search():
+    pytest.importorskip("scipy")
+    index = InvertedIndex.build(CORPUS, tokenize)
+    queries = ["spot capacity", "lower cost nodes", "", "arm64", "unknown term", "nodes"]
+
+    for top_k in (1, 2, 10):
+        batched = index.search_many(queries, top_k=top_k)
+        assert len(batched) == len(queries)
+        for query, hits in zip(queries, batched):
+            single = index.search(query, top_k=top_k)
+            assert [doc for doc, _ in hits] == [doc for doc, _ in single]
+            assert all(math.isclose(a, b) for (_, a), (_, b) in zip(hits, single))
+
+
+def test_retrieve_context_many_matches_default_index():
+    queries = ["spot consolidation", "subnet selector", "expireAfter drift"]
+    results = retrieve_context_many(queries, top_k=3)
+    for query, result in zip(queries, results):
+        expected = get_default_index().search(query, top_k=3)
+        assert [c.text for c in result.contexts] == [c.text for c in expected]
@@ -0,0 +1,70 @@
+import re
+import sys
+from pathlib import Path
+
+import pytest
+
+BENCHMARKS = Path(__file__).resolve().parents[1] / "benchmarks"
+if str(BENCHMARKS) not in sys.path:
+    sys.path.insert(0, str(BENCHMARKS))
+
+from karpenter_ai_agent.rag.citations import canonical_issues  # noqa: E402
+from karpenter_ai_agent.rag.index import InMemoryVectorIndex  # noqa: E402
+from karpenter_ai_agent.rag.tool import build_issue_query, retrieve_issue_contexts  # noqa: E402
+from rag_quality import CORPORA, golden_issue, load_golden, run, scaled_corpus  # noqa: E402
+
+
+def _template(message):
+    return re.sub(r"\d+", "n", re.sub(r"'[^']*'", "name", message))
+
+
+def test_golden_set_covers_every_rule_and_corpus():
+    golden = load_golden()
+    templates = {_template(entry["message"]) for entry in golden}
+    assert {_template(issue.message) for issue in canonical_issues()} <= templates
+    for entry in golden:
+        assert set(entry["expected"]) == set(CORPORA)
+        assert all(entry["expected"].values())
+
+
+def test_scaled_corpus_keeps_real_chunks_first():
+    chunks = CORPORA["karpenter"][0]()
+    scaled = scaled_corpus(chunks, 3, seed=1)
+
+    assert len(scaled) == 3 * len(chunks)
+    assert scaled[: len(chunks)] == chunks
+    assert all(chunk.source_url.startswith("https://example.invalid/") for chunk in scaled[len(chunks) :])
+
+
+def test_lexical_backends_cite_expected_sources_on_shipped_corpus():
+    report = run(corpora=list(CORPORA), backends=["tfidf", "bm25"], scale=1, repeat=1)
+
+    for corpus in CORPORA:
+        backends = report["corpora"][corpus]["shipped"]["backends"]
+        for name, result in backends.items():
+            assert result["recall@3"] == 1.0, (corpus, name)
+            assert result["mrr"] >= 0.8, (corpus, name)
+            assert result["p99_ms"] >= result["p50_ms"]
+
+
+def test_tfidf_derived_backends_rank_like_tfidf():
+    backends = ["tfidf", "precomputed", "sparse", "artifact"]
+    report = run(corpora=["karpenter"], backends=backends, scale=2, repeat=1)
+
+    for variant in report["corpora"]["karpenter"].values():
+        results = variant["backends"]
+        for name in set(results) - {"tfidf"}:
+            assert results[name]["ranks"] == results["tfidf"]["ranks"], name
+            assert results[name]["mrr"] == results["tfidf"]["mrr"], name
+
+
+def test_explain_stage_citations_equal_live_search_for_golden_issues():
+    index = InMemoryVectorIndex.build()
+    issues = [golden_issue(entry) for entry in load_golden()]
+
+    for issue, result in zip(issues, retrieve_issue_contexts(issues, top_k=3, index=index)):
+        query = build_issue_query(issue)
+        live = index.search(query, top_k=3)
+        for hits in (result.contexts, index.lookup(issue.rule_id, query) or live):
+            assert [c.source_url for c in hits] == [c.source_url for c in live], issue.rule_id
+            assert [c.score for c in hits] == pytest.approx([c.score for c in live])
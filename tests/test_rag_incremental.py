@@ -0,0 +1,92 @@
+import math
+
+from karpenter_ai_agent.rag import store as store_module
+from karpenter_ai_agent.rag.cache import QueryCache
+from karpenter_ai_agent.rag.incremental import IncrementalKnowledgeIndex, KnowledgeWatcher
+from karpenter_ai_agent.rag.store import KnowledgeStore
+
+QUERIES = ["spot interruption", "consolidation nodes", "subnet security groups", "graviton arm64"]
+
+
+def _write(root, name, title, body):
+    path = root / name
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(f"# {title}\nSource: https://example.com/{name}\n\n{body}\n", encoding="utf-8")
+    return path
+
+
+def _assert_same(incremental: KnowledgeStore, full: KnowledgeStore):
+    assert [c.chunk_id for c in incremental.chunks] == [c.chunk_id for c in full.chunks]
+    assert incremental.engine.version == full.engine.version
+    for query in QUERIES:
+        got = incremental.search(query, top_k=3)
+        expected = full.search(query, top_k=3)
+        assert [c.chunk_id for c, _ in got] == [c.chunk_id for c, _ in expected]
+        assert all(math.isclose(a, b) for (_, a), (_, b) in zip(got, expected))
+
+
+def test_add_update_remove_matches_full_reload(tmp_path):
+    _write(tmp_path, "spot.md", "Spot", "Spot capacity can be interrupted with two minutes notice.")
+    _write(tmp_path, "nested/consolidation.md", "Consolidation", "Consolidation removes underused nodes.")
+    index = IncrementalKnowledgeIndex.from_directory(tmp_path)
+    _assert_same(index.store(), KnowledgeStore.load(tmp_path))
+
+    added = _write(tmp_path, "nested-net.md", "Networking", "Subnet and security groups selectors.")
+    index.upsert_file(added)
+    _assert_same(index.store(), KnowledgeStore.load(tmp_path))
+
+    updated = _write(tmp_path, "spot.md", "Spot", "Graviton arm64 spot nodes.\n\nInterruption handling.")
+    index.upsert_file(updated)
+    _assert_same(index.store(), KnowledgeStore.load(tmp_path))
+
+    updated.unlink()
+    assert index.remove_file(updated) is True
+    assert index.remove_file(updated) is False
+    _assert_same(index.store(), KnowledgeStore.load(tmp_path))
+    assert index.documents == ["nested/consolidation.md", "nested-net.md"]
+
+
+def test_store_snapshot_is_reused_until_a_change():
+    from pathlib import Path
+
+    index = IncrementalKnowledgeIndex(Path("unused"))
+    empty = index.store()
+    assert index.store() is empty
+    assert empty.search("spot", top_k=3) == []
+
+    index.remove("missing.md")
+    assert index.store() is empty
+
+
+def test_watcher_applies_changes_and_publishes_snapshot(tmp_path):
+    _write(tmp_path, "spot.md", "Spot", "Spot capacity interruption.")
+    index = IncrementalKnowledgeIndex.from_directory(tmp_path)
+    published = []
+    watcher = KnowledgeWatcher(index, interval=60, on_update=published.append)
+
+    assert watcher.scan() is False
+    _write(tmp_path, "net.md", "Networking", "Subnet security groups.")
+    assert watcher.scan() is True
+    assert published[-1].search("subnet", top_k=1)[0][0].doc_id == "net.md"
+
+    (tmp_path / "net.md").unlink()
+    assert watcher.scan() is True
+    assert published[-1].search("subnet", top_k=1) == []
+    assert len(published) == 2
+
+
+def test_swapping_the_default_store_drops_the_old_versions_cache(tmp_path, monkeypatch):
+    _write(tmp_path, "spot.md", "Spot", "Spot capacity interruption.")
+    index = IncrementalKnowledgeIndex.from_directory(tmp_path)
+    cache = QueryCache(max_entries=8)
+    old = index.store()
+    old.engine.cache = cache
+    monkeypatch.setattr(store_module, "_DEFAULT_STORE", old)
+    old.search("spot", top_k=3)
+    assert len(cache) == 1
+
+    index.upsert_file(_write(tmp_path, "net.md", "Networking", "Subnet security groups."))
+    store_module.set_default_store(index.store())
+
+    assert store_module.get_default_store() is not old
+    assert len(cache) == 0
@@ -0,0 +1,55 @@
+from karpenter_ai_agent.rag.cache import QueryCache
+from karpenter_ai_agent.rag.embedder import tokenize
+from karpenter_ai_agent.rag.engine import InvertedIndex
+
+CORPUS = [
+    "Spot capacity lowers cost",
+    "Consolidation replaces underutilized nodes",
+    "Graviton arm64 instances",
+]
+
+
+def test_repeat_queries_hit_cache_regardless_of_term_order():
+    cache = QueryCache(max_entries=8)
+    index = InvertedIndex.build(CORPUS, tokenize)
+    index.cache = cache
+
+    first = index.search("spot capacity", top_k=2)
+    assert index.search("Capacity  SPOT", top_k=2) == first
+    assert index.search("spot capacity", top_k=1) == first[:1]
+
+    assert cache.hits == 1
+    assert cache.misses == 2
+    assert cache.stats()["hit_rate"] == round(1 / 3, 4)
+
+
+def test_batch_search_shares_cache_and_dedupes():
+    cache = QueryCache(max_entries=8)
+    index = InvertedIndex.build(CORPUS, tokenize)
+    index.cache = cache
+
+    index.search("graviton", top_k=3)
+    results = index.search_many(["graviton", "nodes", "nodes", ""], top_k=3)
+
+    assert results[1] == results[2] == index.search("nodes", top_k=3)
+    assert results[3] == []
+    assert cache.hits == 2  # "graviton" in the batch, then "nodes" afterwards
+    assert len(cache) == 2
+
+
+def test_rebuilt_index_gets_new_version_and_lru_bounds_size():
+    cache = QueryCache(max_entries=2)
+    old = InvertedIndex.build(CORPUS, tokenize)
+    new = InvertedIndex.build(CORPUS + ["Spot interruption handling"], tokenize)
+    old.cache = new.cache = cache
+
+    assert old.version == InvertedIndex.build(CORPUS, tokenize).version
+    assert old.version != new.version
+    old.search("spot", top_k=3)
+    assert len(new.search("spot", top_k=3)) == 2
+    assert cache.misses == 2
+
+    new.search("graviton", top_k=3)
+    assert len(cache) == 2
+    cache.drop_version(new.version)
+    assert len(cache) == 0
@@ -0,0 +1,200 @@
+import json
+import random
+from collections import Counter
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from karpenter_ai_agent.agents import ParserAgent, ReliabilityAgent
+from karpenter_ai_agent.models import AnalysisInput, CanonicalConfig, CanonicalProvisioner
+from karpenter_ai_agent.orchestration.graph import run_analysis_graph
+from karpenter_ai_agent.simulation import (
+    NodeCapacity,
+    first_fit_decreasing,
+    packer_available,
+    parse_quantity,
+    parse_snapshot,
+    simulate_consolidation,
+)
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+
+def _config():
+    yaml_text = (FIXTURES / "basic-karpenter.yaml").read_text()
+    return ParserAgent().run(AnalysisInput(yaml_text=yaml_text)).config
+
+
+def test_parse_quantity_units():
+    assert parse_quantity("250m") == 0.25
+    assert parse_quantity("2") == 2.0
+    assert parse_quantity("1Gi") == 2**30
+    assert parse_quantity("1G") == 1e9
+    assert parse_quantity("1e3") == 1000.0
+    with pytest.raises(ValueError):
+        parse_quantity("12 cores")
+
+
+def test_parse_snapshot_reads_requests_owners_and_nodepools():
+    snapshot = parse_snapshot((FIXTURES / "pod-snapshot.yaml").read_text())
+
+    assert len(snapshot.nodes) == 4
+    assert len(snapshot.pods) == 12  # the Succeeded Job pod is skipped
+    web = {pod.name: pod for pod in snapshot.pods}
+    assert (web["web-0"].cpu_millis, web["web-0"].memory_bytes) == (1000, 2**30)  # init container wins on CPU
+    assert (web["web-1"].cpu_millis, web["web-1"].memory_bytes) == (500, 2**30)
+    assert web["node-agent-0"].daemonset == "shop/node-agent"
+    assert {pod.nodepool for pod in snapshot.pods} == {"default-provisioner"}
+
+
+@pytest.mark.parametrize(
+    "document",
+    [
+        {"kind": "Pod", "metadata": "foo"},
+        {"kind": "Pod", "spec": {"containers": ["x"]}},
+        {"kind": "Pod", "spec": {"containers": {"name": "app"}}},
+        {"kind": "Pod", "spec": {"containers": [{"resources": {"requests": {"memory": [1]}}}]}},
+        {"kind": "Pod", "spec": {"overhead": {"cpu": {"value": 1}}}},
+        {"kind": "Node", "metadata": {"labels": ["karpenter.sh/nodepool"]}},
+    ],
+)
+def test_malformed_snapshot_raises_value_error(document):
+    with pytest.raises(ValueError):
+        parse_snapshot(json.dumps(document))
+
+
+def test_reliability_agent_reports_malformed_snapshot():
+    snapshot = json.dumps({"kind": "Pod", "spec": {"containers": [{"resources": {"requests": {"cpu": [1]}}}]}})
+
+    result = ReliabilityAgent().run(_config(), snapshot)
+
+    assert "could not be parsed" in result.signals["consolidation"]["error"]
+
+
+def _naive_ffd(shapes, capacity):
+    pods = sorted(
+        ((c, m) for c, m, n in zip(*shapes) for _ in range(n)),
+        key=lambda p: (max(p[0] / capacity.cpu_millis, p[1] / capacity.memory_bytes), p[0], p[1]),
+        reverse=True,
+    )
+    nodes = []
+    for c, m in pods:
+        for node in nodes:
+            if node[0] >= c and node[1] >= m and node[2]:
+                node[0], node[1], node[2] = node[0] - c, node[1] - m, node[2] - 1
+                break
+        else:
+            nodes.append([capacity.cpu_millis - c, capacity.memory_bytes - m, capacity.max_pods - 1])
+    return len(nodes)
+
+
+@pytest.mark.parametrize("vectorized", [True, False])
+def test_grouped_packer_matches_pod_by_pod_first_fit(vectorized):
+    if vectorized and not packer_available():
+        pytest.skip("numpy not installed")
+    rng = random.Random(5)
+    for _ in range(50):
+        capacity = NodeCapacity("x", rng.randint(1000, 8000), rng.randint(2000, 32000), rng.randint(3, 40), 1.0)
+        counts = Counter(
+            (rng.choice([0, rng.randint(1, capacity.cpu_millis)]), rng.randint(0, capacity.memory_bytes))
+            for _ in range(rng.randint(1, 300))
+        )
+        shapes = tuple(list(column) for column in zip(*((c, m, n) for (c, m), n in sorted(counts.items()))))
+
+        assert first_fit_decreasing(shapes, capacity, vectorized=vectorized) == _naive_ffd(shapes, capacity)
+
+    with pytest.raises(ValueError):
+        first_fit_decreasing(([9000], [1], [1]), NodeCapacity("x", 8000, 10, 10, 1.0))
+
+
+def test_simulation_reports_current_and_packed_nodes():
+    snapshot = parse_snapshot((FIXTURES / "pod-snapshot.yaml").read_text())
+
+    report = simulate_consolidation(_config(), snapshot, region="us-east-1")
+
+    entry = next(e for e in report["nodepools"] if e["nodepool"] == "default-provisioner")
+    assert entry["current_nodes"] == 4
+    assert entry["current_instance_types"] == {"m5.xlarge": 4}
+    assert entry["pods"] == 8 and entry["daemonset_pods"] == 4
+    # 1 vCPU / 2.4 GiB allocatable per m5.large after reservations and the DaemonSet.
+    assert (entry["packed_nodes"], entry["packed_instance_type"]) == (3, "m5.large")
+    assert entry["lower_bound_nodes"] <= entry["packed_nodes"]
+    assert entry["packed_monthly_cost_usd"] < entry["current_monthly_cost_usd"]
+    assert entry["monthly_savings_usd"] > 0
+    assert report["unassigned_pods"] == 0
+    json.dumps(report)
+
+
+def test_multi_process_mode_matches_single_process():
+    rng = random.Random(1)
+    pools = [
+        CanonicalProvisioner(
+            name=f"pool-{p}", kind="NodePool", spot_allowed=False, graviton_used=False,
+            instance_families=[["m5"], ["c6i"], []][p % 3], raw_yaml={},
+        )
+        for p in range(6)
+    ]
+    items = [
+        {
+            "kind": "Pod",
+            "metadata": {"name": f"p{i}"},
+            "spec": {
+                "nodeSelector": {"karpenter.sh/nodepool": f"pool-{i % 6}"},
+                "containers": [{"resources": {"requests": {"cpu": f"{rng.randint(50, 2000)}m", "memory": f"{rng.randint(64, 4096)}Mi"}}}],
+            },
+        }
+        for i in range(600)
+    ]
+    snapshot = parse_snapshot(json.dumps({"kind": "List", "items": items}))
+    config = CanonicalConfig(provisioners=pools)
+
+    assert simulate_consolidation(config, snapshot, workers=2) == simulate_consolidation(config, snapshot, workers=1)
+
+
+def test_reliability_agent_and_report_carry_the_simulation():
+    snapshot_yaml = (FIXTURES / "pod-snapshot.yaml").read_text()
+
+    result = ReliabilityAgent().run(_config(), snapshot_yaml, "us-east-1")
+
+    issue = next(i for i in result.issues if i.resource_name == "default-provisioner" and "onsolidation" in i.message)
+    assert issue.metadata["current_nodes"] == 4
+    assert issue.metadata["estimated_monthly_savings_usd"] > 0
+    assert ReliabilityAgent().run(_config(), "kind: [").signals["consolidation"]["error"]
+
+    report = run_analysis_graph(
+        AnalysisInput(yaml_text=(FIXTURES / "basic-karpenter.yaml").read_text(), snapshot_yaml=snapshot_yaml)
+    )
+    assert report.raw["consolidation"]["nodepools"][0]["nodepool"] == "default-provisioner"
+
+
+def _post_analyze(snapshot_text):
+    return TestClient(main.app).post(
+        "/analyze",
+        data={"region": "us-east-1"},
+        files={
+            "files": ("basic.yaml", (FIXTURES / "basic-karpenter.yaml").read_text(), "application/x-yaml"),
+            "snapshot": ("snapshot.json", snapshot_text, "application/json"),
+        },
+    )
+
+
+def test_library_callers_pack_in_process_whatever_the_env(monkeypatch):
+    def no_pool(*args, **kwargs):
+        raise AssertionError("library callers must not start a process pool")
+
+    monkeypatch.setenv("SIMULATION_WORKERS", "4")
+    monkeypatch.setattr("karpenter_ai_agent.simulation.simulate.ProcessPoolExecutor", no_pool)
+
+    response = _post_analyze((FIXTURES / "pod-snapshot.yaml").read_text())
+
+    assert response.status_code == 200
+    assert "Pod snapshot could not be parsed" not in response.text
+
+
+def test_web_analysis_shows_why_a_snapshot_was_ignored():
+    response = _post_analyze(json.dumps({"kind": "Pod", "metadata": "foo"}))
+
+    assert response.status_code == 200
+    assert "Pod snapshot could not be parsed" in response.text
@@ -0,0 +1,148 @@
+import time
+
+import llm_client
+from karpenter_ai_agent.llm.resilience import CircuitBreaker, Deadline
+from karpenter_ai_agent.llm.stub_server import StubLLMServer
+from karpenter_ai_agent.llm.summary_cache import SummaryCache, summary_fingerprint
+from karpenter_ai_agent.models import AnalysisReport, Issue
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _report(order=(0, 1), message="Spot is off."):
+    issues = [
+        Issue(rule_id="cost:spot", severity="high", category="cost", message=message,
+              recommendation="Enable Spot.", resource_kind="NodePool", resource_name="a"),
+        Issue(rule_id="cost:graviton", severity="medium", category="cost", message="No arm64.",
+              recommendation="Allow arm64.", resource_kind="NodePool", resource_name="b"),
+    ]
+    return AnalysisReport(
+        region="us-east-1",
+        issues=[issues[i] for i in order],
+        issues_by_severity={"high": 1, "medium": 1, "low": 0},
+        optimizer_flags={"total_provisioners": 2},
+        health_score=80,
+    )
+
+
+def test_fingerprint_ignores_order_and_wording_but_tracks_model_and_prompt():
+    base = summary_fingerprint(_report(), model="m", prompt_version="v1")
+
+    assert summary_fingerprint(_report(order=(1, 0)), model="m", prompt_version="v1") == base
+    assert summary_fingerprint(_report(message="Spot disabled."), model="m", prompt_version="v1") == base
+    assert summary_fingerprint(_report(), model="other", prompt_version="v1") != base
+    assert summary_fingerprint(_report(), model="m", prompt_version="v2") != base
+    assert summary_fingerprint(_report(order=(0,)), model="m", prompt_version="v1") != base
+
+
+def test_cache_ttl_and_lru_eviction():
+    clock = Clock()
+    cache = SummaryCache(max_entries=2, ttl_seconds=60, clock=clock)
+    cache.put("a", "A")
+    cache.put("b", "B")
+    assert cache.get("a") == "A"  # "b" is now least recently used
+    cache.put("c", "C")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "A"
+    clock.now += 61
+    assert cache.get("a") is None
+    assert len(cache) == 1
+
+
+def test_disk_backend_survives_new_instance(tmp_path):
+    clock = Clock()
+    SummaryCache(path=tmp_path, clock=clock).put("key", "Cached summary.")
+
+    fresh = SummaryCache(path=tmp_path, ttl_seconds=60, clock=clock)
+    assert fresh.get("key") == "Cached summary."
+    clock.now += 61
+    assert SummaryCache(path=tmp_path, ttl_seconds=60, clock=clock).get("key") is None
+    assert not list(tmp_path.glob("*.json"))
+
+
+def test_stream_report_serves_repeat_from_cache(monkeypatch):
+    monkeypatch.setenv("GROQ_API_KEY", "stub-key")
+    monkeypatch.setattr(llm_client, "LLM_BREAKER", CircuitBreaker())
+    monkeypatch.setattr(llm_client, "SUMMARY_CACHE", SummaryCache())
+    key = llm_client.summary_cache_key(_report())
+    summary = {"issues_by_severity": {"high": 1, "medium": 1, "low": 0}, "health_score": 80}
+
+    with StubLLMServer() as server:
+        monkeypatch.setenv("LLM_BASE_URL", server.base_url)
+        first = "".join(llm_client.stream_report("us-east-1", summary, [], cache_key=key))
+        second = "".join(llm_client.stream_report("us-east-1", summary, [], cache_key=key))
+        third = llm_client.generate_report("us-east-1", summary, [], cache_key=key)
+
+    assert server.request_count == 1
+    assert second == third == llm_client._sanitize_ai_text(first)
+
+
+def test_cache_key_tracks_endpoint(monkeypatch):
+    monkeypatch.setenv("LLM_BASE_URL", "http://127.0.0.1:9/v1")
+    stub_key = llm_client.summary_cache_key(_report())
+    monkeypatch.delenv("LLM_BASE_URL")
+
+    assert llm_client.summary_cache_key(_report()) != stub_key
+
+
+class _StreamResponse:
+    status_code = 200
+
+    def __init__(self, lines):
+        self._lines = lines
+
+    def iter_lines(self, decode_unicode=False):
+        return iter(self._lines)
+
+    def close(self):
+        pass
+
+
+def test_only_streams_finished_with_stop_are_cached(monkeypatch):
+    monkeypatch.setenv("GROQ_API_KEY", "stub-key")
+    monkeypatch.setattr(llm_client, "LLM_BREAKER", CircuitBreaker())
+    monkeypatch.setattr(llm_client, "SUMMARY_CACHE", SummaryCache())
+    delta = 'data: {"choices": [{"delta": {"content": "Text"}}]}'
+    finished = 'data: {"choices": [{"delta": {}, "finish_reason": "%s"}]}'
+    streams = {
+        "closed early": [delta],
+        "length": [delta, finished % "length", "data: [DONE]"],
+        "stop": [delta, finished % "stop", "data: [DONE]"],
+    }
+
+    for name, lines in streams.items():
+        monkeypatch.setattr("llm_client.requests.post", lambda *args, lines=lines, **kwargs: _StreamResponse(lines))
+        assert "".join(llm_client.stream_free_model("us-east-1", {}, [], cache_key=name)) == "Text"
+
+    assert [name for name in streams if llm_client.SUMMARY_CACHE.get(name)] == ["stop"]
+
+
+def test_stream_stops_when_the_deadline_expires(monkeypatch):
+    monkeypatch.setenv("GROQ_API_KEY", "stub-key")
+    monkeypatch.setattr(llm_client, "LLM_BREAKER", CircuitBreaker())
+    monkeypatch.setattr(llm_client, "SUMMARY_CACHE", SummaryCache())
+    delta = 'data: {"choices": [{"delta": {"content": "Text"}}]}'
+
+    def lines(deadline, before):
+        for _ in range(before):
+            yield delta
+        deadline.expires_at = time.monotonic() - 1
+        yield from (delta, 'data: {"choices": [{"delta": {}, "finish_reason": "stop"}]}', "data: [DONE]")
+
+    for before, expected in ((1, "Text"), (0, "Template.")):
+        deadline = Deadline.after(60)
+        response = _StreamResponse(lines(deadline, before))
+        monkeypatch.setattr("llm_client.requests.post", lambda *args, **kwargs: response)
+        streamed = llm_client.stream_free_model(
+            "us-east-1", {}, [], deadline=deadline, fallback=lambda: "Template.", cache_key="key"
+        )
+        assert "".join(streamed) == expected
+
+    assert llm_client.SUMMARY_CACHE.get("key") is None
@@ -0,0 +1,62 @@
+import json
+import re
+import threading
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+import main
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+
+def _parse_events(body: str):
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def test_analyze_renders_before_summary_and_streams_it(monkeypatch):
+    calls = {"count": 0}
+    release = threading.Event()
+
+    def fake_stream_report(region, summary, issues, **kwargs):  # noqa: ANN001, ANN003
+        calls["count"] += 1
+        yield "Overall "
+        assert release.wait(5)
+        yield "healthy.\n```yaml\nspec: {}\n```"
+
+    monkeypatch.setattr("main.stream_report", fake_stream_report)
+    client = TestClient(main.app)
+
+    yaml_text = (FIXTURES / "basic-karpenter.yaml").read_text()
+    response = client.post(
+        "/analyze",
+        data={"region": "us-east-1"},
+        files={"files": ("basic.yaml", yaml_text, "application/x-yaml")},
+    )
+
+    # The page is rendered while the summary job is still blocked mid-stream.
+    assert response.status_code == 200
+    match = re.search(r'data-stream-url="([^"]+)"', response.text)
+    assert match
+    assert main.LAST_REPORT.ai_summary is None
+
+    release.set()
+    stream = client.get(match.group(1))
+    assert stream.headers["content-type"].startswith("text/event-stream")
+    events = _parse_events(stream.text)
+    assert events[-1][0] == "done"
+    assert events[-1][1] == "Overall healthy."
+    assert main.LAST_REPORT.ai_summary == "Overall healthy."
+
+    replay = _parse_events(client.get(match.group(1)).text)
+    assert replay == [("done", "Overall healthy.")]
+    assert calls["count"] == 1
+
+
+def test_stream_summary_unknown_id_returns_404():
+    client = TestClient(main.app)
+    assert client.get("/analyze/missing/summary/stream").status_code == 404
@@ -0,0 +1,135 @@
+import time
+from pathlib import Path
+
+import requests
+
+import llm_client
+from karpenter_ai_agent.agents import CoordinatorAgent
+from karpenter_ai_agent.llm.resilience import CircuitBreaker
+from karpenter_ai_agent.llm.template_summary import build_template_summary
+from karpenter_ai_agent.models import AnalysisInput, AnalysisReport, Issue
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+
+def _issue(rule_id, severity, name, message, recommendation):
+    return Issue(
+        rule_id=rule_id,
+        severity=severity,
+        category="cost",
+        message=message,
+        recommendation=recommendation,
+        resource_kind="NodePool",
+        resource_name=name,
+    )
+
+
+def _report():
+    issues = [
+        _issue("cost:spot", "high", "a", "Spot capacity is not enabled.", "Enable Spot."),
+        _issue("cost:spot", "high", "b", "Spot capacity is not enabled.", "Enable Spot."),
+        _issue("cost:graviton", "medium", "a", "Graviton is not used.", "Allow arm64."),
+    ]
+    return AnalysisReport(
+        region="us-east-1",
+        issues=issues,
+        issues_by_severity={"high": 2, "medium": 1, "low": 0},
+        optimizer_flags={"total_provisioners": 2},
+        health_score=70,
+    )
+
+
+def test_template_summary_has_prompt_sections_and_groups_by_rule():
+    text = build_template_summary(_report())
+
+    sections = [
+        "High severity issues:",
+        "Medium severity issues:",
+        "Low severity issues or observations:",
+        "Recommended actions:",
+    ]
+    positions = [text.index(title) for title in sections]
+    assert positions == sorted(positions)
+    assert "2 high, 1 medium and 0 low" in text
+    assert text.count("Spot capacity is not enabled.") == 1
+    assert "- Spot capacity is not enabled. Affected: a, b." in text
+    assert "- Enable Spot. Affected: a, b." in text
+    low_section = text.split("Low severity issues or observations:")[1].split("Recommended actions:")[0]
+    assert "- None." in low_section
+    assert "**" not in text and "#" not in text
+    assert build_template_summary(_report()) == text
+
+
+def test_template_summary_gives_each_message_of_a_rule_its_own_bullet():
+    report = _report()
+    report.issues.append(_issue("cost:graviton", "medium", "b", "Graviton is not used in 'b'.", "Allow arm64."))
+
+    text = build_template_summary(report)
+
+    assert "- Graviton is not used. Affected: a.\n" in text
+    assert "- Graviton is not used in 'b'. Affected: b.\n" in text
+
+
+def test_template_summary_renders_in_under_a_millisecond():
+    yaml_text = (FIXTURES / "basic-karpenter.yaml").read_text()
+    report = CoordinatorAgent().run(AnalysisInput(yaml_text=yaml_text, region="us-east-1"))
+
+    runs = 200
+    started = time.perf_counter()
+    for _ in range(runs):
+        build_template_summary(report)
+    assert (time.perf_counter() - started) / runs < 0.001
+
+
+def test_call_free_model_falls_back_when_key_unset_or_circuit_open(monkeypatch):
+    monkeypatch.delenv("GROQ_API_KEY", raising=False)
+    fallback = lambda: "template summary"  # noqa: E731
+
+    assert llm_client.call_free_model("us-east-1", {}, [], fallback=fallback) == "template summary"
+    assert list(llm_client.stream_free_model("us-east-1", {}, [], fallback=fallback)) == [
+        "template summary"
+    ]
+
+    monkeypatch.setenv("GROQ_API_KEY", "test-key")
+    monkeypatch.setattr(llm_client, "LLM_BREAKER", CircuitBreaker(failure_threshold=1, reset_timeout=60))
+    llm_client.LLM_BREAKER.record_failure()
+    assert llm_client.call_free_model("us-east-1", {}, [], fallback=fallback) == "template summary"
+
+
+class _Response:
+    def __init__(self, status_code, lines=()):
+        self.status_code = status_code
+        self.text = "error"
+        self._lines = lines
+
+    def iter_lines(self, decode_unicode=False):
+        for line in self._lines:
+            if isinstance(line, Exception):
+                raise line
+            yield line
+
+    def close(self):
+        pass
+
+
+def test_error_status_uses_fallback_and_broken_stream_ends_cleanly(monkeypatch):
+    monkeypatch.setenv("GROQ_API_KEY", "test-key")
+    monkeypatch.setattr(llm_client, "LLM_BREAKER", CircuitBreaker())
+    fallback = lambda: "template summary"  # noqa: E731
+
+    monkeypatch.setattr("llm_client.requests.post", lambda *args, **kwargs: _Response(400))
+    assert llm_client.call_free_model("us-east-1", {}, [], fallback=fallback) == "template summary"
+    assert list(llm_client.stream_free_model("us-east-1", {}, [], fallback=fallback)) == ["template summary"]
+
+    lines = ['data: {"choices": [{"delta": {"content": "Partial"}}]}', requests.exceptions.ChunkedEncodingError("cut")]
+    monkeypatch.setattr("llm_client.requests.post", lambda *args, **kwargs: _Response(200, lines))
+    assert list(llm_client.stream_free_model("us-east-1", {}, [], fallback=fallback)) == ["Partial"]
+
+
+def test_summary_mode_env(monkeypatch):
+    monkeypatch.delenv(llm_client.SUMMARY_MODE_ENV, raising=False)
+    assert llm_client.summary_mode() == "llm"
+    monkeypatch.setenv(llm_client.SUMMARY_MODE_ENV, "Template")
+    assert llm_client.summary_mode() == "template"
+    monkeypatch.setenv(llm_client.SUMMARY_MODE_ENV, "bogus")
+    assert llm_client.summary_mode() == "llm"